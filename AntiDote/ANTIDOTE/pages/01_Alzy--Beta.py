@@ -6,6 +6,7 @@ import os
 import re
 import json
 import uuid
+import weakref
 import random
 import datetime as dt
 from pathlib import Path
@@ -13,9 +14,23 @@ from typing import Dict, Any, List, Optional
 
 import streamlit as st
 from PIL import Image  # noqa: F401
-import requests
 import streamlit.components.v1 as components
 
+from shared.helpers import browser_speech, get_tts, tts_audio, tts_cached_audio
+from utils.alzy_intents import LocalIntentRouter
+from utils.alzy_answers import AnswerBank
+from utils.alzy_context import ChatHistory
+from utils.alzy_llm import (
+    BUSY_REPLY,
+    DEFAULT_API_URL,
+    FALLBACK_REPLY,
+    ChatExecutor,
+    ChatJob,
+    ChatQueueFull,
+    limited_chat,
+)
+from utils.alzy_ratelimit import FairRateLimiter
+
 try:
     from zoneinfo import ZoneInfo  # Python 3.9+
 except Exception:
@@ -81,6 +96,24 @@ def _load_api_key() -> str:
 
 OPENAI_API_KEY = _load_api_key()
 
+# Any OpenAI-compatible endpoint (e.g. the offline stub: python -m utils.openai_stub)
+CHAT_API_URL = os.getenv("ALZY_CHAT_API_URL", DEFAULT_API_URL)
+
+# Chat requests run on a shared worker pool; the patient waits at most this long.
+CHAT_LATENCY_BUDGET_S = float(os.getenv("ALZY_CHAT_BUDGET_S", "4.0"))
+CHAT_MAX_WORKERS = int(os.getenv("ALZY_CHAT_WORKERS", "8"))
+CHAT_MAX_PENDING = int(os.getenv("ALZY_CHAT_MAX_PENDING", "64"))
+# Per-session chat memory: ring buffer size + LLM context budget (recent turns + summary)
+CHAT_HISTORY_MAX = int(os.getenv("ALZY_CHAT_HISTORY_MAX", "200"))
+CHAT_CONTEXT_TOKENS = int(os.getenv("ALZY_CHAT_CONTEXT_TOKENS", "1200"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("ALZY_CHAT_SUMMARY_TOKENS", "300"))
+# One OPENAI_API_KEY is shared by every session: budget it per minute.
+# Set ALZY_LLM_LIMIT_DB to a file path to share the budget across server processes.
+LLM_RPM = float(os.getenv("ALZY_LLM_RPM", "60"))
+LLM_TPM = float(os.getenv("ALZY_LLM_TPM", "40000"))
+LLM_LIMIT_DB = os.getenv("ALZY_LLM_LIMIT_DB", "")
+CHAT_GREETING = "Hello 👋 I'm your Memory Assistant. How can I help you today?"
+
 # ------------------------------------------------------------
 # TIME HELPERS (consistent IST)
 # ------------------------------------------------------------
@@ -162,6 +195,7 @@ def default_data() -> Dict[str, Any]:
             },
         },
         "memory_book_images": [],
+        "qa_bank": {},
     }
 
 
@@ -213,6 +247,7 @@ def load_merged_data() -> Dict[str, Any]:
     # merged maps
     data["reminders"] = _merge_maps(baseline, runtime, "reminders")
     data["people"] = _merge_maps(baseline, runtime, "people")
+    data["qa_bank"] = _merge_maps(baseline, runtime, "qa_bank")
 
     # merged memory book index (paths)
     data["memory_book_images"] = _merge_lists_latest_first(
@@ -247,6 +282,7 @@ def save_runtime_data(data: Dict[str, Any]) -> None:
         "people": data.get("people", {}),
         "logs": data.get("logs", []),
         "memory_book_images": data.get("memory_book_images", []),
+        "qa_bank": data.get("qa_bank", {}),
     }
     try:
         RUNTIME_FILE.write_text(json.dumps(dyn, indent=2), encoding="utf-8")
@@ -312,6 +348,17 @@ def add_reminder(
         "reminder_type": reminder_type,
     }
     save_runtime_data(data)
+    # Render speech now so the card plays instantly (only used when no audio was uploaded)
+    if not audio_path:
+        get_tts().prerender([reminder_speech_text(data["reminders"][rid])], rate=0.95)
+
+
+def reminder_speech_text(rec: Dict[str, Any]) -> str:
+    parts = [rec.get("title", "")]
+    steps = rec.get("steps") or []
+    if steps:
+        parts.append("Steps: " + " ".join(f"{i}. {s}." for i, s in enumerate(steps, 1)))
+    return " ".join(p.strip() for p in parts if p.strip())
 
 
 def reminder_due(rec: Dict[str, Any]) -> bool:
@@ -374,6 +421,24 @@ def add_log(data: Dict[str, Any], reminder: Dict[str, Any], action: str):
     save_runtime_data(data)
 
 
+# Caregiver Q&A bank helpers
+def add_qa(data: Dict[str, Any], question: str, answer: str):
+    qid = uuid.uuid4().hex
+    data.setdefault("qa_bank", {})
+    data["qa_bank"][qid] = {
+        "id": qid,
+        "question": question,
+        "answer": answer,
+        "updated_iso": to_iso(now_local()),
+    }
+    save_runtime_data(data)
+
+
+def remove_qa(data: Dict[str, Any], qid: str):
+    data.get("qa_bank", {}).pop(qid, None)
+    save_runtime_data(data)
+
+
 # Memory Book helpers
 def _file_mtime_or_zero(path: Path) -> float:
     try:
@@ -496,34 +561,73 @@ def _offset_point(lat: float, lon: float, km_north: float = 0.0, km_east: float
     return lat + dlat, lon + dlon
 
 
-# --- Local date/time answers for AI ---
-def maybe_local_answer(user_input: str) -> Optional[str]:
-    """Answer simple date/time questions locally in IST."""
-    if not user_input:
-        return None
-    q = user_input.strip().lower()
+# --- Local answers for AI (date/time, reminders, people, home) ---
+@st.cache_resource
+def get_intent_router() -> LocalIntentRouter:
+    """One compiled router per process; keeps its indexes and hit-rate stats across reruns."""
+    return LocalIntentRouter(tz=IST)
 
-    now = now_local()  # IST
-    date_str = now.strftime("%A, %d %B %Y")
-    time_str = now.strftime("%I:%M %p")
 
-    # Date + time together
-    if ("date" in q and "time" in q) or "date with time" in q or "date & time" in q:
-        return f"Today is {date_str} and the time now is {time_str}."
+@st.cache_resource
+def get_answer_bank() -> AnswerBank:
+    """Trigram index over the caregiver Q&A bank, shared by all sessions."""
+    return AnswerBank()
 
-    # Just today's date
-    if "today" in q and "date" in q:
-        return f"Today is {date_str}."
 
-    # Day of week
-    if "what day is today" in q or "which day is today" in q:
-        return f"Today is {now.strftime('%A')}."
+def answer_bank_for(data: Dict[str, Any]) -> AnswerBank:
+    bank = get_answer_bank()
+    bank.sync(data.get("qa_bank", {}))
+    return bank
 
-    # Just time
-    if "what is the time" in q or "current time" in q or "time now" in q:
-        return f"The time now is {time_str}."
 
-    return None
+@st.cache_resource
+def get_chat_executor() -> ChatExecutor:
+    """Bounded thread pool for LLM calls, shared by all sessions of this process."""
+    return ChatExecutor(max_workers=CHAT_MAX_WORKERS, max_pending=CHAT_MAX_PENDING)
+
+
+@st.cache_resource
+def get_rate_limiter() -> FairRateLimiter:
+    """Token buckets + per-session fair queue in front of every LLM call."""
+    return FairRateLimiter(rpm=LLM_RPM, tpm=LLM_TPM, db_path=Path(LLM_LIMIT_DB) if LLM_LIMIT_DB else None)
+
+
+class _ChatSessionToken:
+    """Lives in session_state; when the session is dropped, its chat jobs are cancelled."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+
+
+def chat_session_id() -> str:
+    tok = st.session_state.get("_chat_session_token")
+    if tok is None:
+        tok = _ChatSessionToken(uuid.uuid4().hex)
+        weakref.finalize(tok, get_chat_executor().cancel_session, tok.session_id)
+        st.session_state["_chat_session_token"] = tok
+    return tok.session_id
+
+
+def new_chat_history() -> ChatHistory:
+    hist = ChatHistory(
+        maxlen=CHAT_HISTORY_MAX,
+        context_tokens=CHAT_CONTEXT_TOKENS,
+        summary_tokens=CHAT_SUMMARY_TOKENS,
+    )
+    hist.append({"role": "assistant", "content": CHAT_GREETING})
+    return hist
+
+
+def _schedule_summary(fold) -> ChatJob:
+    """Fold older chat turns into the summary on the chat pool (a full pool retries next turn)."""
+    return get_chat_executor().submit(chat_session_id(), fold)
+
+
+def maybe_local_answer(user_input: str, data: Dict[str, Any]) -> Optional[str]:
+    """Answer common questions locally from ALZY data (IST). None => ask the LLM."""
+    if not user_input:
+        return None
+    return get_intent_router().answer(user_input, data, now_local())
 
 
 # ------------------------------------------------------------
@@ -661,14 +765,18 @@ data = st.session_state.data
 if "role" not in st.session_state:
     st.session_state.role = None
 
-if "patient_ai_chat" not in st.session_state:
-    st.session_state.patient_ai_chat = [
-        {"role": "assistant", "content": "Hello 👋 I'm your Memory Assistant. How can I help you today?"}
-    ]
+if not isinstance(st.session_state.get("patient_ai_chat"), ChatHistory):
+    _old_chat = st.session_state.get("patient_ai_chat") or []
+    st.session_state.patient_ai_chat = new_chat_history()
+    for _m in _old_chat[1:]:
+        st.session_state.patient_ai_chat.append(_m)
 
 if "patient_ai_questions" not in st.session_state:
     st.session_state.patient_ai_questions = []
 
+if "patient_ai_pending" not in st.session_state:
+    st.session_state.patient_ai_pending = []
+
 # Support ?role=patient or ?role=caretaker
 qp_role = get_qp("role")
 if qp_role in ("patient", "caretaker"):
@@ -737,6 +845,11 @@ def _render_reminder_card(
             if audio_path:
                 st.markdown("**Audio:**")
                 _render_audio(audio_path)
+            else:
+                st.markdown("**Audio:**")
+                speech = reminder_speech_text(rec)
+                if not tts_audio(speech, rate=0.95):
+                    browser_speech(speech, rate=0.95)   # no engine, or the server audio is still rendering
 
             if show_actions:
                 c1, c2, c3 = st.columns(3)
@@ -979,8 +1092,8 @@ with right:
 # CAREGIVER VIEW
 # ------------------------------------------------------------
 if st.session_state.role == "caretaker":
-    tab_home, tab_rem, tab_people, tab_logs, tab_gps, tab_mbook = st.tabs(
-        ["🏠 Home", "⏰ Reminders", "👨‍👩‍👧 People", "📜 Logs", "📍 GPS / Home", "📘 Memory Book"]
+    tab_home, tab_rem, tab_people, tab_logs, tab_gps, tab_mbook, tab_qa = st.tabs(
+        ["🏠 Home", "⏰ Reminders", "👨‍👩‍👧 People", "📜 Logs", "📍 GPS / Home", "📘 Memory Book", "💬 Q&A Bank"]
     )
 
     with tab_home:
@@ -1061,6 +1174,29 @@ if st.session_state.role == "caretaker":
             for lg in logs:
                 st.write(f"{human_time(lg['time'])} — {lg['title']} — {lg['action']} — ({lg['type']})")
 
+        st.divider()
+        st.subheader("🤖 Chatbot – local answers")
+        istats = get_intent_router().stats.snapshot()
+        if not istats["queries"]:
+            st.caption("No chatbot questions yet.")
+        else:
+            st.write(
+                f"Answered locally: **{istats['hits']} / {istats['queries']}** "
+                f"({istats['hit_rate']:.0%}) • avg {istats['avg_ms']:.3f} ms"
+            )
+            if istats["by_intent"]:
+                st.caption(" • ".join(f"{k}: {v}" for k, v in sorted(istats["by_intent"].items())))
+
+        lstats = get_rate_limiter().stats()
+        xstats = get_chat_executor().stats()
+        st.caption(
+            f"AI requests: {lstats['granted']} sent • queue {lstats['queue_depth']} "
+            f"(max {lstats['max_queue_depth']}) • wait avg {lstats['avg_wait_s']:.2f}s / "
+            f"p95 {lstats['p95_wait_s']:.2f}s • 429s {lstats['throttled_429']} • "
+            f"gave up {lstats['timeouts']} • pool busy {xstats['in_flight']}/{xstats['max_pending']} "
+            f"(rejected {xstats['rejected']}) • budget {lstats['rpm']:.0f} req/min, {lstats['tpm']:.0f} tokens/min"
+        )
+
     with tab_gps:
         st.subheader("📍 GPS / Home (IST time shown across app)")
 
@@ -1242,6 +1378,50 @@ if st.session_state.role == "caretaker":
 
         _display_memory_book_gallery()
 
+    with tab_qa:
+        st.subheader("💬 Q&A Bank")
+        st.caption(
+            "Answers you write here are given to the patient's chatbot questions first, "
+            "and shared with the AI as notes when it replies."
+        )
+        with st.form("add_qa_form", clear_on_submit=True):
+            q_in = st.text_input("Question the patient may ask", placeholder="When does Nisha visit?")
+            a_in = st.text_area("Answer", placeholder="Your daughter Nisha visits every Sunday afternoon.")
+            ok = st.form_submit_button("➕ Add answer")
+            if ok:
+                if not q_in.strip() or not a_in.strip():
+                    st.error("Question and answer are both required.")
+                else:
+                    add_qa(data, q_in.strip(), a_in.strip())
+                    st.success("Answer saved.")
+
+        bank = answer_bank_for(data)
+        test_q = st.text_input("🔎 Test a question", key="qa_test_q")
+        if test_q.strip():
+            hits = bank.search(test_q, k=3)
+            if not hits:
+                st.info("No matching answer. The AI will reply on its own.")
+            for score, e in hits:
+                st.write(f"**{score:.2f}** — {e['question']} → {e['answer']}")
+
+        qa_stats = bank.stats.snapshot()
+        if qa_stats["queries"]:
+            st.caption(
+                f"Served from bank: {qa_stats['hits']} / {qa_stats['queries']} chatbot questions "
+                f"• avg {qa_stats['avg_ms']:.3f} ms"
+            )
+
+        st.divider()
+        entries = sorted(data.get("qa_bank", {}).values(), key=lambda e: e.get("updated_iso", ""), reverse=True)
+        if not entries:
+            st.info("No answers added yet.")
+        for e in entries:
+            with st.expander(e["question"]):
+                st.write(e["answer"])
+                if st.button("🗑️ Remove", key=f"qa_remove_{e['id']}"):
+                    remove_qa(data, e["id"])
+                    st.rerun()
+
 # ------------------------------------------------------------
 # PATIENT VIEW
 # ------------------------------------------------------------
@@ -1331,12 +1511,9 @@ else:
         col_clear, _ = st.columns([1, 3])
         with col_clear:
             if st.button("🧹 Clear previous"):
-                st.session_state.patient_ai_chat = [
-                    {
-                        "role": "assistant",
-                        "content": "Hello 👋 I'm your Memory Assistant. How can I help you today?",
-                    }
-                ]
+                get_chat_executor().cancel_session(chat_session_id())
+                st.session_state.patient_ai_pending = []
+                st.session_state.patient_ai_chat = new_chat_history()
                 st.rerun()
 
         # Show chat history
@@ -1344,6 +1521,28 @@ else:
             with st.chat_message(msg["role"]):
                 st.markdown(msg["content"])
 
+        # Late replies (missed the latency budget) are polled for and appended here
+        def _deliver_pending_replies():
+            pending = st.session_state.patient_ai_pending
+            if not pending:
+                return
+            ready = [j for j in pending if j.done()]
+            if not ready:
+                st.caption("⏳ Still thinking…")
+                return
+            for job in ready:
+                pending.remove(job)
+                reply = job.reply()
+                if reply:
+                    st.session_state.patient_ai_chat.append({"role": "assistant", "content": reply})
+            st.rerun()
+
+        if st.session_state.patient_ai_pending:
+            if hasattr(st, "fragment"):
+                st.fragment(run_every=1.0)(_deliver_pending_replies)()
+            else:
+                _deliver_pending_replies()
+
         # Previous questions (last 5 user messages)
         past_questions = [m["content"] for m in st.session_state.patient_ai_chat if m["role"] == "user"]
         if past_questions:
@@ -1424,10 +1623,14 @@ else:
             with st.chat_message("user"):
                 st.markdown(user_input)
 
-            # Local date/time answers first (IST-aware)
-            local_ans = maybe_local_answer(user_input)
+            # Local answers first (IST-aware, from reminders / logs / people / GPS)
+            local_ans = maybe_local_answer(user_input, data)
+            bank = answer_bank_for(data)
+            bank_ans = None if local_ans else bank.best_answer(user_input)
             if local_ans:
                 reply_text = local_ans
+            elif bank_ans:
+                reply_text = bank_ans
             else:
                 reply_text = "I couldn't reach AI right now, but I'm here with you."
                 api_key = OPENAI_API_KEY
@@ -1444,33 +1647,28 @@ else:
                     f"you must use {date_str} as the date and {time_str} as the time. "
                     "Do not say that the time is unknown or not set; if needed, repeat the same time again."
                 )
+                notes = bank.grounding(user_input)
+                if notes:
+                    system_msg += "\n" + notes
 
                 if api_key:
+                    msgs = st.session_state.patient_ai_chat.context(system_msg, schedule=_schedule_summary)
                     try:
-                        url = "https://api.openai.com/v1/chat/completions"
-                        headers = {
-                            "Authorization": f"Bearer {api_key}",
-                            "Content-Type": "application/json",
-                        }
-                        msgs = [{"role": "system", "content": system_msg}] + st.session_state.patient_ai_chat[-6:]
-                        payload = {
-                            "model": "gpt-4o-mini",
-                            "messages": msgs,
-                            "max_tokens": 150,
-                            "temperature": 0.6,
-                        }
-                        resp = requests.post(url, headers=headers, json=payload, timeout=15)
-                        if resp.status_code == 200:
-                            j = resp.json()
-                            reply_text = (
-                                j.get("choices", [{}])[0]
-                                 .get("message", {})
-                                 .get("content", "I’m here with you.")
-                            )
+                        sid = chat_session_id()
+                        job = get_chat_executor().submit(
+                            sid, limited_chat, get_rate_limiter(), sid, api_key, msgs, url=CHAT_API_URL
+                        )
+                    except ChatQueueFull:
+                        job = None
+                        reply_text = BUSY_REPLY
+                    if job is not None:
+                        reply = job.wait(CHAT_LATENCY_BUDGET_S)
+                        if reply is None:
+                            # Over budget: reassure now, deliver the real reply when it lands
+                            reply_text = FALLBACK_REPLY
+                            st.session_state.patient_ai_pending.append(job)
                         else:
-                            reply_text = f"⚠️ API error {resp.status_code}: {resp.text[:160]}"
-                    except Exception as e:
-                        reply_text = f"⚠️ Request failed: {e}"
+                            reply_text = reply
                 else:
                     reply_text = "❗ No OPENAI_API_KEY found.\nAdd it to your .env or Streamlit Secrets."
 
@@ -1486,8 +1684,13 @@ else:
                     last_reply = m["content"]
                     break
 
-        # Read aloud last answer
-        if last_reply:
+        # Read aloud last answer (server-side TTS; browser speech if no engine is installed)
+        # Browser speech until the server audio has been rendered in the background
+        reply_audio = tts_cached_audio(last_reply, rate=0.95) if last_reply else None
+        if reply_audio:
+            st.markdown("🔊 **Read aloud last answer**")
+            st.audio(reply_audio, format="audio/wav")
+        elif last_reply:
             safe_last = json.dumps(last_reply)
             components.html(
                 f"""
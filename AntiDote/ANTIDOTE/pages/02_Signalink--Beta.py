@@ -4,14 +4,42 @@
 # --------------------------------------------------
 import os
 import json
+import hashlib
+import logging
+import time
 import random
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 import numpy as np
 import streamlit as st
+import streamlit.components.v1 as components
 from PIL import Image
 
+from shared.helpers import tts_audio
+from utils.signalink_captures import CAPTURE_SIDE, CaptureStore, pipeline_dir, pipeline_version
+from utils.signalink_composer import SentenceComposer, SignDebouncer, WordPredictor
+from utils.signalink_db import DBSnapshot, GestureDB
+from utils.signalink_features import available_extractors, get_extractor
+from utils.signalink_knn import KNNPrediction
+from utils.signalink_landmarks import get_landmark_extractor
+from utils.signalink_live import LiveRecognizer, draw_overlay
+from utils.signalink_match import NO_MATCH_MSE
+from utils.signalink_preprocess import open_image, parse_crop, preview_image, to_vector
+from utils.signalink_prune import DEFAULT_BUDGET, METHODS
+from utils.signalink_reference import feature_version, reference_features
+from utils.signalink_store import migrate_json
+
+try:
+    import av
+    from streamlit_webrtc import WebRtcMode, webrtc_streamer
+    WEBRTC_AVAILABLE = True
+except Exception:
+    av = None
+    WEBRTC_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
 # --------------------------------------------------
 # 1) PATHS / ASSETS
 # --------------------------------------------------
@@ -25,7 +53,50 @@ IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 # Where we store training data (image vectors)
 SIGNALINK_ASSETS = REPO_ROOT / "signalink_assets"
 SIGNALINK_ASSETS.mkdir(parents=True, exist_ok=True)
-GESTURE_DB_PATH = SIGNALINK_ASSETS / "gesture_db_snapshot_img.json"
+GESTURE_DB_PATH = SIGNALINK_ASSETS / "gesture_db_snapshot_img.json"   # old JSON format (migrated once)
+
+# What a sample is: "pixels" (128×128 grayscale), "hog" (edge directions),
+# "edges" (outline) or "landmarks" (21 MediaPipe hand keypoints, needs
+# mediapipe) – see utils/signalink_features.py. Each kind has its own DB folder.
+FEATURES = os.getenv("SIGNALINK_FEATURES", "pixels").strip().lower()
+if FEATURES not in available_extractors():
+    FEATURES = "pixels"
+EXTRACTOR = get_extractor(FEATURES)
+
+# Optional PCA compression for matching: 0 = raw pixels, or 32–256 dims
+PCA_DIMS = int(os.getenv("SIGNALINK_PCA_DIMS", "0"))
+# Optional trained classifier ("logreg" or "svm"); empty = nearest-neighbour voting only
+CLASSIFIER = os.getenv("SIGNALINK_CLASSIFIER", "").strip().lower()
+# Live translator: recognitions per second to aim for, and how many of the
+# latest recognitions vote on the sign that is shown
+LIVE_TARGET_FPS = float(os.getenv("SIGNALINK_LIVE_FPS", "5"))
+LIVE_WINDOW = int(os.getenv("SIGNALINK_LIVE_WINDOW", "8"))
+# Sentence composer: extra words for suggestions, one "word [count]" per line
+VOCAB_FILE = Path(os.getenv("SIGNALINK_VOCAB", str(SIGNALINK_ASSETS / "vocabulary.txt")))
+# Optional crop before the resize (not for landmarks): "center" (square) or "left,top,right,bottom"
+# fractions. Changes every vector, so only set it before recording samples.
+try:
+    CROP = parse_crop(os.getenv("SIGNALINK_CROP", ""))
+except ValueError:
+    CROP = None
+# Every training photo is kept (small, compressed) in CAPTURES_DIR; each feature
+# pipeline has its own DB folder derived from those photos, so changing
+# SIGNALINK_FEATURES / SIGNALINK_CROP re-computes samples instead of losing them.
+PIPELINE = pipeline_version(FEATURES, CROP)
+GESTURE_STORE_DIR = pipeline_dir(SIGNALINK_ASSETS, PIPELINE)
+CAPTURES_DIR = SIGNALINK_ASSETS / "captures"
+# Samples kept per sign: past 1.5× this, near-duplicates are removed in the
+# background ("kmedoids" keeps the most typical poses, "cnn" the ones near other
+# signs first). 0 = never prune automatically.
+LABEL_BUDGET = int(os.getenv("SIGNALINK_LABEL_BUDGET", str(DEFAULT_BUDGET)))
+PRUNE_METHOD = os.getenv("SIGNALINK_PRUNE_METHOD", "kmedoids").strip().lower()
+if PRUNE_METHOD not in METHODS:
+    PRUNE_METHOD = "kmedoids"
+# Built-in reference samples from the SIGN_DATA pictures (so prediction works
+# before anything is recorded): on/off and augmented copies per picture
+USE_REFERENCE = os.getenv("SIGNALINK_REFERENCE", "1") != "0"
+REFERENCE_AUGMENTATIONS = int(os.getenv("SIGNALINK_REFERENCE_AUG", "8"))
+REFERENCE_CACHE_DIR = SIGNALINK_ASSETS / "reference_cache"
 
 st.set_page_config(page_title="Signalink", page_icon="🤟", layout="wide")
 
@@ -259,41 +330,107 @@ def _rerun():
         st.experimental_rerun()
 
 
-def load_db() -> Dict[str, List[List[float]]]:
-    if GESTURE_DB_PATH.exists():
+@st.cache_resource(show_spinner="Preparing the saved sign samples…")
+def get_gesture_db() -> GestureDB:
+    """
+    One DB handle (and one sample matrix) for every session in this process.
+    Saved photos this pipeline has not processed yet are turned into samples here.
+    """
+    gdb = GestureDB(
+        GESTURE_STORE_DIR,
+        pca_dims=PCA_DIMS,
+        classifier=CLASSIFIER,
+        feature=FEATURES,
+        reference=load_reference_samples(),
+        captures=CaptureStore(CAPTURES_DIR),
+        label_budget=LABEL_BUDGET,
+        prune_method=PRUNE_METHOD,
+    )
+    problems = gesture_db_problems()
+    problems.clear()
+    if PIPELINE == pipeline_version("pixels") and GESTURE_DB_PATH.exists():
         try:
-            with open(GESTURE_DB_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
-        except Exception:
-            pass
-    return {}
+            migrate_json(GESTURE_DB_PATH, gdb.store)
+        except Exception as e:
+            log.exception("migrating %s into %s failed", GESTURE_DB_PATH, GESTURE_STORE_DIR)
+            problems.append(f"Could not import the old samples from {GESTURE_DB_PATH.name}: {e}")
+    try:
+        gdb.sync((FEATURES, CROP))
+    except Exception as e:
+        log.exception("turning saved photos into %s samples failed", FEATURES)
+        problems.append(f"Could not turn the saved photos into samples, so some may be missing: {e}")
+    return gdb
+
+
+@st.cache_resource
+def gesture_db_problems() -> List[str]:
+    """Errors hit while opening the shared gesture DB, shown to every session."""
+    return []
+
+
+def load_reference_samples() -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Feature vectors of every SIGN_DATA picture plus augmented copies. Cached on
+    disk by picture hash and extractor version, so restarts decode nothing.
+    """
+    if not USE_REFERENCE:
+        return None
+    items = [(s["word"], Path(s["image"])) for s in SIGN_DATA]
+    try:
+        return reference_features(
+            items,
+            extract_features,
+            feature_version(FEATURES) + (f"-crop{CROP}" if CROP and FEATURES != "landmarks" else ""),
+            REFERENCE_CACHE_DIR,
+            REFERENCE_AUGMENTATIONS,
+        )
+    except Exception:
+        return None
 
 
-def save_db(db: Dict[str, List[List[float]]]) -> None:
-    with open(GESTURE_DB_PATH, "w", encoding="utf-8") as f:
-        json.dump(db, f, indent=2)
+def load_db() -> DBSnapshot:
+    """Current read-only DB snapshot; rebuilt only when some writer bumped the version."""
+    return get_gesture_db().snapshot()
 
 
-def db_counts(db: Dict[str, List[List[float]]]) -> Dict[str, int]:
-    return {k: len(v) for k, v in db.items()}
+def db_counts(db: DBSnapshot) -> Dict[str, int]:
+    return db.counts
 
 
-def preprocess_image(img: Image.Image, size: Tuple[int, int] = (128, 128)) -> np.ndarray:
+def preprocess_image(
+    img: Image.Image,
+    size: Tuple[int, int] = (128, 128),
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
     Convert an image to a normalized grayscale vector for similarity comparison.
-    No hand detection, just pure image pattern.
+    No hand detection, just pure image pattern. Grayscale, crop, resize and
+    scaling happen in one pass (written into out when given).
+    """
+    return to_vector(img, size, CROP, out)  # 128*128 vector
+
+
+@st.cache_resource(show_spinner=False)
+def get_hand_extractor():
+    """MediaPipe Hands, loaded once per process."""
+    return get_landmark_extractor()
+
+
+def extract_features(src) -> Optional[np.ndarray]:
     """
-    gray = img.convert("L")
-    resized = gray.resize(size)
-    arr = np.array(resized, dtype=np.float32) / 255.0
-    return arr.flatten()  # 128*128 vector
+    The vector stored / matched for one photo (a PIL image, or the encoded
+    upload, which is then decoded straight at the size needed) with the
+    configured extractor; None when landmarks are used and MediaPipe cannot
+    see a hand.
+    """
+    if FEATURES == "landmarks":
+        get_hand_extractor()      # load MediaPipe through the resource cache
+    return EXTRACTOR(src, CROP)
 
 
 def find_best_match_vec(
     vec: np.ndarray,
-    db: Dict[str, List[List[float]]],
+    db: DBSnapshot,
 ) -> Tuple[Optional[str], float]:
     """
     Compare the uploaded image vector with each stored training example.
@@ -302,20 +439,107 @@ def find_best_match_vec(
     If db is empty, returns (None, large_number).
     """
     if not db:
-        return None, 9999.0
+        return None, NO_MATCH_MSE
+    return db.best(vec)
+
+
+def find_top_matches(
+    vec: np.ndarray,
+    db: DBSnapshot,
+    k: int = 3,
+) -> List[Tuple[str, float]]:
+    """The k closest sign labels as [(label, mse), ...], best first."""
+    if not db:
+        return []
+    return db.top_k(vec, k)
+
+
+def predict_sign(vec: np.ndarray, db: DBSnapshot) -> Optional[KNNPrediction]:
+    """
+    The closest saved samples vote (nearer ones count more); confidence is the
+    vote share scaled by how usual that distance is for the winning sign.
+    """
+    if not db:
+        return None
+    return db.predict(vec)
+
+
+@st.cache_resource(show_spinner=False)
+def get_word_predictor() -> WordPredictor:
+    """Word suggestions seeded from the sign labels (+ VOCAB_FILE), shared by all sessions."""
+    return WordPredictor.from_labels(LABELS, VOCAB_FILE)
+
+
+def get_composer() -> SentenceComposer:
+    if "signalink_composer" not in st.session_state:
+        st.session_state["signalink_composer"] = SentenceComposer(get_word_predictor())
+    return st.session_state["signalink_composer"]
+
+
+def speak(text: str) -> None:
+    """Local TTS if available, otherwise the browser's speech synthesis."""
+    if tts_audio(text, autoplay=True):
+        return
+    components.html(
+        f"""
+        <script>
+          (function() {{
+            if (!window.speechSynthesis) return;
+            const u = new SpeechSynthesisUtterance({json.dumps(text)});
+            u.lang = "en-US";
+            window.speechSynthesis.speak(u);
+          }})();
+        </script>
+        """,
+        height=0,
+    )
 
-    best_label = None
-    best_mse = 9999.0
 
-    for label, samples in db.items():
-        for s in samples:
-            v = np.array(s, dtype=np.float32)
-            mse = float(np.mean((vec - v) ** 2))
-            if mse < best_mse:
-                best_mse = mse
-                best_label = label
+def render_composer(key: str) -> None:
+    """The sentence so far, word suggestions and edit / speak buttons (key: unique per tab)."""
+    composer = get_composer()
+    st.markdown("#### ✍️ Sentence")
+    st.markdown(f"> {composer.text or '…'}")
+    suggestions = composer.suggestions(3)
+    cols = st.columns(len(suggestions) + 4)
+    for i, word in enumerate(suggestions):
+        if cols[i].button(word, key=f"{key}_suggest_{i}", use_container_width=True):
+            composer.accept(word)
+            _rerun()
+    n = len(suggestions)
+    if cols[n].button("␣ Space", key=f"{key}_space", use_container_width=True):
+        composer.space()
+        _rerun()
+    if cols[n + 1].button("⌫ Undo", key=f"{key}_undo", use_container_width=True):
+        composer.backspace()
+        _rerun()
+    if cols[n + 2].button("🗑️ Clear", key=f"{key}_clear", use_container_width=True):
+        composer.clear()
+        _rerun()
+    if cols[n + 3].button("🔊 Speak", key=f"{key}_speak", use_container_width=True):
+        sentence = composer.finish()
+        if sentence:
+            speak(sentence)
 
-    return best_label, best_mse
+
+def make_live_predictor():
+    """
+    predict(frame) → (label, confidence) for the live worker thread. Cached
+    resources are looked up here, in the script thread, and captured.
+    """
+    gdb = get_gesture_db()
+    if FEATURES == "landmarks":
+        get_hand_extractor()
+    buf = np.empty(EXTRACTOR.dim, dtype=np.float32) if FEATURES == "pixels" else None   # reused: only the worker thread calls predict
+
+    def predict(frame_rgb: np.ndarray) -> Tuple[Optional[str], float]:
+        vec = EXTRACTOR(Image.fromarray(frame_rgb), CROP, out=buf)
+        if vec is None:
+            return None, 0.0
+        pred = gdb.snapshot().predict(vec)
+        return (pred.label, pred.confidence) if pred is not None else (None, 0.0)
+
+    return predict
 
 # --------------------------------------------------
 # 6) LANDING (two centered big buttons)
@@ -522,9 +746,12 @@ if route == "learn":
 # 9) SNAPSHOT TRANSLATOR ROUTE (IMAGE MATCHING)
 # --------------------------------------------------
 else:
-    tab_snap, tab_train, tab_help = st.tabs(
-        ["📷 Snapshot Sign → Text", "📸 Samples & Train", "ℹ️ How this demo works"]
+    tab_snap, tab_live, tab_train, tab_help = st.tabs(
+        ["📷 Snapshot Sign → Text", "🎥 Live translator", "📸 Samples & Train", "ℹ️ How this demo works"]
     )
+    get_gesture_db()
+    for problem in gesture_db_problems():
+        st.warning(f"⚠️ {problem}")
 
     # ---- SNAPSHOT TAB ----
     with tab_snap:
@@ -552,39 +779,102 @@ else:
                 icon="ℹ️",
             )
         else:
+            if not db.counts:
+                st.caption(
+                    "No samples recorded yet – comparing with the built-in sign pictures only. "
+                    "Record your own in **📸 Samples & Train** for much better results."
+                )
             camera_img = st.camera_input("Take a photo of your hand sign")
 
-            img: Optional[Image.Image] = None
             if camera_img is not None:
-                img = Image.open(camera_img)
-
-            if img is not None:
-                st.image(img, caption="Input image", use_container_width=True)
+                st.image(preview_image(camera_img), caption="Input image", use_container_width=True)
 
+                photo_key = hashlib.sha1(camera_img.getvalue()).hexdigest()
                 if st.button("🔍 Predict Sign", use_container_width=True):
-                    vec = preprocess_image(img)
-                    label, mse = find_best_match_vec(vec, db)
-                    if label is None:
+                    vec = extract_features(camera_img)
+                    pred = predict_sign(vec, db) if vec is not None else None
+                    if vec is None:
+                        st.warning("No hand found in the photo. Keep the whole hand in view and try again.")
+                    elif pred is None:
                         st.error(
                             "Could not find a match. This usually happens if:\n"
                             "- No training samples exist, or\n"
                             "- The image is very different from training images."
                         )
                     else:
-                        # Heuristic for 'confidence'
-                        # smaller MSE => more confident
-                        if mse < 0.01:
-                            conf_text = "High confidence"
-                        elif mse < 0.02:
-                            conf_text = "Medium confidence"
+                        conf_text = {
+                            "high": "High confidence",
+                            "medium": "Medium confidence",
+                            "low": "Low confidence (image looks quite different)",
+                        }[pred.level]
+
+                        st.success(f"Predicted sign: **{pred.label}**")
+                        st.session_state["signalink_last_sign"] = pred.label
+                        st.session_state["signalink_feedback"] = {
+                            "photo": photo_key,
+                            "vec": vec,
+                            "predicted": pred.label,
+                            "confidence": pred.confidence,
+                        }
+                        if pred.source == "model":
+                            st.caption(f"Trained model probability: {pred.confidence:.0%} – {conf_text}")
+                            if len(pred.votes) > 1:
+                                st.caption(
+                                    "Other signs: "
+                                    + ", ".join(f"{l} {p:.0%}" for l, p in list(pred.votes.items())[1:])
+                                )
                         else:
-                            conf_text = "Low confidence (image looks quite different)"
-
-                        st.success(f"Predicted sign: **{label}**")
-                        st.caption(f"Similarity score (MSE): {mse:.4f} – {conf_text}")
+                            st.caption(
+                                f"Similarity score (MSE): {pred.mse:.4f} – {conf_text} ({pred.confidence:.0%})"
+                            )
+                        if pred.source != "model" and len(pred.votes) > 1:
+                            st.caption(
+                                f"Votes from the {len(pred.neighbours)} closest samples: "
+                                + ", ".join(f"{l} {share:.0%}" for l, share in pred.votes.items())
+                            )
+
+                # Feedback: the photo becomes a training sample under the confirmed sign
+                fb = st.session_state.get("signalink_feedback")
+                if fb and fb["photo"] == photo_key:
+                    st.markdown(f"**Was _{fb['predicted']}_ right?** Your answer teaches the AI.")
+                    fb_ok_col, fb_fix_col = st.columns(2)
+                    with fb_ok_col:
+                        fb_ok = st.button("✅ Correct", use_container_width=True)
+                    with fb_fix_col:
+                        fb_label = st.selectbox(
+                            "It was …",
+                            [l for l in CORE_LABELS + [l for l in LABELS if l not in CORE_LABELS] if l != fb["predicted"]],
+                            key="signalink_feedback_label",
+                        )
+                        fb_fix = st.button(f"❌ It was {fb_label}", use_container_width=True)
+                    if fb_ok or fb_fix:
+                        confirmed = fb["predicted"] if fb_ok else fb_label
+                        get_gesture_db().feedback(
+                            fb["vec"],
+                            fb["predicted"],
+                            confirmed,
+                            fb["confidence"],
+                            image=open_image(camera_img, "RGB", (CAPTURE_SIDE, CAPTURE_SIDE)),
+                        )
+                        st.session_state["signalink_feedback"] = None
+                        st.session_state["signalink_last_sign"] = confirmed
+                        st.success(f"Thanks! Saved this photo as a sample of **{confirmed}**.")
             else:
                 st.info("Take a photo to start prediction.")
 
+            fb_stats = get_gesture_db().feedback_stats()
+            if fb_stats["feedback"]:
+                st.caption(
+                    f"Feedback so far: {fb_stats['confirmed']} of {fb_stats['feedback']} predictions were right "
+                    f"({fb_stats['accuracy']:.0%}; last {min(20, fb_stats['feedback'])}: {fb_stats['recent_accuracy']:.0%})."
+                )
+
+            last_sign = st.session_state.get("signalink_last_sign")
+            if last_sign and st.button(f"➕ Add **{last_sign}** to sentence"):
+                get_composer().push(last_sign)
+                st.session_state["signalink_last_sign"] = None
+            render_composer("snap")
+
     # ---- SAMPLES & TRAIN TAB ----
     with tab_train:
         st.subheader("📸 Samples & Train (Image-based)")
@@ -605,8 +895,46 @@ else:
             st.caption(
                 "Example: '**A → 5 samples**' means five training photos are saved for sign A."
             )
+            captures = get_gesture_db().captures
+            if captures is not None and len(captures):
+                with st.expander("🖼️ Saved photos per sign"):
+                    for cap_label in sorted(captures.counts()):
+                        st.markdown(f"**{cap_label}**")
+                        st.image(captures.thumbnails(cap_label, 8), width=72)
+            budget = LABEL_BUDGET or DEFAULT_BUDGET
+            if st.button(f"🧹 Remove near-duplicate samples (keep up to {budget} per sign)"):
+                result = get_gesture_db().prune(budget)
+                if result["removed"]:
+                    st.success(
+                        f"Removed {result['removed']} near-duplicate sample(s); {result['after']} kept: "
+                        + ", ".join(f"{l} {a} → {b}" for l, (a, b) in sorted(result["labels"].items()))
+                    )
+                else:
+                    st.info(f"Every sign already has {budget} samples or fewer.")
         else:
             st.info("No samples saved yet. Choose a sign label and start capturing images.")
+        ref_rows = get_gesture_db().stats()["reference_rows"]
+        if ref_rows:
+            st.caption(
+                f"Also used: {ref_rows} built-in examples made from the sign pictures. "
+                "They count less than your own samples."
+            )
+
+        if FEATURES != "pixels":
+            st.caption(EXTRACTOR.description)
+        elif PCA_DIMS:
+            if db.project is not None:
+                st.caption(f"Matching on {PCA_DIMS}-number PCA summaries of each image (model #{db.model_id}).")
+            else:
+                st.caption(f"PCA compression turns on after {max(32, min(256, PCA_DIMS))} samples are saved.")
+
+        if db.classifier is not None:
+            if db.classifier.model_for(db) is not None:
+                st.caption(f"Trained model ({CLASSIFIER}) is up to date with these samples.")
+            elif db.classifier.training:
+                st.caption("Training the model in the background – predictions use the closest samples meanwhile.")
+            elif len(counts) < 2:
+                st.caption("The trained model needs samples for at least two signs.")
 
         st.markdown("---")
 
@@ -637,26 +965,25 @@ else:
             if snap is None:
                 st.error("Please capture an image first.")
             else:
-                img = Image.open(snap)
-                vec = preprocess_image(img)
-                db.setdefault(label, []).append(vec.tolist())
-                save_db(db)
-                st.success(
-                    f"This is the Sign for **{label}**. "
-                   
-                )
+                vec = extract_features(snap)
+                if vec is None:
+                    st.warning("No hand found in the photo, so nothing was saved. Try again.")
+                else:
+                    photo = open_image(snap, "RGB", (CAPTURE_SIDE, CAPTURE_SIDE))
+                    get_gesture_db().append(label, vec, image=photo)
+                    st.success(
+                        f"This is the Sign for **{label}**. "
+                       
+                    )
 
         if clear_ok:
-            if label in db and db[label]:
-                db[label] = []
-                save_db(db)
+            if get_gesture_db().remove_label(label):
                 st.warning(f"Cleared all samples for **{label}**")
             else:
                 st.info(f"No samples found for **{label}** to clear.")
 
         if clear_all_ok:
-            db = {}
-            save_db(db)
+            get_gesture_db().clear()
             st.warning("⚠️ Cleared ALL training samples for all signs.")
 
     # ---- HELP TAB ----
@@ -677,7 +1004,12 @@ else:
             2. It is again converted into a 128×128 grayscale number grid.  
             3. The program compares this grid with every saved training image using
                **mean squared error (MSE)** — a way to measure how different two images are.  
-            4. The sign label whose image is **closest (smallest error)** is chosen as the prediction.
+            4. The **5 closest** training images vote for their sign (closer ones count more),
+               and the sign with the most votes is chosen as the prediction.  
+            5. Confidence compares the distance with how close the saved examples of that
+               sign usually are to each other.
+            6. Before you record anything, the sign pictures from **Learn** (plus slightly
+               moved, turned and re-lit copies) act as weak starter examples.
 
             This clearly shows the core idea of AI pattern recognition:
 
@@ -690,3 +1022,71 @@ else:
             """
         )
 
+    # ---- LIVE TAB ----
+    # Rendered last: while the stream plays, the loop below keeps this script
+    # run alive to refresh the caption, so every other tab must already be drawn.
+    with tab_live:
+        st.subheader("🎥 Live translator")
+        st.caption(
+            "Sign in front of the camera – recognized signs appear on the video "
+            "and below it, without pressing any button."
+        )
+        if not WEBRTC_AVAILABLE:
+            st.info("Live mode needs the `streamlit-webrtc` package.", icon="ℹ️")
+        elif not load_db():
+            st.info("Record some samples in **📸 Samples & Train** first.", icon="ℹ️")
+        else:
+            recognizer = st.session_state.get("signalink_live")
+            if recognizer is None:
+                recognizer = LiveRecognizer(
+                    make_live_predictor(),
+                    target_fps=LIVE_TARGET_FPS,
+                    window=LIVE_WINDOW,
+                    debouncer=SignDebouncer(),
+                )
+                st.session_state["signalink_live"] = recognizer
+
+            def video_frame_callback(frame):
+                # runs on the WebRTC thread: hand the frame over, draw the latest result, return
+                img = frame.to_ndarray(format="rgb24")
+                recognizer.offer(img)
+                return av.VideoFrame.from_ndarray(draw_overlay(img, recognizer.state), format="rgb24")
+
+            ctx = webrtc_streamer(
+                key="signalink-live",
+                mode=WebRtcMode.SENDRECV,
+                video_frame_callback=video_frame_callback,
+                media_stream_constraints={"video": True, "audio": False},
+                async_processing=True,
+            )
+
+            live_caption = st.empty()
+            live_stats = st.empty()
+
+            # ---- sentence composer: hold a sign ~1 s to add it ----
+            composer = get_composer()
+            for token in recognizer.drain_tokens():
+                composer.push(token)
+            render_composer("live")
+            st.caption(
+                "Hold a sign steady for about a second to add it. Letters spell a word – tap a "
+                "suggestion to finish it. Put your hand down briefly to repeat the same letter."
+            )
+
+            if not ctx.state.playing:
+                live_caption.caption("Press **START** to begin.")
+            while ctx.state.playing:
+                if recognizer.tokens:
+                    _rerun()   # a sign was committed: redraw the sentence and suggestions
+                state = recognizer.state
+                if state["label"]:
+                    live_caption.markdown(f"### 🤟 {state['label']}  \n*{state['share']:.0%} of recent frames agree*")
+                else:
+                    live_caption.markdown("### …")
+                live_stats.caption(
+                    f"{state['fps']:.1f} recognitions/s · {state['latency_ms']:.0f} ms each · "
+                    f"{state['dropped']} late frames dropped"
+                    + (f" · holding **{state['holding']}** {state['hold']:.0%}" if state["holding"] else "")
+                    + (f" · error: {state['error']}" if state["error"] else "")
+                )
+                time.sleep(0.25)
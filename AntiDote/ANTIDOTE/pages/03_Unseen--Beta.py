@@ -10,6 +10,8 @@ from pathlib import Path
 import streamlit as st
 import streamlit.components.v1 as components
 
+from shared.helpers import tts_audio
+
 # ---------- PDF LIB ----------
 PDF_AVAILABLE = True
 try:
@@ -317,20 +319,21 @@ with tab_talk:
             else:
                 ans = "I am UNSEEN, your voice helper inside ANTIDOTE."
             st.success(ans)
-            st.markdown(
-                f"""
-                <script>
-                (function(){{
-                  if (!window.speechSynthesis) return;
-                  const u = new SpeechSynthesisUtterance({json.dumps(ans)});
-                  u.lang = "en-US";
-                  u.rate = 0.98;
-                  window.speechSynthesis.speak(u);
-                }})();
-                </script>
-                """,
-                unsafe_allow_html=True,
-            )
+            if not tts_audio(ans, rate=0.98, autoplay=True):
+                st.markdown(
+                    f"""
+                    <script>
+                    (function(){{
+                      if (!window.speechSynthesis) return;
+                      const u = new SpeechSynthesisUtterance({json.dumps(ans)});
+                      u.lang = "en-US";
+                      u.rate = 0.98;
+                      window.speechSynthesis.speak(u);
+                    }})();
+                    </script>
+                    """,
+                    unsafe_allow_html=True,
+                )
 
 # ---------------- PDF READER ----------------
 with tab_reader:
@@ -378,7 +381,8 @@ with tab_reader:
 
         if not readout:
             st.warning("There's no text to read. Please upload a PDF and extract text first.")
-        else:
+        elif not tts_audio(readout, autoplay=True):
+            # No engine, or the server audio is still rendering: read with the browser voice now
             st.success("Reading text…")
 
             # Use components.html so JS actually runs in the browser
@@ -1,8 +1,14 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from pathlib import Path
+from typing import Optional
+import html
+import json
 import os
 from openai import OpenAI
 
+from shared.tts import TTSService
+
 # =====================================
 # Load CSS File (clean + silent)
 # =====================================
@@ -46,3 +52,70 @@ def get_openai_client():
     except Exception as e:
         st.error(f"⚠️ Error initializing OpenAI client: {e}")
         return None
+
+
+# =====================================
+# Text-to-speech (server-side, cached on disk)
+# =====================================
+@st.cache_resource
+def get_tts() -> TTSService:
+    """One TTS service per process (engine lookup + disk cache + prerender pool)."""
+    return TTSService()
+
+
+def tts_cached_audio(text: str, rate: float = 1.0) -> Optional[bytes]:
+    """
+    WAV bytes for text if the local engine has already rendered it, else None.
+    A miss starts rendering on the TTS pool, so it never blocks the script.
+    """
+    tts = get_tts()
+    if not tts.available or not (text or "").strip():
+        return None
+    path = tts.cached(text, rate=rate)
+    if path is None:
+        tts.render_async(text, rate=rate)
+        return None
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def tts_audio(text: str, rate: float = 1.0, autoplay: bool = False) -> bool:
+    """
+    Play text through the local TTS engine.
+    Returns False if no engine is installed or the audio is still rendering in
+    the background, so callers can fall back to browser speech meanwhile.
+    """
+    audio = tts_cached_audio(text, rate=rate)
+    if not audio:
+        return False
+    st.audio(audio, format="audio/wav", autoplay=autoplay)
+    return True
+
+
+def browser_speech(text: str, rate: float = 1.0, label: str = "🔊 Read aloud") -> None:
+    """A button that reads text with the browser's speechSynthesis (no server audio needed)."""
+    components.html(
+        f"""
+        <button id="tts-btn"
+          style="margin-top:4px;padding:6px 14px;border:none;background:#0ea5e9;color:white;border-radius:8px;cursor:pointer;">
+          {html.escape(label)}
+        </button>
+        <script>
+        (function(){{
+          const btn = document.getElementById("tts-btn");
+          if (!btn) return;
+          btn.onclick = function(){{
+            if (!window.speechSynthesis) return;
+            const u = new SpeechSynthesisUtterance({json.dumps(text)});
+            u.lang = "en-US";
+            u.rate = {float(rate)};
+            window.speechSynthesis.cancel();
+            window.speechSynthesis.speak(u);
+          }};
+        }})();
+        </script>
+        """,
+        height=50,
+    )
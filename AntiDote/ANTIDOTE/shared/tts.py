@@ -0,0 +1,216 @@
+# ANTIDOTE/shared/tts.py
+# ------------------------------------------------------------
+# Server-side text-to-speech (piper / espeak) with a disk audio cache
+# ------------------------------------------------------------
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+TTS_CACHE_DIR = Path(os.getenv("ANTIDOTE_TTS_CACHE", "/tmp/antidote_tts"))
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("ANTIDOTE_TTS_CACHE_MB", "200")) * 1024 * 1024)
+DEFAULT_VOICE = os.getenv("ANTIDOTE_TTS_VOICE", "en-us")
+PIPER_MODEL = os.getenv("PIPER_MODEL", "")  # path to a piper .onnx voice (optional)
+
+# espeak speaking speed (words per minute) at rate 1.0
+_ESPEAK_WPM = 160
+
+
+def find_engine() -> Optional[str]:
+    """Best local engine available: piper (if a model is configured), espeak-ng, espeak."""
+    if PIPER_MODEL and shutil.which("piper") and Path(PIPER_MODEL).exists():
+        return "piper"
+    for name in ("espeak-ng", "espeak"):
+        if shutil.which(name):
+            return name
+    return None
+
+
+class TTSService:
+    """
+    Render text to WAV with a local engine and cache it on disk by
+    sha256(engine, voice, rate, text). Least-recently-used files are evicted
+    once the cache grows past max_bytes (mtime is bumped on every hit).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = TTS_CACHE_DIR,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        voice: str = DEFAULT_VOICE,
+        engine: Optional[str] = None,
+        workers: int = 2,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.voice = voice
+        self.engine = engine or find_engine()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        return self.engine is not None
+
+    def cache_key(self, text: str, voice: Optional[str] = None, rate: float = 1.0) -> str:
+        raw = f"{self.engine}|{voice or self.voice}|{rate:.2f}|{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def cache_path(self, text: str, voice: Optional[str] = None, rate: float = 1.0) -> Path:
+        key = self.cache_key(text, voice, rate)
+        return self.cache_dir / key[:2] / f"{key}.wav"
+
+    # ---------- synthesis ----------
+    def cached(self, text: str, voice: Optional[str] = None, rate: float = 1.0) -> Optional[Path]:
+        """Path to the cached WAV for text, or None if it has not been rendered yet (never renders)."""
+        text = " ".join((text or "").split())
+        if not text or not self.available:
+            return None
+        path = self.cache_path(text, voice, rate)
+        if not path.exists():
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def render_async(self, text: str, voice: Optional[str] = None, rate: float = 1.0) -> Optional[Future]:
+        """Render text on the TTS pool; repeated calls while it renders share one job."""
+        text = " ".join((text or "").split())
+        if not text or not self.available:
+            return None
+        name = self.cache_path(text, voice, rate).name
+        with self._locks_guard:
+            fut = self._inflight.get(name)
+            if fut is not None:
+                return fut
+            fut = self._inflight[name] = self._pool.submit(self.synthesize, text, voice, rate)
+        fut.add_done_callback(lambda _f: self._forget(name))
+        return fut
+
+    def _forget(self, name: str) -> None:
+        with self._locks_guard:
+            self._inflight.pop(name, None)
+
+    def synthesize(self, text: str, voice: Optional[str] = None, rate: float = 1.0) -> Optional[Path]:
+        """Path to cached WAV for text (rendered on a miss), or None if no engine / failure."""
+        text = " ".join((text or "").split())
+        if not text or not self.available:
+            return None
+        path = self.cache_path(text, voice, rate)
+        if path.exists():
+            self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+        with self._lock_for(path.name):
+            if path.exists():
+                self.hits += 1
+                return path
+            self.misses += 1
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=str(path.parent))
+            os.close(fd)
+            try:
+                self._render(text, voice or self.voice, rate, Path(tmp))
+                if os.path.getsize(tmp) == 0:
+                    raise RuntimeError("engine produced no audio")
+                os.replace(tmp, path)
+            except Exception:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                return None
+            finally:
+                with self._locks_guard:
+                    self._locks.pop(path.name, None)
+        self._evict()
+        return path
+
+    def get_bytes(self, text: str, voice: Optional[str] = None, rate: float = 1.0) -> Optional[bytes]:
+        path = self.synthesize(text, voice, rate)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def prerender(self, texts: Iterable[str], voice: Optional[str] = None, rate: float = 1.0) -> None:
+        """Render in the background so later playback is a cache hit."""
+        if not self.available:
+            return
+        for t in texts:
+            self.render_async(t, voice, rate)
+
+    def _render(self, text: str, voice: str, rate: float, out: Path) -> None:
+        if self.engine == "piper":
+            subprocess.run(
+                ["piper", "--model", PIPER_MODEL, "--output_file", str(out), "--length_scale", f"{1.0 / rate:.2f}"],
+                input=text.encode("utf-8"),
+                check=True,
+                capture_output=True,
+                timeout=120,
+            )
+        else:
+            subprocess.run(
+                [self.engine, "-v", voice, "-s", str(int(_ESPEAK_WPM * rate)), "-w", str(out), "--stdin"],
+                input=text.encode("utf-8"),
+                check=True,
+                capture_output=True,
+                timeout=120,
+            )
+
+    # ---------- cache housekeeping ----------
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            lk = self._locks.get(name)
+            if lk is None:
+                lk = self._locks[name] = threading.Lock()
+            return lk
+
+    def _evict(self) -> None:
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            files: List[os.stat_result] = []
+            paths: List[Path] = []
+            for p in self.cache_dir.glob("*/*.wav"):
+                try:
+                    files.append(p.stat())
+                    paths.append(p)
+                except OSError:
+                    pass
+            total = sum(f.st_size for f in files)
+            if total <= self.max_bytes:
+                return
+            for st_, p in sorted(zip(files, paths), key=lambda x: x[0].st_mtime):
+                try:
+                    p.unlink()
+                    total -= st_.st_size
+                except OSError:
+                    pass
+                if total <= self.max_bytes:
+                    break
+        finally:
+            self._evict_lock.release()
+
+    def stats(self) -> Dict[str, object]:
+        return {"engine": self.engine, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,142 @@
+# ANTIDOTE/utils/alzy_answers.py
+# ------------------------------------------------------------
+# ALZY – caregiver Q&A bank with a trigram inverted index
+# ------------------------------------------------------------
+import math
+import re
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.alzy_intents import IntentStats
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+# Answer directly above this similarity; use as LLM grounding above GROUNDING_SCORE.
+ANSWER_SCORE = 0.6
+GROUNDING_SCORE = 0.25
+
+
+def _normalize(text: str) -> str:
+    q = (text or "").lower().replace("’", "'").replace("'", "")
+    q = _NON_WORD.sub(" ", q)
+    return _SPACES.sub(" ", q).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    """Character trigrams of each word, padded so short words still produce grams."""
+    grams = set()
+    for w in _normalize(text).split():
+        w = f"  {w} "
+        for i in range(len(w) - 2):
+            grams.add(w[i : i + 3])
+    return list(grams)
+
+
+class _Index:
+    """One immutable build of the bank; AnswerBank swaps whole instances."""
+
+    __slots__ = ("sig", "ids", "entries", "postings", "idf", "norms")
+
+    def __init__(self, sig: Optional[Tuple] = None, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        entries = entries or {}
+        ids = list(entries.keys())
+        postings: Dict[str, List[int]] = {}
+        grams_by_row: List[List[str]] = []
+        for row, qid in enumerate(ids):
+            grams = trigrams(entries[qid].get("question", ""))
+            grams_by_row.append(grams)
+            for g in grams:
+                postings.setdefault(g, []).append(row)
+        n = max(1, len(ids))
+        idf = {g: math.log(1.0 + n / len(rows)) for g, rows in postings.items()}
+        self.sig = sig
+        self.ids: List[str] = ids
+        self.entries: Dict[str, Dict[str, Any]] = dict(entries)
+        self.postings: Dict[str, np.ndarray] = {g: np.asarray(rows, dtype=np.int32) for g, rows in postings.items()}
+        self.idf: Dict[str, float] = idf
+        self.norms = np.array(
+            [math.sqrt(sum(idf[g] ** 2 for g in grams)) or 1.0 for grams in grams_by_row],
+            dtype=np.float32,
+        )
+
+
+class AnswerBank:
+    """
+    In-memory inverted index over caregiver questions.
+    Postings are int32 arrays so a lookup is one weighted bincount over the
+    query's trigrams; scores are IDF-weighted cosine similarities (0..1).
+    A rebuild replaces the whole index at once, so searches never see a mix.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = IntentStats()
+        self._index = _Index()
+
+    def __len__(self) -> int:
+        return len(self._index.ids)
+
+    # ---------- index ----------
+    def sync(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Rebuild the index if the bank changed (count or newest edit)."""
+        sig = (len(entries), max((e.get("updated_iso", "") for e in entries.values()), default=""))
+        if sig == self._index.sig:
+            return
+        with self._lock:
+            if sig == self._index.sig:
+                return      # another session rebuilt it meanwhile
+            self._index = _Index(sig, entries)
+
+    # ---------- lookup ----------
+    def search(self, text: str, k: int = 3) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k (score, entry) pairs, best first."""
+        index = self._index
+        grams = trigrams(text)
+        n = len(index.ids)
+        if not grams or not n:
+            return []
+        unseen_w2 = math.log(1.0 + n) ** 2
+        rows, weights = [], []
+        q_norm = 0.0
+        for g in grams:
+            w = index.idf.get(g)
+            if w is None:
+                q_norm += unseen_w2  # unseen gram still counts toward the query norm
+                continue
+            q_norm += w * w
+            rows.append(index.postings[g])
+            weights.append(np.full(len(index.postings[g]), w * w, dtype=np.float32))
+        if not rows:
+            return []
+        dots = np.bincount(np.concatenate(rows), weights=np.concatenate(weights), minlength=n)
+        scores = dots / (index.norms * math.sqrt(q_norm))
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), index.entries[index.ids[i]]) for i in top if scores[i] > 0]
+
+    def best_answer(self, text: str, min_score: float = ANSWER_SCORE) -> Optional[str]:
+        """Caregiver answer for a near-duplicate question, else None (recorded in stats)."""
+        t0 = time.perf_counter()
+        hits = self.search(text, k=1)
+        reply = hits[0][1].get("answer") if hits and hits[0][0] >= min_score else None
+        self.stats.record("qa_bank" if reply else None, (time.perf_counter() - t0) * 1000.0)
+        return reply
+
+    def grounding(self, text: str, k: int = 3, min_score: float = GROUNDING_SCORE, max_chars: int = 200) -> str:
+        """Compact 'caregiver notes' block for the LLM system prompt ('' if nothing relevant)."""
+        lines = []
+        for score, e in self.search(text, k=k):
+            if score < min_score:
+                break
+            ans = (e.get("answer") or "").strip().replace("\n", " ")
+            if len(ans) > max_chars:
+                ans = ans[: max_chars - 1].rstrip() + "…"
+            lines.append(f"- Q: {e.get('question', '').strip()} A: {ans}")
+        if not lines:
+            return ""
+        return "Caregiver notes (trust these over your own guesses):\n" + "\n".join(lines)
@@ -0,0 +1,186 @@
+# ANTIDOTE/utils/alzy_context.py
+# ------------------------------------------------------------
+# ALZY – bounded chat history + rolling summary for the LLM context
+# ------------------------------------------------------------
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+Message = Dict[str, str]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); good enough for budgeting."""
+    return max(1, (len(text or "") + 3) // 4)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    first = _SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(first) > limit:
+        first = first[: limit - 1].rstrip() + "…"
+    return first
+
+
+def compact_summary(previous: str, messages: List[Message], max_tokens: int = 300) -> str:
+    """
+    Extractive summary: one short line per older turn, newest kept when over budget.
+    Cheap and deterministic, so it never needs the network.
+    """
+    lines = [ln for ln in (previous or "").splitlines() if ln.strip()]
+    for m in messages:
+        content = m.get("content", "")
+        if not content:
+            continue
+        if m.get("role") == "user":
+            lines.append(f"- Patient asked: {_clip(content, 90)}")
+        else:
+            lines.append(f"- You answered: {_clip(content, 90)}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ChatHistory:
+    """
+    Ring buffer of chat messages with a running summary of turns that have left
+    the LLM window. Memory per session is bounded by maxlen + evict_batch + the
+    summary budget, whether or not the session ever asks the LLM for context().
+    """
+
+    def __init__(
+        self,
+        maxlen: int = 200,
+        context_tokens: int = 1200,
+        summary_tokens: int = 300,
+        summarize_fn: Callable[[str, List[Message], int], str] = compact_summary,
+        evict_batch: int = 32,
+    ):
+        self._lock = threading.Lock()
+        self._msgs: deque = deque(maxlen=maxlen)
+        self._evicted: deque = deque()      # (seq, msg) dropped from the buffer before being summarized
+        self._total = 0                     # sequence number of the next message
+        self._folded_upto = 0               # messages with seq < this are in the summary
+        self._folding: Optional[object] = None  # token of the fold in progress
+        self._summary_gen = 0               # bumped whenever the summary changes
+        self.summary = ""
+        self.context_tokens = context_tokens
+        self.summary_tokens = summary_tokens
+        self.summarize_fn = summarize_fn
+        self.evict_batch = max(1, evict_batch)
+
+    # ---------- list-like API used by the page ----------
+    def append(self, msg: Message) -> None:
+        with self._lock:
+            if len(self._msgs) == self._msgs.maxlen:
+                evicted_seq = self._total - len(self._msgs)
+                if evicted_seq >= self._folded_upto:
+                    self._evicted.append((evicted_seq, self._msgs[0]))
+            self._msgs.append(msg)
+            self._total += 1
+            if len(self._evicted) >= self.evict_batch:
+                # Sessions answered locally never call context(): fold here so
+                # evicted turns cannot pile up (summarize_fn is cheap by default).
+                self.summary = self.summarize_fn(self.summary, [m for _, m in self._evicted], self.summary_tokens)
+                self._folded_upto = max(self._folded_upto, self._evicted[-1][0] + 1)
+                self._evicted.clear()
+                self._summary_gen += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._msgs.clear()
+            self._evicted.clear()
+            self._folded_upto = self._total
+            self.summary = ""
+            self._summary_gen += 1
+
+    def __iter__(self) -> Iterator[Message]:
+        with self._lock:
+            return iter(list(self._msgs))
+
+    def __reversed__(self) -> Iterator[Message]:
+        with self._lock:
+            return iter(list(reversed(self._msgs)))
+
+    def __len__(self) -> int:
+        return len(self._msgs)
+
+    # ---------- LLM context ----------
+    def context(self, system_msg: str, schedule: Optional[Callable[[Callable[[], None]], Any]] = None) -> List[Message]:
+        """
+        [system (+ summary)] + the newest messages that fit in context_tokens.
+        Older turns not yet summarized are folded via schedule(fn) (off the hot path);
+        without a scheduler they are folded inline. If schedule returns a Future
+        (or a job with a .future), a fold that is cancelled or never runs frees
+        the way for the next one.
+        """
+        with self._lock:
+            msgs = list(self._msgs)
+            summary = self.summary
+            first_seq = self._total - len(msgs)
+            folded_upto = self._folded_upto
+            folding = self._folding is not None
+        used = estimate_tokens(system_msg) + (estimate_tokens(summary) if summary else 0)
+        window: List[Message] = []
+        for m in reversed(msgs):
+            cost = estimate_tokens(m.get("content", "")) + 4
+            if window and used + cost > self.context_tokens:
+                break
+            window.append({"role": m["role"], "content": m["content"]})
+            used += cost
+        window.reverse()
+
+        window_start = first_seq + (len(msgs) - len(window))
+        if window_start > folded_upto and not folding:
+            token = object()
+            with self._lock:
+                started = self._folding is None
+                if started:
+                    self._folding = token
+            if started:
+                fold = lambda: self._fold_until(window_start, token)  # noqa: E731
+                if schedule is None:
+                    fold()
+                else:
+                    try:
+                        handle = schedule(fold)
+                    except Exception:
+                        self._end_fold(token)
+                    else:
+                        future = getattr(handle, "future", handle)
+                        if hasattr(future, "add_done_callback"):
+                            future.add_done_callback(lambda _f: self._end_fold(token))
+
+        system = system_msg
+        if summary:
+            system += "\nEarlier in this conversation:\n" + summary
+        return [{"role": "system", "content": system}] + window
+
+    def _end_fold(self, token: object) -> None:
+        with self._lock:
+            if self._folding is token:
+                self._folding = None
+
+    def _fold_until(self, window_start: int, token: object) -> None:
+        try:
+            with self._lock:
+                first_seq = self._total - len(self._msgs)
+                older = [m for s, m in self._evicted if s < window_start]
+                lo = max(self._folded_upto, first_seq)
+                older += [self._msgs[s - first_seq] for s in range(lo, min(window_start, self._total))]
+                previous = self.summary
+                gen = self._summary_gen
+            summary = self.summarize_fn(previous, older, self.summary_tokens)
+            with self._lock:
+                if gen != self._summary_gen:
+                    return      # append() folded or clear() ran meanwhile; the next turn retries
+                self.summary = summary
+                self._folded_upto = max(self._folded_upto, window_start)
+                while self._evicted and self._evicted[0][0] < self._folded_upto:
+                    self._evicted.popleft()
+                self._summary_gen += 1
+        finally:
+            self._end_fold(token)
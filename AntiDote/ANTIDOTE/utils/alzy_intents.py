@@ -0,0 +1,271 @@
+# ANTIDOTE/utils/alzy_intents.py
+# ------------------------------------------------------------
+# ALZY – local intent router (answers from patient data, no network)
+# ------------------------------------------------------------
+import re
+import time
+import threading
+import datetime as dt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Cheap first pass: if none of these words appear, no intent can match.
+_TRIGGER = re.compile(
+    r"\b(date|time|day|today|next|now|do|medicine|medication|meds|tablet|tablets|pill|pills|"
+    r"who|whos|home|house|address|where|doctor|market|hospital|mother|mothers)\b"
+)
+
+_DATE_TIME = re.compile(r"\bdate\b.*\btime\b|\btime\b.*\bdate\b|\bdate (?:with|&|and) time\b")
+_TODAY_DATE = re.compile(r"\btoday\b.*\bdate\b|\bdate\b.*\btoday\b")
+_DAY_OF_WEEK = re.compile(r"\b(?:what|which) day is (?:it )?today\b|\bwhat day is it\b")
+_TIME_NOW = re.compile(r"\bwhat(?: is|s)? the time\b|\bcurrent time\b|\btime now\b|\bwhat time is it\b")
+_NEXT_TASK = re.compile(
+    r"\bwhat(?: is|s)? next\b|\bwhat(?: do| should) i do(?: next| now)?\b|\bnext (?:task|reminder|activity)\b"
+)
+_MEDICINE = re.compile(
+    r"\b(?:did|have) i (?:take|taken|had|have)\b.*\b(?:medicine|medication|meds|tablets?|pills?)\b"
+    r"|\b(?:medicine|medication|meds|tablets?|pills?)\b.*\b(?:taken|take) (?:it|them)?\s*today\b"
+)
+_WHO_IS = re.compile(r"\bwho(?: is|s)\s+(?P<name>[a-z][a-z .'-]*?)\s*$")
+_HOME = re.compile(r"\b(?:where|what)(?: is|s)? (?:my|our) (?:home|house|address)\b|\bwhere do i live\b")
+_POI = re.compile(r"\bwhere(?: is|s)? (?:my |the )?(?P<poi>family doctor|doctor|market|daily market|hospital|mother'?s home)\b")
+
+_POI_KEYS = {
+    "family doctor": "family_doctor",
+    "doctor": "family_doctor",
+    "market": "daily_market",
+    "daily market": "daily_market",
+    "hospital": "hospital",
+    "mothers home": "mothers_home",
+    "mother's home": "mothers_home",
+}
+
+
+def _normalize(text: str) -> str:
+    q = (text or "").strip().lower()
+    q = q.replace("’", "'")
+    q = re.sub(r"[?!.,;:]+", " ", q)
+    q = re.sub(r"\s+", " ", q).strip()
+    return q.replace("what's", "whats").replace("who's", "whos")
+
+
+def _title(rec: Dict[str, Any], default: str) -> str:
+    return (rec.get("title") or default).strip().rstrip(".")
+
+
+def _parse_iso(ts: str, tz) -> Optional[dt.datetime]:
+    try:
+        v = dt.datetime.fromisoformat(ts)
+    except Exception:
+        return None
+    if v.tzinfo is None:
+        return v.replace(tzinfo=tz) if tz else v
+    return v.astimezone(tz) if tz else v
+
+
+class IntentStats:
+    """Hit/miss counters for the local router (process-wide, thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+        self.total_ms = 0.0
+
+    def record(self, intent: Optional[str], elapsed_ms: float) -> None:
+        with self._lock:
+            if intent:
+                self.hits[intent] = self.hits.get(intent, 0) + 1
+            else:
+                self.misses += 1
+            self.total_ms += elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            n_hits = sum(self.hits.values())
+            total = n_hits + self.misses
+            return {
+                "queries": total,
+                "hits": n_hits,
+                "misses": self.misses,
+                "hit_rate": (n_hits / total) if total else 0.0,
+                "avg_ms": (self.total_ms / total) if total else 0.0,
+                "by_intent": dict(self.hits),
+            }
+
+
+class LocalIntentRouter:
+    """
+    Ordered list of compiled intents answered straight from the ALZY data dict.
+    Returns None for anything it does not recognise so the caller can use the LLM.
+    """
+
+    def __init__(self, tz=None):
+        self.tz = tz
+        self.stats = IntentStats()
+        # (signature, index) pairs, each swapped in one assignment: sessions share this router
+        self._index_lock = threading.Lock()
+        self._due: Tuple[Optional[Tuple], List[Tuple[dt.datetime, str]]] = (None, [])
+        self._people: Tuple[Optional[Tuple], Dict[str, List[Dict[str, Any]]]] = (None, {})
+        self._intents: List[Tuple[str, Callable[[str, Dict[str, Any], dt.datetime], Optional[str]]]] = [
+            ("date_time", self._date_time),
+            ("day_of_week", self._day_of_week),
+            ("time", self._time),
+            ("medicine_taken", self._medicine_taken),
+            ("next_task", self._next_task),
+            ("who_is", self._who_is),
+            ("home", self._home),
+            ("place", self._place),
+        ]
+
+    # ---------- public ----------
+    def answer(self, text: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        t0 = time.perf_counter()
+        intent, reply = self._route(text, data, now)
+        self.stats.record(intent, (time.perf_counter() - t0) * 1000.0)
+        return reply
+
+    # ---------- routing ----------
+    def _route(self, text: str, data: Dict[str, Any], now: dt.datetime) -> Tuple[Optional[str], Optional[str]]:
+        q = _normalize(text)
+        if not q or not _TRIGGER.search(q):
+            return None, None
+        for name, fn in self._intents:
+            reply = fn(q, data, now)
+            if reply:
+                return name, reply
+        return None, None
+
+    # ---------- indexes ----------
+    def due_index(self, data: Dict[str, Any]) -> List[Tuple[dt.datetime, str]]:
+        """Reminders sorted by next due time; rebuilt only when a due time changes."""
+        reminders = data.get("reminders", {}) or {}
+        sig = tuple((rid, r.get("next_due_iso")) for rid, r in reminders.items())
+        cached_sig, cached = self._due
+        if sig == cached_sig:
+            return cached
+        idx = []
+        for rid, due_iso in sig:
+            d = _parse_iso(due_iso or "", self.tz)
+            if d is not None:
+                idx.append((d, rid))
+        idx.sort()
+        with self._index_lock:
+            self._due = (sig, idx)
+        return idx
+
+    def people_index(self, data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Lower-case full names, first names, surnames and relations → people."""
+        people = data.get("people", {}) or {}
+        sig = tuple((pid, p.get("name"), p.get("relation")) for pid, p in people.items())
+        cached_sig, cached = self._people
+        if sig == cached_sig:
+            return cached
+        idx: Dict[str, List[Dict[str, Any]]] = {}
+        for p in people.values():
+            name = (p.get("name") or "").strip().lower()
+            keys = {name} | set(name.split())
+            rel = (p.get("relation") or "").strip().lower()
+            if rel and rel != "family":
+                keys |= {rel, f"my {rel}"}
+            for k in keys:
+                if k:
+                    idx.setdefault(k, []).append(p)
+        with self._index_lock:
+            self._people = (sig, idx)
+        return idx
+
+    # ---------- intents ----------
+    def _date_time(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        date_str = now.strftime("%A, %d %B %Y")
+        if _DATE_TIME.search(q):
+            return f"Today is {date_str} and the time now is {now.strftime('%I:%M %p')}."
+        if _TODAY_DATE.search(q):
+            return f"Today is {date_str}."
+        return None
+
+    def _day_of_week(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        if _DAY_OF_WEEK.search(q):
+            return f"Today is {now.strftime('%A')}."
+        return None
+
+    def _time(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        if _TIME_NOW.search(q):
+            return f"The time now is {now.strftime('%I:%M %p')}."
+        return None
+
+    def _next_task(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        if not _NEXT_TASK.search(q):
+            return None
+        reminders = data.get("reminders", {}) or {}
+        soon = now + dt.timedelta(minutes=1)
+        due_now = []
+        upcoming = None
+        for d, rid in self.due_index(data):
+            if d <= soon:
+                due_now.append(reminders[rid])
+            else:
+                upcoming = (d, reminders[rid])
+                break
+        if due_now:
+            rec = due_now[-1]
+            steps = rec.get("steps") or []
+            first = f" First: {steps[0].rstrip('.')}." if steps else ""
+            return f"Right now: {_title(rec, 'your reminder')}.{first}"
+        if upcoming:
+            d, rec = upcoming
+            when = d.strftime("%I:%M %p") if d.date() == now.date() else d.strftime("%A at %I:%M %p")
+            return f"Nothing is due right now. Next: {_title(rec, 'a reminder')} ({when})."
+        return "Nothing is planned right now. You can relax."
+
+    def _medicine_taken(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        if not _MEDICINE.search(q):
+            return None
+        taken = []
+        for lg in reversed(data.get("logs", []) or []):
+            if lg.get("type") != "medicine" or not str(lg.get("action", "")).startswith("taken"):
+                continue
+            t = _parse_iso(lg.get("time", ""), self.tz)
+            if t is not None and t.date() == now.date():
+                taken.append((t, _title(lg, "your medicine")))
+        if taken:
+            t, title = taken[0]
+            more = f" ({len(taken)} taken today)" if len(taken) > 1 else ""
+            return f"Yes. You took {title} at {t.strftime('%I:%M %p')}{more}."
+        reminders = data.get("reminders", {}) or {}
+        for d, rid in self.due_index(data):
+            rec = reminders[rid]
+            if rec.get("reminder_type") == "medicine" and d.date() <= now.date():
+                return f"I don't see it marked as taken today. Please check: {_title(rec, 'your medicine')}."
+        return "I don't see any medicine marked as taken today."
+
+    def _who_is(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        m = _WHO_IS.search(q)
+        if not m:
+            return None
+        name = m.group("name").strip()
+        idx = self.people_index(data)
+        matches = idx.get(name) or idx.get(name.split()[0]) or []
+        if not matches:
+            return None
+        p = matches[0]
+        rel = (p.get("relation") or "Family").strip().lower()
+        who = "part of your family" if rel == "family" else f"your {rel}"
+        extra = f" There are {len(matches)} people with that name in your Memory Book." if len(matches) > 1 else ""
+        return f"{p.get('name')} is {who}. You can see their photo in the Memory Book.{extra}"
+
+    def _home(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        if not _HOME.search(q):
+            return None
+        addr = (data.get("gps", {}) or {}).get("home_address", "")
+        if addr:
+            return f"Your home is {addr}. The GPS tab can show you the way."
+        return "Your home address is not saved yet. Please ask your caregiver."
+
+    def _place(self, q: str, data: Dict[str, Any], now: dt.datetime) -> Optional[str]:
+        m = _POI.search(q)
+        if not m:
+            return None
+        key = _POI_KEYS.get(m.group("poi"))
+        poi = ((data.get("gps", {}) or {}).get("pois", {}) or {}).get(key or "", {})
+        label = poi.get("name") or m.group("poi").title()
+        return f"Open the GPS tab and tap “{label}” for directions."
@@ -0,0 +1,213 @@
+# ANTIDOTE/utils/alzy_llm.py
+# ------------------------------------------------------------
+# ALZY – LLM chat client + shared worker pool (non-blocking replies)
+# ------------------------------------------------------------
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from utils.alzy_ratelimit import FairRateLimiter
+
+DEFAULT_API_URL = "https://api.openai.com/v1/chat/completions"
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Shown at once when the reply misses its latency budget; the real reply follows.
+FALLBACK_REPLY = "I'm here with you. Let me think about that for a moment — my answer will appear shortly."
+BUSY_REPLY = "I'm a little busy right now, but I'm here with you. Please ask me again in a moment."
+# Shown when the chat call itself failed (raised) – nothing else will follow.
+ERROR_REPLY = "I'm sorry, I couldn't answer that just now. Please ask me again in a moment."
+
+
+def chat_completion(
+    api_key: str,
+    messages: List[Dict[str, str]],
+    url: str = DEFAULT_API_URL,
+    model: str = DEFAULT_MODEL,
+    max_tokens: int = 150,
+    temperature: float = 0.6,
+    timeout: float = 15.0,
+) -> Tuple[int, str, float]:
+    """
+    One chat/completions call -> (status_code, reply_or_error_text, retry_after_s).
+    Network errors come back as status 0 (never raises).
+    """
+    try:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        resp = requests.post(url, headers=headers, json=payload, timeout=timeout)
+        if resp.status_code == 200:
+            j = resp.json()
+            return 200, (
+                j.get("choices", [{}])[0]
+                 .get("message", {})
+                 .get("content", "I’m here with you.")
+            ), 0.0
+        try:
+            retry_after = float(resp.headers.get("Retry-After", "") or 0.0)
+        except ValueError:
+            retry_after = 0.0
+        return resp.status_code, f"⚠️ API error {resp.status_code}: {resp.text[:160]}", retry_after
+    except Exception as e:
+        return 0, f"⚠️ Request failed: {e}", 0.0
+
+
+def post_chat(api_key: str, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+    """One chat/completions call. Errors come back as short reply text (never raises)."""
+    return chat_completion(api_key, messages, **kwargs)[1]
+
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int = 150) -> int:
+    """Prompt (~4 chars/token) + completion budget, for tokens-per-minute accounting."""
+    return sum(len(m.get("content", "")) // 4 + 4 for m in messages) + max_tokens
+
+
+def limited_chat(
+    limiter: FairRateLimiter,
+    session_id: str,
+    api_key: str,
+    messages: List[Dict[str, str]],
+    wait_timeout: float = 30.0,
+    retries: int = 1,
+    **kwargs: Any,
+) -> str:
+    """post_chat behind the shared rate limiter; a 429 pauses everyone and retries once."""
+    cost = estimate_request_tokens(messages, kwargs.get("max_tokens", 150))
+    for attempt in range(retries + 1):
+        if not limiter.acquire(session_id, cost, timeout=wait_timeout):
+            return BUSY_REPLY
+        status, text, retry_after = chat_completion(api_key, messages, **kwargs)
+        if status != 429:
+            return text
+        limiter.penalize(retry_after or 2.0 * (attempt + 1))
+    return BUSY_REPLY
+
+
+class ChatQueueFull(RuntimeError):
+    """Raised by ChatExecutor.submit when the bounded queue is full."""
+
+
+class ChatJob:
+    """Handle for one submitted chat call."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.submitted_at = time.monotonic()
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    def wait(self, budget_s: float) -> Optional[str]:
+        """
+        Reply if it arrives within budget_s seconds, else None (job keeps running).
+        A call that failed returns ERROR_REPLY instead, since no reply will follow.
+        """
+        try:
+            return self.future.result(timeout=max(0.0, budget_s))
+        except FutureTimeout:
+            return None
+        except Exception:
+            return ERROR_REPLY
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def reply(self) -> Optional[str]:
+        if not self.done() or self.future.cancelled() or self.cancelled.is_set():
+            return None
+        try:
+            return self.future.result(timeout=0)
+        except Exception:
+            return ERROR_REPLY
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class ChatExecutor:
+    """
+    Process-wide thread pool for LLM calls, shared by all Streamlit sessions.
+    At most max_pending jobs may be queued or running; extra submits fail fast.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alzy-chat")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, List[ChatJob]] = {}
+        self.max_pending = max_pending
+        self.rejected = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    def submit(self, session_id: str, fn: Callable[..., str], *args: Any, **kwargs: Any) -> ChatJob:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ChatQueueFull("chat queue is full")
+        job = ChatJob(session_id)
+
+        def _run() -> Optional[str]:
+            if job.cancelled.is_set():
+                return None
+            return fn(*args, **kwargs)
+
+        # Register before submitting, so _finish always finds the job to remove
+        with self._lock:
+            self._jobs.setdefault(session_id, []).append(job)
+        try:
+            job.future = self._pool.submit(_run)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self._forget(job)
+            raise
+        job.future.add_done_callback(lambda f, j=job: self._finish(j))
+        return job
+
+    def _finish(self, job: ChatJob) -> None:
+        self._slots.release()
+        with self._lock:
+            self._forget(job)
+            if job.cancelled.is_set() or job.future.cancelled():
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    def _forget(self, job: ChatJob) -> None:
+        jobs = self._jobs.get(job.session_id, [])
+        if job in jobs:
+            jobs.remove(job)
+        if not jobs:
+            self._jobs.pop(job.session_id, None)
+
+    def cancel_session(self, session_id: str) -> int:
+        """Cancel every queued/running job of a session (e.g. when it closes)."""
+        with self._lock:
+            jobs = list(self._jobs.get(session_id, []))
+        for job in jobs:
+            job.cancel()
+        return len(jobs)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = sum(len(v) for v in self._jobs.values())
+            return {
+                "in_flight": in_flight,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+            }
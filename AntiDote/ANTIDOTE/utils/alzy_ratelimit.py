@@ -0,0 +1,213 @@
+# ANTIDOTE/utils/alzy_ratelimit.py
+# ------------------------------------------------------------
+# ALZY – token-bucket limiter with per-session fair queuing for LLM calls
+# ------------------------------------------------------------
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# bucket name -> (capacity, refill per second)
+Rates = Dict[str, Tuple[float, float]]
+
+
+def minute_rates(rpm: float, tpm: float) -> Rates:
+    return {"req": (float(rpm), rpm / 60.0), "tok": (float(tpm), tpm / 60.0)}
+
+
+class MemoryBucketStore:
+    """Token buckets for this process only."""
+
+    def __init__(self, rates: Rates):
+        self.rates = rates
+        now = time.monotonic()
+        self._state = {name: [cap, now] for name, (cap, _) in rates.items()}
+        self._lock = threading.Lock()
+
+    def try_take(self, costs: Dict[str, float]) -> float:
+        """Take every cost at once and return 0.0, or take nothing and return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for name, cost in costs.items():
+                cap, per_s = self.rates[name]
+                st = self._state[name]
+                st[0] = min(cap, st[0] + (now - st[1]) * per_s)
+                st[1] = now
+                if st[0] < cost:
+                    wait = max(wait, (cost - st[0]) / per_s)
+            if wait > 0:
+                return wait
+            for name, cost in costs.items():
+                self._state[name][0] -= cost
+            return 0.0
+
+    def drain(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for st in self._state.values():
+                st[0], st[1] = 0.0, now
+
+
+class SqliteBucketStore:
+    """Token buckets shared by every process that opens the same SQLite file."""
+
+    def __init__(self, path: Path, rates: Rates):
+        self.rates = rates
+        self.path = str(path)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        con = self._connect()
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+            for name, (cap, _) in rates.items():
+                con.execute("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", (name, cap, time.time()))
+        finally:
+            con.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def try_take(self, costs: Dict[str, float]) -> float:
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            rows = {n: (t, u) for n, t, u in con.execute("SELECT name, tokens, updated FROM buckets")}
+            level: Dict[str, float] = {}
+            wait = 0.0
+            for name, cost in costs.items():
+                cap, per_s = self.rates[name]
+                tokens, updated = rows.get(name, (cap, now))
+                level[name] = min(cap, tokens + max(0.0, now - updated) * per_s)
+                if level[name] < cost:
+                    wait = max(wait, (cost - level[name]) / per_s)
+            if wait == 0.0:
+                for name, cost in costs.items():
+                    level[name] -= cost
+            for name, tokens in level.items():
+                con.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (name, tokens, now))
+            con.execute("COMMIT")
+            return wait
+        except sqlite3.OperationalError:
+            try:
+                con.execute("ROLLBACK")
+            except Exception:
+                pass
+            return 0.05  # file busy: retry shortly
+        finally:
+            con.close()
+
+    def drain(self) -> None:
+        con = self._connect()
+        try:
+            con.execute("UPDATE buckets SET tokens = 0, updated = ?", (time.time(),))
+        except sqlite3.OperationalError:
+            pass  # file busy: the pause in FairRateLimiter still holds everyone back
+        finally:
+            con.close()
+
+
+class FairRateLimiter:
+    """
+    Requests-per-minute + tokens-per-minute limiter in front of the LLM.
+    Waiting calls queue per session and sessions are served round-robin,
+    so one chatty session cannot starve the others.
+    """
+
+    def __init__(self, rpm: float = 60, tpm: float = 40000, db_path: Optional[Path] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        rates = minute_rates(rpm, tpm)
+        self.store = SqliteBucketStore(db_path, rates) if db_path else MemoryBucketStore(rates)
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[object]] = {}
+        self._order: Deque[str] = deque()
+        self._paused_until = 0.0
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self.depth = 0
+        self.max_depth = 0
+        self.granted = 0
+        self.timeouts = 0
+        self.throttled = 0
+
+    def acquire(self, session_id: str, tokens: int, timeout: float = 30.0) -> bool:
+        """Block until this session's call may go out; False if timeout expires first."""
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        costs = {"req": 1.0, "tok": float(min(max(1, tokens), self.tpm))}
+        ticket = object()
+        granted = False
+        with self._cond:
+            q = self._queues.get(session_id)
+            if q is None:
+                q = self._queues[session_id] = deque()
+                self._order.append(session_id)
+            q.append(ticket)
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._order[0] == session_id and q[0] is ticket:
+                        wait = max(0.0, self._paused_until - now) or self._take(costs)
+                        if wait == 0.0:
+                            granted = True
+                            break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(min(remaining, wait) if wait else remaining)
+            finally:
+                q.remove(ticket)
+                if not q:
+                    del self._queues[session_id]
+                    self._order.remove(session_id)
+                elif granted:
+                    self._order.remove(session_id)
+                    self._order.append(session_id)
+                self.depth -= 1
+                if granted:
+                    self.granted += 1
+                    self._waits.append(time.monotonic() - t0)
+                else:
+                    self.timeouts += 1
+                self._cond.notify_all()
+        return granted
+
+    def _take(self, costs: Dict[str, float]) -> float:
+        """store.try_take with the condition released (caller holds it and is head of the queue)."""
+        # A SQLite store can block on its file lock; other sessions must still
+        # be able to queue, time out and release meanwhile. Only the head
+        # ticket calls this, and nobody else can remove it, so it stays head.
+        self._cond.release()
+        try:
+            return self.store.try_take(costs)
+        finally:
+            self._cond.acquire()
+
+    def penalize(self, retry_after: float) -> None:
+        """Upstream said 429: empty the buckets and hold everyone for retry_after seconds."""
+        with self._cond:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+        self.store.drain()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "queue_depth": self.depth,
+                "max_queue_depth": self.max_depth,
+                "sessions_waiting": len(self._order),
+                "granted": self.granted,
+                "timeouts": self.timeouts,
+                "throttled_429": self.throttled,
+                "avg_wait_s": (sum(waits) / len(waits)) if waits else 0.0,
+                "p95_wait_s": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+            }
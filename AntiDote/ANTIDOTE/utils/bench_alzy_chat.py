@@ -0,0 +1,183 @@
+# ANTIDOTE/utils/bench_alzy_chat.py
+# ------------------------------------------------------------
+# ALZY chat latency benchmark (no network needed)
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.bench_alzy_chat --sessions 20 --turns 10 --latency 0.6 --rpm 600
+#
+# Drives the same path as the patient chatbot: local intents -> Q&A bank ->
+# shared chat pool -> rate limiter -> LLM client, against the bundled stub.
+# ------------------------------------------------------------
+import argparse
+import datetime as dt
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from utils.alzy_answers import AnswerBank
+from utils.alzy_context import ChatHistory
+from utils.alzy_intents import LocalIntentRouter
+from utils.alzy_llm import ChatExecutor, ChatQueueFull, FALLBACK_REPLY, BUSY_REPLY, ERROR_REPLY, limited_chat
+from utils.alzy_ratelimit import FairRateLimiter
+from utils.openai_stub import StubConfig, start_stub_server
+
+try:
+    from zoneinfo import ZoneInfo
+    IST = ZoneInfo("Asia/Kolkata")
+except Exception:
+    IST = None
+
+DATA_FILE = Path(__file__).resolve().parent.parent / "data.json"
+
+QUESTIONS = [
+    ("local", "What do I do next?"),
+    ("local", "Did I take my medicine?"),
+    ("local", "Who is Rita?"),
+    ("local", "Where is my home?"),
+    ("local", "What is the time?"),
+    ("bank", "When does Nisha visit?"),
+    ("bank", "Where are my glasses?"),
+    ("llm", "I feel a bit lonely today."),
+    ("llm", "Can you tell me a short story?"),
+    ("llm", "What should I cook for lunch?"),
+]
+
+BANK = {
+    "qa1": {"id": "qa1", "question": "When does Nisha visit?", "answer": "Your daughter Nisha visits on Sundays.",
+            "updated_iso": "2025-11-09T09:00:00"},
+    "qa2": {"id": "qa2", "question": "Where are my glasses?", "answer": "Your glasses are on the table by your bed.",
+            "updated_iso": "2025-11-09T09:00:00"},
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    data = json.loads(DATA_FILE.read_text(encoding="utf-8")) if DATA_FILE.exists() else {}
+    data["qa_bank"] = dict(BANK)
+
+    server, url = start_stub_server(
+        cfg=StubConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    )
+    router = LocalIntentRouter(tz=IST)
+    bank = AnswerBank()
+    bank.sync(data["qa_bank"])
+    executor = ChatExecutor(max_workers=args.workers, max_pending=args.max_pending)
+    limiter = FairRateLimiter(rpm=args.rpm, tpm=args.tpm)
+
+    lock = threading.Lock()
+    latencies: Dict[str, List[float]] = {"local": [], "bank": [], "llm": [], "fallback": [], "busy": [], "error": []}
+    late: List[float] = []
+
+    def session(idx: int) -> None:
+        rnd = random.Random(args.seed + idx)
+        sid = f"bench-{idx}"
+        hist = ChatHistory()
+        for _ in range(args.turns):
+            _, q = rnd.choice(QUESTIONS)
+            t0 = time.perf_counter()
+            hist.append({"role": "user", "content": q})
+            now = dt.datetime.now(tz=IST) if IST else dt.datetime.now()
+            reply, path, job = router.answer(q, data, now), "local", None
+            if not reply:
+                reply, path = bank.best_answer(q), "bank"
+            if not reply:
+                msgs = hist.context("You are a gentle assistant.", schedule=lambda fn: executor.submit(sid, fn))
+                try:
+                    job = executor.submit(sid, limited_chat, limiter, sid, "stub-key", msgs, url=url)
+                    reply = job.wait(args.budget)
+                    path = "llm" if reply is not None else "fallback"
+                    reply = reply or FALLBACK_REPLY
+                except ChatQueueFull:
+                    reply, path = BUSY_REPLY, "busy"
+                if reply == BUSY_REPLY:
+                    path = "busy"
+                elif reply == ERROR_REPLY:
+                    path = "error"
+            elapsed = time.perf_counter() - t0
+            hist.append({"role": "assistant", "content": reply})
+            with lock:
+                latencies[path].append(elapsed)
+            if job is not None and path == "fallback":
+                job.future.result()
+                with lock:
+                    late.append(time.perf_counter() - t0)
+            time.sleep(rnd.uniform(0, args.think))
+
+    t_start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t_start
+    server.shutdown()
+
+    every = [v for vs in latencies.values() for v in vs]
+
+    def summary(vals: List[float]) -> Dict[str, float]:
+        return {
+            "n": len(vals),
+            "p50_ms": percentile(vals, 0.50) * 1000,
+            "p95_ms": percentile(vals, 0.95) * 1000,
+            "p99_ms": percentile(vals, 0.99) * 1000,
+        }
+
+    return {
+        "sessions": args.sessions,
+        "turns_per_session": args.turns,
+        "wall_s": wall,
+        "throughput_rps": len(every) / wall if wall else 0.0,
+        "end_to_end": summary(every),
+        "by_path": {k: summary(v) for k, v in latencies.items() if v},
+        "late_reply_delivered": summary(late),
+        "local_hit_rate": router.stats.snapshot()["hit_rate"],
+        "bank": bank.stats.snapshot(),
+        "rate_limiter": limiter.stats(),
+        "executor": executor.stats(),
+        "stub": {"requests": server.stub_config.requests, "errors_injected": server.stub_config.errors},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="ALZY chat latency benchmark against the offline OpenAI stub")
+    ap.add_argument("--sessions", type=int, default=10, help="concurrent patient sessions")
+    ap.add_argument("--turns", type=int, default=10, help="questions per session")
+    ap.add_argument("--latency", type=float, default=0.6, help="stub mean latency (s)")
+    ap.add_argument("--jitter", type=float, default=0.2)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="stub 429 rate")
+    ap.add_argument("--budget", type=float, default=4.0, help="chat latency budget (s)")
+    ap.add_argument("--rpm", type=float, default=600)
+    ap.add_argument("--tpm", type=float, default=400000)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--max-pending", type=int, default=64)
+    ap.add_argument("--think", type=float, default=0.2, help="max pause between a session's questions (s)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    e2e = report["end_to_end"]
+    print(f"{report['sessions']} sessions × {report['turns_per_session']} turns in {report['wall_s']:.2f}s "
+          f"→ {report['throughput_rps']:.1f} replies/s")
+    print(f"end-to-end  p50 {e2e['p50_ms']:.2f} ms  p95 {e2e['p95_ms']:.2f} ms  p99 {e2e['p99_ms']:.2f} ms")
+    for path, s in report["by_path"].items():
+        print(f"  {path:<9} n={s['n']:<4} p50 {s['p50_ms']:.2f} ms  p95 {s['p95_ms']:.2f} ms  p99 {s['p99_ms']:.2f} ms")
+    lim = report["rate_limiter"]
+    print(f"local hit rate {report['local_hit_rate']:.0%} • limiter wait p95 {lim['p95_wait_s']:.2f}s "
+          f"• max queue {lim['max_queue_depth']} • 429s {lim['throttled_429']} • stub requests {report['stub']['requests']}")
+
+
+if __name__ == "__main__":
+    main()
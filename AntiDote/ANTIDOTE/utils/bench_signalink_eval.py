@@ -0,0 +1,443 @@
+# ANTIDOTE/utils/bench_signalink_eval.py
+# ------------------------------------------------------------
+# SIGNALINK evaluation harness: accuracy, per-stage latency, memory, scaling
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.bench_signalink_eval --samples 2000                   # synthetic DB
+#   python -m utils.bench_signalink_eval --store signalink_assets/gesture_db --folds 0
+#   python -m utils.bench_signalink_eval --scale 1000 10000 100000 --scale-side 32
+#   python -m utils.bench_signalink_eval --out before.json
+#   python -m utils.bench_signalink_eval --out after.json --compare before.json
+#
+# Accuracy: stratified k-fold (--folds N) or leave-one-out (--folds 0) over the
+# stored feature vectors, for 1-NN (find_best_match_vec) and the k-NN vote
+# (predict_sign). Reported with a per-label confusion matrix, precision /
+# recall and a confidence calibration curve (accuracy per confidence bin, ECE).
+# The folds always match the raw stored vectors: --pca-dims and --classifier
+# only change the snapshot whose latency and memory are measured. A --store
+# is copied to a temporary directory first, so models fitted for the run
+# never touch the real DB.
+#
+# Latency: the page's path for one camera photo, timed per stage –
+#   decode      JPEG bytes → PIL image (st.camera_input hands over 640×480 JPEGs;
+#               draft-mode decode at the size the features need)
+#   preprocess  image → feature vector (fused grayscale/resize / hand landmarks)
+#   match       DBSnapshot.best (1-NN over every sample)
+#   predict     DBSnapshot.predict (k-NN vote, or the classifier when trained)
+# as p50 / p95 / mean. Memory: tracemalloc peak while building the snapshot
+# and while predicting, plus the process peak RSS.
+#
+# Scaling: synthetic DBs are written chunk by chunk into temporary stores, so
+# RAM stays bounded; 100k samples of 128×128 pixels need ~6.5 GB of disk
+# (--scale-side 32 for a quick curve).
+#
+# The report is JSON (--json / --out) with the git commit and settings, so
+# runs can be diffed over time; --compare prints the change in headline numbers.
+# ------------------------------------------------------------
+import argparse
+import io
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.bench_signalink_pca import SIDE, synthetic_gestures
+from utils.signalink_db import GestureDB
+from utils.signalink_features import get_extractor
+from utils.signalink_knn import DEFAULT_K, HIGH_CONFIDENCE, MEDIUM_CONFIDENCE, KNNIndex
+from utils.signalink_match import GestureMatcher
+from utils.signalink_preprocess import IMAGE_SUFFIXES
+from utils.signalink_store import DEFAULT_FEATURE, GestureStore
+
+CAMERA_SIZE = (640, 480)
+CALIBRATION_BINS = 10
+SCALE_CHUNK = 2048
+# headline numbers shown by --compare: (path in the report, higher is better)
+HEADLINES = [
+    (("accuracy", "knn", "accuracy"), True),
+    (("accuracy", "1nn", "accuracy"), True),
+    (("accuracy", "knn", "calibration", "ece"), False),
+    (("latency", "total", "p50_ms"), False),
+    (("latency", "total", "p95_ms"), False),
+    (("memory", "snapshot_peak_mb"), False),
+    (("memory", "rss_peak_mb"), False),
+]
+
+
+# ---------- accuracy ----------
+def stratified_folds(labels: np.ndarray, folds: int, seed: int = 0) -> List[np.ndarray]:
+    """Test indices per fold; every label is spread evenly over the folds."""
+    rng = np.random.default_rng(seed)
+    assign = np.empty(len(labels), dtype=np.int64)
+    offset = 0
+    for label in np.unique(labels.astype(str)):
+        idx = np.flatnonzero(labels.astype(str) == label)
+        rng.shuffle(idx)
+        assign[idx] = (np.arange(len(idx)) + offset) % folds
+        offset += len(idx)   # so small labels do not all land in fold 0
+    return [np.flatnonzero(assign == f) for f in range(folds) if (assign == f).any()]
+
+
+def cross_validate(X: np.ndarray, y: np.ndarray, folds: int, k: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Out-of-fold predictions for every sample (folds=0: leave-one-out)."""
+    n = len(y)
+    y = y.astype(str).astype(object)
+    splits = [np.array([i]) for i in range(n)] if folds == 0 else stratified_folds(y, min(folds, n), seed)
+    pred_1nn = np.empty(n, dtype=object)
+    pred_knn = np.empty(n, dtype=object)
+    conf = np.zeros(n, dtype=np.float64)
+    for test in splits:
+        train = np.ones(n, dtype=bool)
+        train[test] = False
+        matcher = GestureMatcher(X[train], y[train])
+        index = KNNIndex(matcher, np.flatnonzero(train), k)
+        pred_1nn[test] = matcher.row_labels[matcher.nearest(X[test], 1)[0][:, 0]]
+        for i in test:
+            p = index.predict(X[i])
+            pred_knn[i], conf[i] = p.label, p.confidence
+    return {"y": y, "1nn": pred_1nn, "knn": pred_knn, "confidence": conf}
+
+
+def confusion(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, Any]:
+    """Confusion matrix (rows = true label) with per-label precision / recall."""
+    labels = sorted(set(y_true) | set(y_pred))
+    pos = {label: i for i, label in enumerate(labels)}
+    m = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    np.add.at(m, ([pos[t] for t in y_true], [pos[p] for p in y_pred]), 1)
+    support, predicted, hits = m.sum(axis=1), m.sum(axis=0), np.diag(m)
+    per_label = {
+        label: {
+            "support": int(support[i]),
+            "precision": float(hits[i] / predicted[i]) if predicted[i] else 0.0,
+            "recall": float(hits[i] / support[i]) if support[i] else 0.0,
+        }
+        for i, label in enumerate(labels)
+    }
+    return {"labels": labels, "matrix": m.tolist(), "per_label": per_label}
+
+
+def calibration(conf: np.ndarray, correct: np.ndarray, bins: int = CALIBRATION_BINS) -> Dict[str, Any]:
+    """Accuracy per confidence bin, expected calibration error, and accuracy per UI level."""
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(conf, edges[1:-1]), 0, bins - 1)
+    curve, ece = [], 0.0
+    for b in range(bins):
+        sel = which == b
+        if not sel.any():
+            continue
+        acc, mean_conf = float(correct[sel].mean()), float(conf[sel].mean())
+        curve.append({"lo": float(edges[b]), "hi": float(edges[b + 1]), "count": int(sel.sum()),
+                      "confidence": mean_conf, "accuracy": acc})
+        ece += sel.mean() * abs(acc - mean_conf)
+    levels = {}
+    for name, lo, hi in (("high", HIGH_CONFIDENCE, np.inf), ("medium", MEDIUM_CONFIDENCE, HIGH_CONFIDENCE),
+                         ("low", -np.inf, MEDIUM_CONFIDENCE)):
+        sel = (conf >= lo) & (conf < hi)
+        levels[name] = {"count": int(sel.sum()), "accuracy": float(correct[sel].mean()) if sel.any() else None}
+    return {"curve": curve, "ece": float(ece), "levels": levels}
+
+
+def accuracy_report(X: np.ndarray, y: np.ndarray, folds: int, k: int, seed: int) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    cv = cross_validate(X, y, folds, k, seed)
+    out: Dict[str, Any] = {"folds": folds or "loo", "k": k, "seconds": time.perf_counter() - t0}
+    for method in ("1nn", "knn"):
+        correct = cv[method] == cv["y"]
+        out[method] = {"accuracy": float(correct.mean()), **confusion(cv["y"], cv[method])}
+    out["knn"]["calibration"] = calibration(cv["confidence"], cv["knn"] == cv["y"])
+    return out
+
+
+# ---------- latency ----------
+def summarize(times: Sequence[float]) -> Dict[str, float]:
+    ms = np.asarray(times, dtype=np.float64) * 1000
+    if not len(ms):
+        return {"n": 0}
+    return {"n": int(len(ms)), "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)),
+            "mean_ms": float(ms.mean())}
+
+
+def camera_jpegs(X: np.ndarray, count: int, seed: int = 0) -> List[bytes]:
+    """Stored pixel rows rendered as 640×480 colour JPEGs, like a st.camera_input photo."""
+    rng = np.random.default_rng(seed)
+    side = int(round(np.sqrt(X.shape[1])))
+    out = []
+    for i in rng.integers(0, len(X), size=count):
+        gray = Image.fromarray((np.clip(X[i].reshape(side, side), 0, 1) * 255).astype(np.uint8))
+        buf = io.BytesIO()
+        gray.resize(CAMERA_SIZE, Image.BILINEAR).convert("RGB").save(buf, format="JPEG", quality=90)
+        out.append(buf.getvalue())
+    return out
+
+
+def photo_bytes(folder: Path, count: int) -> List[bytes]:
+    files = sorted(f for f in folder.rglob("*") if f.suffix.lower() in IMAGE_SUFFIXES)
+    return [files[i % len(files)].read_bytes() for i in range(count)] if files else []
+
+
+Decoder = Callable[[bytes], Image.Image]
+Extractor = Callable[[Image.Image], Optional[np.ndarray]]
+
+
+def feature_pipeline(feature: str) -> Tuple[Decoder, Extractor]:
+    """(decode, extract) as the page runs them for one uploaded photo."""
+    ex = get_extractor(feature)
+    return ex.decode, ex.extract
+
+
+def stage_latency(snap, payloads: Sequence[bytes], pipeline: Tuple[Decoder, Extractor],
+                  warmup: int = 3) -> Dict[str, Any]:
+    stages: Dict[str, List[float]] = {"decode": [], "preprocess": [], "match": [], "predict": [], "total": []}
+    decode, extract = pipeline
+    missed = 0
+    for i, data in enumerate(payloads):
+        t0 = time.perf_counter()
+        img = decode(data)
+        img.load()
+        t1 = time.perf_counter()
+        vec = extract(img)
+        t2 = time.perf_counter()
+        if vec is None:
+            missed += 1
+            continue
+        snap.best(vec)
+        t3 = time.perf_counter()
+        snap.predict(vec)
+        t4 = time.perf_counter()
+        if i < warmup:
+            continue
+        for name, dt in (("decode", t1 - t0), ("preprocess", t2 - t1), ("match", t3 - t2),
+                         ("predict", t4 - t3), ("total", t4 - t0)):
+            stages[name].append(dt)
+    out: Dict[str, Any] = {name: summarize(ts) for name, ts in stages.items()}
+    if missed:
+        out["no_features"] = missed
+    return out
+
+
+# ---------- memory ----------
+def traced_peak_mb(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    """fn() and the peak of memory allocated meanwhile (numpy buffers included), in MB."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 2**20
+
+
+def rss_peak_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10   # bytes on macOS, KB on Linux
+
+
+# ---------- scaling ----------
+def synthetic_store(root: Path, n: int, side: int, seed: int) -> GestureStore:
+    """n synthetic samples written SCALE_CHUNK at a time (one extend per label and chunk)."""
+    store = GestureStore(root)
+    for c, start in enumerate(range(0, n, SCALE_CHUNK)):
+        X, y = synthetic_gestures(min(SCALE_CHUNK, n - start), seed=seed, side=side, sample_seed=c)
+        for label in np.unique(y):
+            store.extend(str(label), X[y == label])
+    return store
+
+
+def scaling_point(n: int, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="signalink-eval-") as tmp:
+        t0 = time.perf_counter()
+        synthetic_store(Path(tmp), n, args.scale_side, args.seed)
+        write_s = time.perf_counter() - t0
+        db = GestureDB(Path(tmp), pca_dims=args.pca_dims, k=args.k, classifier=args.classifier)
+        t0 = time.perf_counter()
+        snap, peak = traced_peak_mb(db.snapshot)
+        build_s = time.perf_counter() - t0
+        queries, _ = synthetic_gestures(args.queries, seed=args.seed, side=args.scale_side, sample_seed=10**6)
+        match, predict = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            snap.best(q)
+            t1 = time.perf_counter()
+            snap.predict(q)
+            match.append(t1 - t0)
+            predict.append(time.perf_counter() - t1)
+        return {
+            "samples": n,
+            "dims": args.scale_side ** 2,
+            "write_s": write_s,
+            "snapshot_build_s": build_s,
+            "snapshot_peak_mb": peak,
+            "index_mb": snap.matcher.nbytes() / 2**20,
+            "kd_tree": snap.knn._tree is not None,
+            "match": summarize(match),
+            "predict": summarize(predict),
+        }
+
+
+# ---------- report ----------
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "settings": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+                     if k not in ("json", "out", "compare")},
+    }
+    with tempfile.TemporaryDirectory(prefix="signalink-eval-") as tmp:
+        if args.store:
+            # work on a copy: PCA models and classifier.joblib must not land in the real DB
+            root = Path(tmp) / "store"
+            shutil.copytree(args.store, root)
+            feature = GestureStore(root).feature
+        else:
+            root = Path(tmp)
+            feature = DEFAULT_FEATURE
+            X, y = synthetic_gestures(args.samples, seed=args.seed)
+            store = GestureStore(root)
+            for label in np.unique(y):
+                store.extend(str(label), X[y == label])
+        db = GestureDB(root, pca_dims=args.pca_dims, k=args.k, classifier=args.classifier, feature=feature)
+        snap, build_peak = traced_peak_mb(db.snapshot)
+        if db.classifier is not None:
+            db.classifier.maybe_train(snap, background=False)   # time the trained model, not the k-NN fallback
+        X, y = db.store.live_rows()
+        X = np.asarray(X, dtype=np.float32)
+        report["db"] = {"samples": int(len(y)), "labels": len(db.store.counts()), "feature": feature,
+                        "dims": int(X.shape[1]) if X.ndim == 2 else 0, "stats": db.stats()}
+        if len(y) < 2:
+            raise SystemExit("the DB needs at least 2 samples")
+
+        if args.folds == 0 and len(y) > args.max_loo:
+            report["accuracy_note"] = f"{len(y)} samples: leave-one-out replaced by 10-fold (see --max-loo)"
+            args.folds = 10
+        if not args.skip_accuracy:
+            report["accuracy"] = accuracy_report(X, y, args.folds, args.k, args.seed)
+            if args.pca_dims or args.classifier:
+                report["settings_note"] = ("accuracy is 1-NN / k-NN on the raw stored vectors; "
+                                           "--pca-dims / --classifier only affect latency and memory")
+
+        if args.images:
+            payloads = photo_bytes(args.images, args.queries)
+        elif feature == DEFAULT_FEATURE and int(round(np.sqrt(X.shape[1]))) ** 2 == X.shape[1]:
+            payloads = camera_jpegs(X, args.queries, args.seed)
+        else:
+            payloads = []
+        if payloads:
+            report["latency"] = stage_latency(snap, payloads, feature_pipeline(feature))
+        else:
+            report["latency_note"] = "no photos to decode: pass --images for a landmark DB"
+        _, predict_peak = traced_peak_mb(lambda: snap.predict(X[0]))
+        report["memory"] = {
+            "index_mb": snap.matcher.nbytes() / 2**20,
+            "snapshot_peak_mb": build_peak,
+            "predict_peak_mb": predict_peak,
+            "rss_peak_mb": rss_peak_mb(),
+        }
+        del snap, db
+
+    if args.scale:
+        report["scaling"] = [scaling_point(n, args) for n in args.scale]
+        report["memory"]["rss_peak_mb"] = rss_peak_mb()
+    return report
+
+
+def lookup(report: Dict[str, Any], path: Sequence[str]) -> Optional[float]:
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report if isinstance(report, (int, float)) else None
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    d = report["db"]
+    print(f"{d['samples']} samples, {d['labels']} signs, {d['feature']} ({d['dims']} dims)")
+    acc = report.get("accuracy")
+    if acc:
+        cal = acc["knn"]["calibration"]
+        print(f"accuracy ({acc['folds']} folds, k={acc['k']}): 1-NN {acc['1nn']['accuracy']:.1%}  "
+              f"k-NN {acc['knn']['accuracy']:.1%}  ECE {cal['ece']:.3f}")
+        for name, lv in cal["levels"].items():
+            if lv["count"]:
+                print(f"  {name:<7} confidence: {lv['count']:>5} predictions, {lv['accuracy']:.1%} correct")
+        worst = sorted(acc["knn"]["per_label"].items(), key=lambda kv: kv[1]["recall"])[:3]
+        print("  lowest recall: " + ", ".join(f"{l} {v['recall']:.0%}" for l, v in worst))
+    for name, s in report.get("latency", {}).items():
+        if isinstance(s, dict) and s.get("n"):
+            print(f"{name:<11} p50 {s['p50_ms']:8.2f} ms   p95 {s['p95_ms']:8.2f} ms")
+    m = report["memory"]
+    print(f"memory: index {m['index_mb']:.1f} MB, snapshot build peak {m['snapshot_peak_mb']:.1f} MB, "
+          f"predict peak {m['predict_peak_mb']:.2f} MB, process peak RSS {m['rss_peak_mb']:.0f} MB")
+    for p in report.get("scaling", []):
+        print(f"scale {p['samples']:>7} × {p['dims']:<5}  build {p['snapshot_build_s']:6.2f} s "
+              f"(peak {p['snapshot_peak_mb']:7.1f} MB)  match p50 {p['match']['p50_ms']:7.2f} ms  "
+              f"predict p50 {p['predict']['p50_ms']:7.2f} / p95 {p['predict']['p95_ms']:7.2f} ms")
+    for note in ("accuracy_note", "settings_note", "latency_note"):
+        if note in report:
+            print(report[note])
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\nvs {baseline.get('commit') or 'baseline'} ({baseline.get('created', '?')}):")
+    for path, higher_better in HEADLINES:
+        new, old = lookup(report, path), lookup(baseline, path)
+        if new is None or old is None:
+            continue
+        delta = new - old
+        better = delta == 0 or (delta > 0) == higher_better
+        print(f"  {'.'.join(path):<36} {old:10.4f} → {new:10.4f}  {'ok ' if better else 'WORSE'}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SIGNALINK accuracy / latency / memory evaluation")
+    ap.add_argument("--store", type=Path, default=None, help="evaluate a real gesture_db directory")
+    ap.add_argument("--samples", type=int, default=1000, help="synthetic samples (ignored with --store)")
+    ap.add_argument("--folds", type=int, default=5, help="stratified folds; 0 = leave-one-out")
+    ap.add_argument("--max-loo", type=int, default=3000, help="larger DBs use 10 folds instead of LOO")
+    ap.add_argument("--k", type=int, default=DEFAULT_K)
+    ap.add_argument("--pca-dims", type=int, default=0, help="time matching with PCA on; accuracy stays on raw vectors")
+    ap.add_argument("--classifier", default="", help="time predictions with logreg / svm; accuracy stays k-NN")
+    ap.add_argument("--images", type=Path, default=None, help="photos to time decode/preprocess on")
+    ap.add_argument("--queries", type=int, default=100, help="photos timed per stage")
+    ap.add_argument("--scale", type=int, nargs="*", default=[], help="synthetic DB sizes for a scaling curve")
+    ap.add_argument("--scale-side", type=int, default=SIDE, help="image side of the scaling samples")
+    ap.add_argument("--skip-accuracy", action="store_true")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    ap.add_argument("--out", type=Path, default=None, help="also write the JSON report here")
+    ap.add_argument("--compare", type=Path, default=None, help="earlier JSON report to compare against")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if args.compare:
+        print_comparison(report, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# ANTIDOTE/utils/bench_signalink_landmarks.py
+# ------------------------------------------------------------
+# SIGNALINK feature benchmark: raw pixels vs MediaPipe hand landmarks
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.bench_signalink_landmarks --images path/to/photos --augment 0
+#   python -m utils.bench_signalink_landmarks                  # images/ sign cards, 12 variants each
+#
+# --images takes one sub-folder per sign (photos/A/*.jpg, photos/B/*.jpg, ...)
+# or flat files named after the sign (A.png, hello.png, alphabet_A.png).
+# Each photo can be expanded into randomly shifted / scaled / rotated /
+# re-lit variants, which is how snapshots of the same sign differ in practice.
+#
+# Reported per pipeline: feature size, extraction time, prediction time and
+# leave-one-out accuracy (1-NN and the k-NN vote). A landmark miss (no hand
+# found) counts as a wrong prediction.
+# ------------------------------------------------------------
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.signalink_knn import KNNIndex
+from utils.signalink_landmarks import MEDIAPIPE_AVAILABLE, get_landmark_extractor
+from utils.signalink_match import GestureMatcher
+from utils.signalink_preprocess import IMAGE_SUFFIXES
+from utils.signalink_reference import augment
+
+DEFAULT_IMAGES = Path(__file__).resolve().parent.parent / "images"
+SIGN_CARDS = {"alphabet_A", "alphabet_B", "alphabet_C", "alphabet_D", "alphabet_E",
+              "hello", "goodbye", "yes", "no", "please", "sorry", "thankyou", "eat"}
+
+
+def pixel_features(img: Image.Image, size: Tuple[int, int] = (128, 128)) -> np.ndarray:
+    """Same as preprocess_image() on the Signalink page."""
+    return (np.asarray(img.convert("L").resize(size), dtype=np.float32) / 255.0).ravel()
+
+
+def load_images(folder: Path) -> List[Tuple[str, Image.Image]]:
+    out = []
+    subdirs = [d for d in sorted(folder.iterdir()) if d.is_dir()]
+    if subdirs:
+        for d in subdirs:
+            for f in sorted(d.iterdir()):
+                if f.suffix.lower() in IMAGE_SUFFIXES:
+                    out.append((d.name, Image.open(f).convert("RGB")))
+        return out
+    for f in sorted(folder.iterdir()):
+        if f.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        if folder == DEFAULT_IMAGES and f.stem not in SIGN_CARDS:
+            continue   # skip portraits and other page art
+        out.append((f.stem.replace("alphabet_", ""), Image.open(f).convert("RGB")))
+    return out
+
+
+def extract(images: List[Tuple[str, Image.Image]], fn: Callable[[Image.Image], Optional[np.ndarray]]):
+    feats, labels, times = [], [], []
+    for label, img in images:
+        t0 = time.perf_counter()
+        v = fn(img)
+        times.append(time.perf_counter() - t0)
+        feats.append(v)
+        labels.append(label)
+    return feats, np.asarray(labels, dtype=object), times
+
+
+def evaluate(feats: List[Optional[np.ndarray]], labels: np.ndarray, times: List[float], k: int) -> Dict[str, Any]:
+    found = np.array([f is not None for f in feats])
+    n = len(feats)
+    report: Dict[str, Any] = {
+        "images": n,
+        "detected": int(found.sum()),
+        "extract_p50_ms": float(np.median(times) * 1000) if times else 0.0,
+    }
+    if found.sum() < 2:
+        report.update(dims=0, loo_1nn=0.0, loo_knn=0.0)
+        return report
+    X = np.stack([f for f in feats if f is not None]).astype(np.float32)
+    y = labels[found]
+    report["dims"] = int(X.shape[1])
+    report["bytes_per_sample"] = int(X.shape[1] * 4)
+
+    # leave-one-out: index everything but the query, predict it
+    hit_1nn = hit_knn = 0
+    predict_times = []
+    for i in range(len(X)):
+        keep = np.arange(len(X)) != i
+        m = GestureMatcher(X[keep], y[keep])
+        idx = KNNIndex(m, np.arange(len(m)), k)
+        t0 = time.perf_counter()
+        pred = idx.predict(X[i])
+        predict_times.append(time.perf_counter() - t0)
+        hit_knn += pred.label == y[i]
+        hit_1nn += m.best(X[i])[0] == y[i]
+    report["predict_p50_ms"] = float(np.median(predict_times) * 1000)
+    report["loo_1nn"] = hit_1nn / n          # misses (no hand) count as wrong
+    report["loo_knn"] = hit_knn / n
+    return report
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    base = load_images(args.images)
+    if not base:
+        raise SystemExit(f"no images found in {args.images}")
+    rng = np.random.default_rng(args.seed)
+    images = list(base)
+    for label, img in base:
+        images.extend((label, augment(img, rng)) for _ in range(args.augment))
+
+    report: Dict[str, Any] = {"signs": len({l for l, _ in base}), "photos": len(base), "samples": len(images)}
+    report["pixels"] = evaluate(*extract(images, pixel_features), k=args.k)
+    if MEDIAPIPE_AVAILABLE:
+        extractor = get_landmark_extractor()
+        t0 = time.perf_counter()
+        extractor(base[0][1])          # model load + first graph run, reported separately
+        report["landmarks_warmup_s"] = time.perf_counter() - t0
+        report["landmarks"] = evaluate(*extract(images, extractor), k=args.k)
+    else:
+        report["landmarks_error"] = "mediapipe is not installed"
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Pixel vs hand-landmark features for SIGNALINK")
+    ap.add_argument("--images", type=Path, default=DEFAULT_IMAGES)
+    ap.add_argument("--augment", type=int, default=12, help="random variants per photo")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['signs']} signs, {report['photos']} photos, {report['samples']} samples")
+    for name in ("pixels", "landmarks"):
+        r = report.get(name)
+        if r is None:
+            continue
+        print(f"{name:<10} {r.get('dims', 0):>6} dims  extract p50 {r['extract_p50_ms']:7.2f} ms  "
+              f"predict p50 {r.get('predict_p50_ms', 0):6.2f} ms  "
+              f"LOO 1-NN {r['loo_1nn']:.1%}  k-NN {r['loo_knn']:.1%}"
+              + (f"  (hand found in {r['detected']}/{r['images']})" if name == "landmarks" else ""))
+    if "landmarks_warmup_s" in report:
+        print(f"MediaPipe load + first image: {report['landmarks_warmup_s']:.2f} s")
+    if "landmarks_error" in report:
+        print(report["landmarks_error"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# ANTIDOTE/utils/bench_signalink_match.py
+# ------------------------------------------------------------
+# SIGNALINK matcher benchmark (synthetic gesture DB)
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.bench_signalink_match --samples 10000 --queries 20
+#
+# Compares the old per-sample Python loop (lists of floats → np.array on
+# every prediction) with the batched GestureMatcher. The loop is timed on a
+# subset (--legacy-samples) and scaled linearly, since holding 10k samples
+# as Python float lists needs several GB.
+# ------------------------------------------------------------
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from utils.signalink_match import GestureMatcher
+
+DIM = 128 * 128
+LABELS = ["A", "B", "C", "D", "E", "Hello", "Goodbye", "Yes", "Please", "Sorry"]
+
+
+def synthetic_samples(n: int, dim: int = DIM, seed: int = 0) -> Tuple[np.ndarray, List[str]]:
+    """n noisy copies of one random prototype per label, values in [0, 1]."""
+    rng = np.random.default_rng(seed)
+    protos = rng.random((len(LABELS), dim), dtype=np.float32)
+    ids = rng.integers(0, len(LABELS), size=n)
+    X = protos[ids]
+    X += rng.normal(0.0, 0.08, size=X.shape).astype(np.float32)
+    np.clip(X, 0.0, 1.0, out=X)
+    return X, [LABELS[i] for i in ids]
+
+
+def legacy_best_match(vec: np.ndarray, db: Dict[str, List[List[float]]]) -> Tuple[str, float]:
+    best_label, best_mse = None, 9999.0
+    for label, samples in db.items():
+        for s in samples:
+            v = np.array(s, dtype=np.float32)
+            mse = float(np.mean((vec - v) ** 2))
+            if mse < best_mse:
+                best_mse, best_label = mse, label
+    return best_label, best_mse
+
+
+def _ms(times: List[float]) -> Dict[str, float]:
+    s = sorted(times)
+    return {
+        "p50_ms": s[len(s) // 2] * 1000,
+        "p95_ms": s[min(len(s) - 1, int(round(0.95 * (len(s) - 1))))] * 1000,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    X, labels = synthetic_samples(args.samples, seed=args.seed)
+    queries, _ = synthetic_samples(args.queries, seed=args.seed + 1)
+
+    t0 = time.perf_counter()
+    matcher = GestureMatcher(X, labels)
+    build_s = time.perf_counter() - t0
+
+    fast: List[float] = []
+    for q in queries:
+        t0 = time.perf_counter()
+        matcher.top_k(q, 3)
+        fast.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    matcher.top_k_batch(queries, 3)
+    batch_s = time.perf_counter() - t0
+
+    n_legacy = min(args.legacy_samples, args.samples)
+    db: Dict[str, List[List[float]]] = {}
+    for row, label in zip(X[:n_legacy], labels[:n_legacy]):
+        db.setdefault(label, []).append(row.tolist())
+    sub = GestureMatcher(X[:n_legacy], labels[:n_legacy])
+    legacy: List[float] = []
+    agree = 0
+    for q in queries[: args.legacy_queries]:
+        t0 = time.perf_counter()
+        lab, mse = legacy_best_match(q, db)
+        legacy.append(time.perf_counter() - t0)
+        f_lab, f_mse = sub.best(q)
+        agree += int(lab == f_lab and abs(mse - f_mse) < 1e-4)
+    scale = args.samples / n_legacy
+    legacy_ms = _ms(legacy)
+    legacy_scaled = {k: v * scale for k, v in legacy_ms.items()}
+    fast_ms = _ms(fast)
+
+    return {
+        "samples": args.samples,
+        "dim": DIM,
+        "matrix_mb": matcher.nbytes() / 2**20,
+        "build_s": build_s,
+        "matcher": fast_ms,
+        "matcher_batch_per_query_ms": batch_s / len(queries) * 1000,
+        "legacy_measured": {"samples": n_legacy, **legacy_ms},
+        "legacy_scaled": legacy_scaled,
+        "speedup_p50": legacy_scaled["p50_ms"] / fast_ms["p50_ms"] if fast_ms["p50_ms"] else 0.0,
+        "agreement": f"{agree}/{len(legacy)}",
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark the SIGNALINK nearest-neighbour matcher")
+    ap.add_argument("--samples", type=int, default=10000)
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--legacy-samples", type=int, default=500, help="subset timed with the old loop")
+    ap.add_argument("--legacy-queries", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    m, ls = report["matcher"], report["legacy_scaled"]
+    print(f"{report['samples']} samples × {report['dim']} dims • matrix {report['matrix_mb']:.0f} MB "
+          f"• built in {report['build_s']:.2f}s")
+    print(f"matcher    p50 {m['p50_ms']:.1f} ms  p95 {m['p95_ms']:.1f} ms  "
+          f"(batched: {report['matcher_batch_per_query_ms']:.1f} ms/query)")
+    print(f"old loop   p50 {ls['p50_ms']:.1f} ms  p95 {ls['p95_ms']:.1f} ms  "
+          f"(scaled from {report['legacy_measured']['samples']} samples)")
+    print(f"speedup ×{report['speedup_p50']:.0f} • same answer on {report['agreement']} queries")
+
+
+if __name__ == "__main__":
+    main()
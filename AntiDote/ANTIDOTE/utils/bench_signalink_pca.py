@@ -0,0 +1,157 @@
+# ANTIDOTE/utils/bench_signalink_pca.py
+# ------------------------------------------------------------
+# SIGNALINK PCA benchmark: storage, prediction latency and leave-one-out
+# accuracy of raw-pixel MSE versus PCA-projected features
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.bench_signalink_pca --samples 1000 --dims 32 64 128 256
+#   python -m utils.bench_signalink_pca --store signalink_assets/gesture_db
+#
+# Synthetic samples are smooth per-label "hand" images with random shifts,
+# brightness changes and noise, which is roughly how webcam snapshots vary.
+# PCA is unsupervised and fitted once on all samples before the LOO pass.
+# ------------------------------------------------------------
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.signalink_match import GestureMatcher
+from utils.signalink_pca import SKLEARN_AVAILABLE, IncrementalPCA
+
+SIDE = 128
+LABELS = ["A", "B", "C", "D", "E", "Hello", "Goodbye", "Yes", "Please", "Sorry"]
+
+
+def synthetic_gestures(n: int, seed: int = 0, labels: List[str] = LABELS, side: int = SIDE,
+                       sample_seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    n noisy side×side samples. seed fixes the per-label prototypes; sample_seed
+    (default: seed) the draws, so a large DB can be generated in chunks.
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:side, 0:side].astype(np.float32) / side
+
+    def blobs(count: int) -> np.ndarray:
+        img = np.zeros((side, side), dtype=np.float32)
+        for _ in range(count):
+            cx, cy, r = rng.uniform(0.25, 0.75), rng.uniform(0.25, 0.75), rng.uniform(0.04, 0.15)
+            img += np.exp(-((xx - cx) ** 2 + (yy - cy) ** 2) / (2 * r * r))
+        return img
+
+    palm = blobs(4)   # shared by every sign, like the hand itself
+    protos = []
+    for _ in labels:
+        img = palm + 0.6 * blobs(2)
+        protos.append(img / img.max())
+    if sample_seed is not None:
+        rng = np.random.default_rng([seed, sample_seed])
+    shift = max(1, side * 10 // SIDE)
+    ids = rng.integers(0, len(labels), size=n)
+    X = np.empty((n, side * side), dtype=np.float32)
+    for i, lid in enumerate(ids):
+        img = np.roll(protos[lid], shift=tuple(rng.integers(-shift, shift + 1, size=2)), axis=(0, 1))
+        img = img * rng.uniform(0.7, 1.3) + rng.normal(0.0, 0.15, size=img.shape).astype(np.float32)
+        X[i] = np.clip(img, 0.0, 1.0).ravel()
+    return X, np.asarray([labels[i] for i in ids], dtype=object)
+
+
+def loo_accuracy(matcher: GestureMatcher, feats: np.ndarray, labels: np.ndarray, chunk: int = 256) -> float:
+    """1-NN leave-one-out: each sample is matched against all the others."""
+    correct = 0
+    for start in range(0, len(feats), chunk):
+        d = matcher.distances(feats[start:start + chunk])
+        rows = np.arange(d.shape[0])
+        d[rows, start + rows] = np.inf
+        correct += int((matcher.row_labels[d.argmin(axis=1)] == labels[start:start + chunk]).sum())
+    return correct / max(1, len(feats))
+
+
+def latency_ms(matcher: GestureMatcher, queries: np.ndarray, project=None) -> float:
+    times = []
+    for q in queries:
+        t0 = time.perf_counter()
+        matcher.top_k(project(q) if project else q, 3)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1000)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.store:
+        from utils.signalink_store import GestureStore
+        X, y = GestureStore(args.store).live_rows()
+        X = np.asarray(X, dtype=np.float32)
+    else:
+        X, y = synthetic_gestures(args.samples, seed=args.seed)
+    n, dim = X.shape
+    queries = X[np.random.default_rng(args.seed + 1).integers(0, n, size=min(n, args.queries))]
+
+    raw = GestureMatcher(X, y)
+    report: Dict[str, Any] = {
+        "samples": n,
+        "raw": {
+            "dims": dim,
+            "bytes_per_sample": dim * 4,
+            "index_mb": raw.nbytes() / 2**20,
+            "p50_ms": latency_ms(raw, queries),
+            "loo_accuracy": loo_accuracy(raw, X, y),
+        },
+        "pca": {},
+    }
+    if not SKLEARN_AVAILABLE:
+        report["pca_error"] = "scikit-learn is not installed"
+        return report
+    for k in args.dims:
+        if k > n:
+            continue
+        t0 = time.perf_counter()
+        model = IncrementalPCA(n_components=k, batch_size=max(512, k)).fit(X)
+        fit_s = time.perf_counter() - t0
+        mean = model.mean_.astype(np.float32)
+        basis = np.ascontiguousarray(model.components_.T, dtype=np.float32)
+        project = lambda v: (np.asarray(v, np.float32).reshape(-1, dim) - mean) @ basis  # noqa: E731
+        feats = project(X)
+        m = GestureMatcher(feats, y, mse_dim=dim)
+        report["pca"][str(k)] = {
+            "fit_s": fit_s,
+            "bytes_per_sample": k * 4,
+            "storage_shrink": dim / k,
+            "index_mb": m.nbytes() / 2**20,
+            "explained_variance": float(model.explained_variance_ratio_.sum()),
+            "p50_ms": latency_ms(m, queries, project),
+            "loo_accuracy": loo_accuracy(m, feats, y),
+        }
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Raw vs PCA matching for SIGNALINK")
+    ap.add_argument("--samples", type=int, default=1000, help="synthetic samples (ignored with --store)")
+    ap.add_argument("--store", type=Path, default=None, help="benchmark a real gesture_db directory")
+    ap.add_argument("--dims", type=int, nargs="+", default=[32, 64, 128, 256])
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    r = report["raw"]
+    print(f"{report['samples']} samples")
+    print(f"raw      {r['dims']:>5} dims  {r['bytes_per_sample'] / 1024:>6.1f} KB/sample  "
+          f"p50 {r['p50_ms']:6.2f} ms  LOO acc {r['loo_accuracy']:.1%}")
+    for k, p in report["pca"].items():
+        print(f"pca      {k:>5} dims  {p['bytes_per_sample'] / 1024:>6.1f} KB/sample  "
+              f"p50 {p['p50_ms']:6.2f} ms  LOO acc {p['loo_accuracy']:.1%}  "
+              f"(×{p['storage_shrink']:.0f} smaller, {p['explained_variance']:.0%} variance, fit {p['fit_s']:.1f}s)")
+    if "pca_error" in report:
+        print(report["pca_error"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# ANTIDOTE/utils/bench_signalink_preprocess.py
+# ------------------------------------------------------------
+# SIGNALINK capture benchmark: old vs fast decode / preprocess / preview
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.bench_signalink_preprocess                    # 640×480, 1280×720, 1920×1080
+#   python -m utils.bench_signalink_preprocess --images path/to/photos --json
+#
+# Per capture:
+#   old   Image.open → convert("L") → resize((128, 128)) → / 255, and
+#         st.image(img) re-encoding the full-size photo (JPEG, like Streamlit)
+#   fast  draft-mode decode → fused crop/resize/normalize, and a 360 px preview
+# plus how far the fast vectors drift from the old ones (MSE), next to the
+# typical MSE between two different samples for scale.
+# ------------------------------------------------------------
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.bench_signalink_pca import synthetic_gestures
+from utils.signalink_preprocess import IMAGE_SUFFIXES, fast_preprocess, legacy_preprocess, parse_crop, preview_image
+
+SIZES = [(640, 480), (1280, 720), (1920, 1080)]
+
+
+def camera_photos(size: Tuple[int, int], n: int, seed: int = 0) -> List[bytes]:
+    X, _ = synthetic_gestures(n, seed=seed)
+    out = []
+    for v in X:
+        img = Image.fromarray((v.reshape(128, 128) * 255).astype(np.uint8)).resize(size, Image.BILINEAR)
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, format="JPEG", quality=90)
+        out.append(buf.getvalue())
+    return out
+
+
+def jpeg_bytes(img: Image.Image) -> int:
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, format="JPEG", quality=90)
+    return buf.tell()
+
+
+def timed(fn: Callable[[bytes], Any], photos: List[bytes], repeat: int) -> Tuple[List[Any], float]:
+    """Results of fn per photo and the median ms per call over `repeat` passes."""
+    times, results = [], []
+    for r in range(repeat):
+        for data in photos:
+            t0 = time.perf_counter()
+            res = fn(data)
+            times.append(time.perf_counter() - t0)
+            if r == 0:
+                results.append(res)
+    return results, float(np.median(times) * 1000)
+
+
+def compare(photos: List[bytes], repeat: int, crop) -> Dict[str, Any]:
+    old_vecs, old_pre = timed(lambda d: legacy_preprocess(Image.open(io.BytesIO(d))), photos, repeat)
+    new_vecs, new_pre = timed(lambda d: fast_preprocess(d, crop=crop), photos, repeat)
+    full = [Image.open(io.BytesIO(d)) for d in photos]
+    _, old_prev = timed(lambda d: jpeg_bytes(Image.open(io.BytesIO(d))), photos, repeat)
+    _, new_prev = timed(lambda d: jpeg_bytes(preview_image(d)), photos, repeat)
+    report: Dict[str, Any] = {
+        "photos": len(photos),
+        "size": list(full[0].size),
+        "old_preprocess_ms": old_pre,
+        "fast_preprocess_ms": new_pre,
+        "old_preview_ms": old_prev,
+        "fast_preview_ms": new_prev,
+        "old_preview_kb": float(np.mean([jpeg_bytes(im) for im in full]) / 1024),
+        "fast_preview_kb": float(np.mean([jpeg_bytes(preview_image(d)) for d in photos]) / 1024),
+    }
+    report["old_capture_ms"] = old_pre + old_prev
+    report["fast_capture_ms"] = new_pre + new_prev
+    report["saved_ms"] = report["old_capture_ms"] - report["fast_capture_ms"]
+    report["speedup"] = report["old_capture_ms"] / max(report["fast_capture_ms"], 1e-9)
+    if crop is None:
+        report["drift_mse"] = float(np.mean([np.mean((a - b) ** 2) for a, b in zip(old_vecs, new_vecs)]))
+        m = min(len(old_vecs), 20)
+        pairs = [np.mean((old_vecs[i] - old_vecs[j]) ** 2) for i in range(m) for j in range(i + 1, m)]
+        report["between_samples_mse"] = float(np.mean(pairs)) if pairs else None
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Old vs fast SIGNALINK capture preprocessing")
+    ap.add_argument("--images", type=Path, default=None, help="real photos instead of synthetic JPEGs")
+    ap.add_argument("--photos", type=int, default=30, help="synthetic photos per size")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--crop", default="", help="'center' or 'l,t,r,b' fractions for the fast path")
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = ap.parse_args()
+
+    crop = parse_crop(args.crop)
+    if args.images:
+        files = sorted(f for f in args.images.rglob("*") if f.suffix.lower() in IMAGE_SUFFIXES)
+        runs = {"images": compare([f.read_bytes() for f in files], args.repeat, crop)}
+    else:
+        runs = {f"{w}x{h}": compare(camera_photos((w, h), args.photos), args.repeat, crop) for w, h in SIZES}
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+    for name, r in runs.items():
+        drift = f"  drift MSE {r['drift_mse']:.1e} (samples differ by {r['between_samples_mse']:.1e})" \
+            if "drift_mse" in r else ""
+        print(f"{name:<10} preprocess {r['old_preprocess_ms']:6.2f} → {r['fast_preprocess_ms']:5.2f} ms  "
+              f"preview {r['old_preview_ms']:6.2f} → {r['fast_preview_ms']:5.2f} ms "
+              f"({r['old_preview_kb']:.0f} → {r['fast_preview_kb']:.0f} KB)  "
+              f"per capture −{r['saved_ms']:.2f} ms (×{r['speedup']:.1f}){drift}")
+
+
+if __name__ == "__main__":
+    main()
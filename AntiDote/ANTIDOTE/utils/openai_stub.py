@@ -0,0 +1,185 @@
+# ANTIDOTE/utils/openai_stub.py
+# ------------------------------------------------------------
+# Offline OpenAI-compatible stub (POST /v1/chat/completions)
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.openai_stub --port 8765 --latency 0.8 --jitter 0.3 --error-rate 0.05
+#
+# Point ALZY at it with:  ALZY_CHAT_API_URL=http://127.0.0.1:8765/v1/chat/completions
+# ------------------------------------------------------------
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+DEFAULT_REPLY = "I'm here with you. Everything is okay. Would you like to look at your reminders?"
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: float = 1.0,
+        reply: str = DEFAULT_REPLY,
+        chunk_delay: float = 0.02,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+
+def _make_handler(cfg: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:  # keep benchmarks quiet
+            pass
+
+        def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self) -> None:
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            n = int(self.headers.get("Content-Length") or 0)
+            try:
+                req = json.loads(self.rfile.read(n) or b"{}")
+            except ValueError:
+                self._send_json(400, {"error": {"message": "invalid JSON"}})
+                return
+
+            with cfg.lock:
+                cfg.requests += 1
+                fail = random.random() < cfg.error_rate
+                if fail:
+                    cfg.errors += 1
+            time.sleep(max(0.0, random.gauss(cfg.latency, cfg.jitter)))
+            if fail:
+                self._send_json(
+                    cfg.error_status,
+                    {"error": {"message": "stub: injected error", "type": "rate_limit_error"}},
+                    {"Retry-After": str(cfg.retry_after)} if cfg.error_status == 429 else None,
+                )
+                return
+
+            model = req.get("model", "stub")
+            words = cfg.reply.split(" ")[: max(1, int(req.get("max_tokens") or 150))]
+            prompt_tokens = sum(len(m.get("content", "")) // 4 for m in req.get("messages", []))
+            cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            if req.get("stream"):
+                self._stream(cid, model, words)
+                return
+            self._send_json(
+                200,
+                {
+                    "id": cid,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": " ".join(words)},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": len(words),
+                        "total_tokens": prompt_tokens + len(words),
+                    },
+                },
+            )
+
+        def _stream(self, cid: str, model: str, words: list) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            def emit(delta: Dict[str, str], finish: str = None) -> None:
+                chunk = {
+                    "id": cid,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            emit({"role": "assistant"})
+            for i, w in enumerate(words):
+                time.sleep(cfg.chunk_delay)
+                emit({"content": w if i == 0 else " " + w})
+            emit({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, cfg: StubConfig = None) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub on a daemon thread; returns (server, chat_completions_url). port=0 picks a free port."""
+    cfg = cfg or StubConfig()
+    server = ThreadingHTTPServer((host, port), _make_handler(cfg))
+    server.daemon_threads = True
+    server.stub_config = cfg
+    threading.Thread(target=server.serve_forever, name="openai-stub", daemon=True).start()
+    h, p = server.server_address[:2]
+    return server, f"http://{h}:{p}/v1/chat/completions"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Offline OpenAI-compatible chat/completions stub")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.5, help="mean response latency (s)")
+    ap.add_argument("--jitter", type=float, default=0.2, help="latency std-dev (s)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    ap.add_argument("--error-status", type=int, default=429)
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--reply", default=DEFAULT_REPLY)
+    args = ap.parse_args()
+    cfg = StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        reply=args.reply,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(cfg))
+    print(f"OpenAI stub listening on http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
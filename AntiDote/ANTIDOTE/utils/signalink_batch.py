@@ -0,0 +1,268 @@
+# ANTIDOTE/utils/signalink_batch.py
+# ------------------------------------------------------------
+# SIGNALINK – bulk training import and batch prediction from the command line
+#
+#   cd AntiDote/ANTIDOTE
+#   python -m utils.signalink_batch import dataset/            # dataset/A/*.jpg, dataset/hello/*.png, ...
+#   python -m utils.signalink_batch import signs.zip --workers 8
+#   python -m utils.signalink_batch predict photos/ --out predictions.csv
+#
+# Sources are a folder or a .zip. For import, the first folder level names the
+# sign (a zip with one wrapping folder, e.g. signs/A/1.jpg, works too); for
+# predict, images may sit anywhere, and when they are in such label folders
+# the CSV gets a "true" column and the accuracy is printed.
+#
+# Decoding and feature extraction run in a process pool (one zip handle per
+# worker). Import writes each batch of results as one capture index write
+# and one store extend per sign, into the same folders the page uses: the
+# captures (so every feature pipeline can be re-derived later) and the
+# active pipeline's feature store. Predict stacks all vectors and matches
+# them with one batched neighbour search (or one classifier call) per chunk;
+# its PCA model and classifier are fitted in a scratch directory unless
+# --keep-models asks for them to be saved next to the store.
+# ------------------------------------------------------------
+import argparse
+import concurrent.futures
+import csv
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.signalink_captures import (
+    CAPTURE_SIDE, CaptureStore, FeatureSpec, encode_capture, pipeline_dir, pipeline_version,
+)
+from utils.signalink_features import FEATURE_VERSIONS, get_extractor
+from utils.signalink_preprocess import IMAGE_SUFFIXES, open_image, parse_crop
+
+ASSETS = Path(__file__).resolve().parent.parent / "signalink_assets"
+BATCH = 512              # images per pool round trip / store write
+MATCH_CHUNK = 1024       # queries per distance matrix
+POOL_MIN = 32            # fewer images than this are processed in-process
+
+# (label or None, display name, file path, zip member or None)
+Item = Tuple[Optional[str], str, Path, Optional[str]]
+
+
+# ---------- sources ----------
+def list_images(source: Path) -> List[Item]:
+    """Every image in a folder tree or zip, with the label folder it sits in (if any)."""
+    source = Path(source)
+    if source.is_dir():
+        out = []
+        for f in sorted(source.rglob("*")):
+            if f.suffix.lower() not in IMAGE_SUFFIXES or not f.is_file():
+                continue
+            rel = f.relative_to(source)
+            out.append((rel.parts[0] if len(rel.parts) > 1 else None, str(rel), f, None))
+        return out
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            names = sorted(n for n in zf.namelist()
+                           if not n.endswith("/") and PurePosixPath(n).suffix.lower() in IMAGE_SUFFIXES
+                           and not n.startswith("__MACOSX/"))
+        parts = [PurePosixPath(n).parts for n in names]
+        # one folder wrapping everything (signs.zip → signs/A/1.jpg): labels are one level down
+        skip = 1 if parts and all(len(p) > 2 for p in parts) and len({p[0] for p in parts}) == 1 else 0
+        return [(p[skip] if len(p) > skip + 1 else None, n, source, n) for n, p in zip(names, parts)]
+    if source.suffix.lower() in IMAGE_SUFFIXES:
+        return [(None, source.name, source, None)]
+    raise ValueError(f"{source} is not a folder, a zip or an image")
+
+
+_ZIPS: Dict[str, zipfile.ZipFile] = {}
+
+
+def read_item(item: Item) -> bytes:
+    _, _, path, member = item
+    if member is None:
+        return path.read_bytes()
+    zf = _ZIPS.get(str(path))
+    if zf is None:                       # one open archive per process, not one per image
+        zf = _ZIPS[str(path)] = zipfile.ZipFile(path)
+    return zf.read(member)
+
+
+def load_for_import(spec: FeatureSpec, item: Item) -> Tuple[Optional[bytes], Optional[np.ndarray]]:
+    """(capture bytes, feature vector of the capture) – the vector the page's sync would derive from it."""
+    try:
+        data = encode_capture(open_image(read_item(item), "RGB", (CAPTURE_SIDE, CAPTURE_SIDE)))
+        return data, get_extractor(spec[0])(data, spec[1])
+    except Exception:
+        return None, None
+
+
+def load_for_predict(spec: FeatureSpec, item: Item) -> Optional[np.ndarray]:
+    try:
+        return get_extractor(spec[0])(read_item(item), spec[1])
+    except Exception:
+        return None
+
+
+def pooled(fn, spec: FeatureSpec, items: Sequence[Item], workers: Optional[int]) -> Iterator[list]:
+    """fn(spec, item) for every item, yielded in order in lists of up to BATCH results."""
+    if len(items) < POOL_MIN or workers == 1:
+        for start in range(0, len(items), BATCH):
+            yield [fn(spec, it) for it in items[start:start + BATCH]]
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(items), BATCH):
+            chunk = items[start:start + BATCH]
+            yield list(pool.map(fn, [spec] * len(chunk), chunk, chunksize=16))
+
+
+# ---------- import ----------
+def import_images(
+    items: Sequence[Item],
+    spec: FeatureSpec,
+    store,
+    captures: Optional[CaptureStore] = None,
+    workers: Optional[int] = None,
+    progress=None,
+) -> Dict[str, object]:
+    """Add labelled items to store (and their captures); returns counts per label and skipped images."""
+    unlabelled = sum(1 for it in items if not it[0])
+    items = [it for it in items if it[0]]
+    added: Dict[str, int] = {}
+    failed: List[str] = []
+    done = 0
+    for results in pooled(load_for_import, spec, items, workers):
+        batch = items[done:done + len(results)]
+        done += len(results)
+        ok = [(it, data, vec) for it, (data, vec) in zip(batch, results) if vec is not None]
+        failed.extend(it[1] for it, (_, vec) in zip(batch, results) if vec is None)
+        ids = captures.add_encoded([(it[0], data) for it, data, _ in ok]) if captures is not None else None
+        by_label: Dict[str, Tuple[List[np.ndarray], List[int]]] = {}
+        for n, (it, _, vec) in enumerate(ok):
+            rows, sources = by_label.setdefault(it[0], ([], []))
+            rows.append(vec)
+            if ids is not None:
+                sources.append(ids[n])
+        for label, (rows, sources) in by_label.items():
+            store.extend(label, np.stack(rows), sources=sources or None)
+            added[label] = added.get(label, 0) + len(rows)
+        if progress is not None:
+            progress(done, len(items))
+    store.maybe_compact(background=False)
+    return {"added": added, "failed": failed, "unlabelled": unlabelled}
+
+
+# ---------- predict ----------
+def predict_images(items: Sequence[Item], spec: FeatureSpec, snap, workers: Optional[int] = None,
+                   k: Optional[int] = None, progress=None) -> List[Dict[str, object]]:
+    """One row per item: predicted sign, confidence, runner-up, and the true label if known."""
+    rows: List[Dict[str, object]] = []
+    done = 0
+    for vecs in pooled(load_for_predict, spec, items, workers):
+        batch = items[done:done + len(vecs)]
+        done += len(vecs)
+        ok = [n for n, v in enumerate(vecs) if v is not None]
+        preds: List[Optional[object]] = [None] * len(vecs)
+        for start in range(0, len(ok), MATCH_CHUNK):
+            part = ok[start:start + MATCH_CHUNK]
+            for n, pred in zip(part, snap.predict_batch(np.stack([vecs[i] for i in part]), k)):
+                preds[n] = pred
+        for it, vec, pred in zip(batch, vecs, preds):
+            runner = list(pred.votes.items())[1] if pred is not None and len(pred.votes) > 1 else ("", 0.0)
+            rows.append({
+                "file": it[1],
+                "true": it[0] or "",
+                "predicted": pred.label if pred is not None else "",
+                "confidence": round(pred.confidence, 4) if pred is not None else "",
+                "level": pred.level if pred is not None else ("no hand" if vec is None else ""),
+                "mse": round(pred.mse, 6) if pred is not None and pred.mse is not None else "",
+                "source": pred.source if pred is not None else "",
+                "runner_up": runner[0],
+                "runner_up_share": round(runner[1], 4) if runner[0] else "",
+            })
+        if progress is not None:
+            progress(done, len(items))
+    return rows
+
+
+def _progress(verb: str):
+    def report(done: int, total: int) -> None:
+        print(f"\r{verb} {done}/{total}", end="" if done < total else "\n", file=sys.stderr, flush=True)
+    return report
+
+
+def main() -> None:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("source", type=Path, help="folder, .zip or single image")
+    common.add_argument("--assets", type=Path, default=ASSETS, help="signalink_assets folder")
+    common.add_argument("--feature", default="pixels", choices=sorted(FEATURE_VERSIONS))
+    common.add_argument("--crop", default="", help="'center' or 'l,t,r,b' fractions (ignored by landmarks)")
+    common.add_argument("--workers", type=int, default=None, help="processes for decode + features (default: CPUs)")
+    ap = argparse.ArgumentParser(description="SIGNALINK bulk import and batch prediction")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", parents=[common], help="add a labelled folder tree or zip to the gesture DB")
+    imp.add_argument("--no-captures", action="store_true",
+                     help="only store feature vectors (other pipelines cannot re-derive these samples)")
+    pred = sub.add_parser("predict", parents=[common], help="classify every image in a folder or zip")
+    pred.add_argument("--out", type=Path, default=None, help="CSV file (default: stdout)")
+    pred.add_argument("--k", type=int, default=None)
+    pred.add_argument("--pca-dims", type=int, default=0)
+    pred.add_argument("--classifier", default="", help="'logreg' or 'svm' (trained on first use)")
+    pred.add_argument("--keep-models", action="store_true",
+                      help="fit PCA / the classifier inside the gesture DB and keep them (default: a scratch dir)")
+    args = ap.parse_args()
+
+    from utils.signalink_db import GestureDB
+
+    crop = parse_crop(args.crop)
+    spec: FeatureSpec = (args.feature, crop)
+    root = pipeline_dir(args.assets, pipeline_version(args.feature, crop))
+    items = list_images(args.source)
+    t0 = time.perf_counter()
+
+    if args.cmd == "import":
+        captures = None if args.no_captures else CaptureStore(args.assets / "captures")
+        db = GestureDB(root, feature=args.feature, captures=captures)
+        if captures is not None:
+            db.sync(spec, args.workers)       # earlier captures first, so sources stay one-to-one
+        result = import_images(items, spec, db.store, captures, args.workers, _progress("imported"))
+        total = sum(result["added"].values())
+        print(f"{root.name}: added {total} samples for {len(result['added'])} signs "
+              f"in {time.perf_counter() - t0:.1f} s ({total / max(time.perf_counter() - t0, 1e-9):.0f}/s)")
+        for label, n in sorted(result["added"].items()):
+            print(f"  {label}: +{n}")
+        if result["failed"]:
+            print(f"  {len(result['failed'])} images skipped (unreadable or no hand), e.g. {result['failed'][0]}")
+        if result["unlabelled"]:
+            print(f"  {result['unlabelled']} images outside a label folder were ignored")
+        return
+
+    with tempfile.TemporaryDirectory(prefix="signalink-models-") as scratch:
+        model_dir = None if args.keep_models else Path(scratch)
+        db = GestureDB(root, feature=args.feature, pca_dims=args.pca_dims, classifier=args.classifier,
+                       model_dir=model_dir)
+        snap = db.snapshot()
+        if db.classifier is not None:
+            db.classifier.maybe_train(snap, background=False)
+        if not len(snap):
+            sys.exit(f"{root} has no samples yet – import some first")
+        rows = predict_images(items, spec, snap, args.workers, args.k, _progress("predicted"))
+    elapsed = time.perf_counter() - t0
+    fields = list(rows[0]) if rows else ["file", "predicted"]
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if args.out:
+            out.close()
+    labelled = [r for r in rows if r["true"] and r["predicted"]]
+    summary = f"{len(rows)} images in {elapsed:.1f} s ({len(rows) / max(elapsed, 1e-9):.0f}/s)"
+    if labelled:
+        hits = sum(r["true"] == r["predicted"] for r in labelled)
+        summary += f", accuracy {hits / len(labelled):.1%} on {len(labelled)} labelled"
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
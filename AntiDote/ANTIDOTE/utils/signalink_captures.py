@@ -0,0 +1,334 @@
+# ANTIDOTE/utils/signalink_captures.py
+# ------------------------------------------------------------
+# SIGNALINK – the original training captures, kept small and compressed
+#
+#   signalink_assets/captures/
+#     index.jsonl      append-only log: {"add": id, "label", "file", "t"},
+#                      {"remove": [id, ...]}, {"remove_label": label, "below": id}, {"clear": id}
+#     00000042.webp    the capture, longest side CAPTURE_SIDE px (JPEG without WebP support)
+#
+# Feature stores (utils/signalink_store.py) are caches derived from these: one
+# store directory per feature pipeline (extractor + its settings), each row
+# remembering the capture it came from. featurize() brings a store up to date
+# lazily – only captures it has not seen are decoded, in a process pool when
+# there are many – and drops rows whose capture was deleted. Switching the
+# pipeline (pixels ↔ landmarks, a crop, ...) therefore re-derives everything
+# from the captures instead of asking for new recordings, and switching back
+# finds its old cache intact.
+#
+#   python -m utils.signalink_captures info
+#   python -m utils.signalink_captures featurize --feature landmarks --workers 4
+# ------------------------------------------------------------
+import argparse
+import concurrent.futures
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+from utils.signalink_features import FEATURE_VERSIONS, get_extractor
+from utils.signalink_preprocess import Crop, parse_crop
+from utils.signalink_store import GestureStore
+
+try:
+    import fcntl  # serialize writers across processes (POSIX only)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+CAPTURE_SIDE = 320            # plenty for 128×128 pixels and for MediaPipe on a single hand
+CAPTURE_QUALITY = 80
+CAPTURE_FORMAT = "WEBP" if features.check("webp") else "JPEG"
+INDEX_FILE = "index.jsonl"
+LOCK_FILE = ".lock"
+POOL_MIN = 64                 # fewer missing captures than this are featurized in-process
+
+# (feature, crop): everything a worker process needs to rebuild the extractor
+FeatureSpec = Tuple[str, Optional[Crop]]
+
+
+def pipeline_version(feature: str, crop: Optional[Crop] = None) -> str:
+    """Names the vectors a (feature, crop) pipeline produces; one feature store per version."""
+    version = FEATURE_VERSIONS.get(feature, feature)
+    if crop is not None and feature != "landmarks":
+        version += "-crop-" + ("center" if crop[0] < 0 else ",".join(f"{c:g}" for c in crop))
+    return version
+
+
+def pipeline_dir(assets: Path, version: str) -> Path:
+    """Store directory for a pipeline; the two original pipelines keep their old folders."""
+    legacy = {FEATURE_VERSIONS["pixels"]: "gesture_db", FEATURE_VERSIONS["landmarks"]: "gesture_db_landmarks"}
+    name = legacy.get(version) or "gesture_db_" + re.sub(r"[^a-z0-9.]+", "-", version.lower()).strip("-")
+    return Path(assets) / name
+
+
+def encode_capture(img: Image.Image) -> bytes:
+    """img downscaled to CAPTURE_SIDE and compressed, as stored in the capture folder."""
+    small = img.convert("RGB")
+    if max(small.size) > CAPTURE_SIDE:
+        small = small.copy()
+        small.thumbnail((CAPTURE_SIDE, CAPTURE_SIDE), Image.BICUBIC)
+    buf = io.BytesIO()
+    small.save(buf, format=CAPTURE_FORMAT, quality=CAPTURE_QUALITY)
+    return buf.getvalue()
+
+
+def extract_file(spec: FeatureSpec, path: Path) -> Optional[np.ndarray]:
+    """Feature vector of one stored capture (module level, so worker processes can run it)."""
+    feature, crop = spec
+    try:
+        return get_extractor(feature)(path, crop)
+    except Exception:
+        return None
+
+
+class CaptureStore:
+    """Compressed original captures with labels; ids only grow and are never reused."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._live: Dict[int, Tuple[str, str]] = {}   # id -> (label, file name)
+        self._next = 0
+        self._offset = 0
+        self.refresh()
+
+    # ---------- index ----------
+    def refresh(self) -> bool:
+        """Apply index lines written since the last call (by any process)."""
+        path = self.root / INDEX_FILE
+        with self._lock:
+            try:
+                if path.stat().st_size < self._offset:     # replaced: start over
+                    self._live, self._next, self._offset = {}, 0, 0
+                with open(path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except OSError:
+                return False
+            end = data.rfind(b"\n") + 1         # ignore a half-written last line
+            for line in data[:end].splitlines():
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    continue
+            self._offset += end
+            return end > 0
+
+    def _apply(self, event: Dict[str, object]) -> None:
+        if "add" in event:
+            cid = int(event["add"])
+            self._live[cid] = (str(event["label"]), str(event["file"]))
+            self._next = max(self._next, cid + 1)
+        elif "remove" in event:
+            for cid in event["remove"]:
+                self._live.pop(int(cid), None)
+        elif "remove_label" in event:
+            below = int(event["below"])
+            self._live = {i: v for i, v in self._live.items() if not (v[0] == event["remove_label"] and i < below)}
+        elif "clear" in event:
+            below = int(event["clear"])
+            self._live = {i: v for i, v in self._live.items() if i >= below}
+
+    def _log(self, *events: Dict[str, object]) -> None:
+        with open(self.root / INDEX_FILE, "ab") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in events).encode("utf-8"))
+            f.flush()
+        self.refresh()
+
+    def _locked(self):
+        return _FileLock(self.root / LOCK_FILE, self._lock)
+
+    # ---------- read side ----------
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def items(self) -> List[Tuple[int, str]]:
+        """(capture id, label) of every live capture, oldest first."""
+        return sorted((cid, v[0]) for cid, v in self._live.items())
+
+    def path(self, cid: int) -> Path:
+        return self.root / self._live[cid][1]
+
+    def counts(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for label, _ in self._live.values():
+            out[label] = out.get(label, 0) + 1
+        return out
+
+    def thumbnails(self, label: str, n: int = 6) -> List[bytes]:
+        """Encoded bytes of the newest n captures of label (ready for st.image, no re-encode)."""
+        ids = sorted((cid for cid, v in self._live.items() if v[0] == label), reverse=True)[:n]
+        out = []
+        for cid in ids:
+            try:
+                out.append(self.path(cid).read_bytes())
+            except OSError:
+                continue
+        return out
+
+    def stats(self) -> Dict[str, object]:
+        size = 0
+        for _, name in self._live.values():
+            try:
+                size += (self.root / name).stat().st_size
+            except OSError:
+                pass
+        return {"captures": len(self._live), "capture_kb": size / 1024, "capture_format": CAPTURE_FORMAT}
+
+    # ---------- write side ----------
+    def add(self, label: str, img: Image.Image) -> int:
+        """Save a downscaled, compressed copy of img; returns its capture id."""
+        return self.add_encoded([(label, encode_capture(img))])[0]
+
+    def add_encoded(self, items: Sequence[Tuple[str, bytes]]) -> List[int]:
+        """Store (label, encode_capture() bytes) pairs under one lock and one index write; returns their ids."""
+        if not items:
+            return []
+        ext = "webp" if CAPTURE_FORMAT == "WEBP" else "jpg"
+        with self._locked():
+            self.refresh()
+            first, events = self._next, []
+            for cid, (label, data) in enumerate(items, start=first):
+                name = f"{cid:08d}.{ext}"
+                fd, tmp = tempfile.mkstemp(prefix="capture.", suffix=".tmp", dir=str(self.root))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, self.root / name)
+                events.append({"add": cid, "label": label, "file": name, "t": round(time.time(), 3)})
+            self._log(*events)
+            return list(range(first, first + len(items)))
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Delete individual captures (e.g. samples pruned as redundant)."""
+        with self._locked():
+            self.refresh()
+            ids = [int(i) for i in ids if int(i) in self._live]
+            if ids:
+                gone = [self._live[i][1] for i in ids]
+                self._log({"remove": ids})
+                self._unlink(gone)
+            return len(ids)
+
+    def remove_label(self, label: str) -> int:
+        with self._locked():
+            self.refresh()
+            gone = [v[1] for v in self._live.values() if v[0] == label]
+            if gone:
+                self._log({"remove_label": label, "below": self._next})
+                self._unlink(gone)
+            return len(gone)
+
+    def clear(self) -> None:
+        with self._locked():
+            self.refresh()
+            gone = [v[1] for v in self._live.values()]
+            self._log({"clear": self._next})
+            self._unlink(gone)
+
+    def _unlink(self, names: Iterable[str]) -> None:
+        for name in names:
+            try:
+                os.remove(self.root / name)
+            except OSError:
+                pass
+
+
+class _FileLock:
+    """Thread lock + exclusive flock on a lock file, as a context manager."""
+
+    def __init__(self, path: Path, lock: threading.RLock):
+        self.path, self.lock, self.f = path, lock, None
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.f = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+            self.f.close()
+        finally:
+            self.lock.release()
+
+
+# ---------- deriving feature stores ----------
+def featurize(
+    captures: CaptureStore,
+    store: GestureStore,
+    spec: FeatureSpec,
+    workers: Optional[int] = None,
+    pool_min: int = POOL_MIN,
+) -> Dict[str, int]:
+    """
+    Bring store up to date with captures: derive features for captures it has
+    no row for, tombstone rows whose capture is gone. Returns counts.
+    """
+    captures.refresh()
+    store.refresh()
+    live = dict(captures.items())
+    seqs, sources = store.live_sources()
+    stale = seqs[(sources >= 0) & ~np.isin(sources, np.fromiter(live, dtype=np.int64, count=len(live)))]
+    if stale.size:
+        store.remove_rows(stale)
+    have = set(sources[sources >= 0].tolist())
+    missing = [(cid, label) for cid, label in live.items() if cid not in have]
+    added = failed = 0
+    if missing:
+        paths = [captures.path(cid) for cid, _ in missing]
+        if len(missing) >= pool_min and workers != 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                vecs = list(pool.map(extract_file, [spec] * len(paths), paths, chunksize=16))
+        else:
+            vecs = [extract_file(spec, p) for p in paths]
+        by_label: Dict[str, Tuple[List[np.ndarray], List[int]]] = {}
+        for (cid, label), vec in zip(missing, vecs):
+            if vec is None:
+                failed += 1
+                continue
+            rows, ids = by_label.setdefault(label, ([], []))
+            rows.append(vec)
+            ids.append(cid)
+        for label, (rows, ids) in by_label.items():
+            store.extend(label, np.stack(rows), sources=ids)
+            added += len(ids)
+    return {"added": added, "removed": int(stale.size), "failed": failed}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SIGNALINK training captures")
+    ap.add_argument("--assets", type=Path, default=Path(__file__).resolve().parent.parent / "signalink_assets")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info", help="captures per label")
+    f = sub.add_parser("featurize", help="derive a feature store from the captures")
+    f.add_argument("--feature", default="pixels", choices=sorted(FEATURE_VERSIONS))
+    f.add_argument("--crop", default="", help="'center' or 'l,t,r,b' fractions (ignored by landmarks)")
+    f.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    captures = CaptureStore(args.assets / "captures")
+    if args.cmd == "info":
+        print(json.dumps(dict(captures.stats(), labels=captures.counts()), indent=2))
+        return
+    crop = parse_crop(args.crop)
+    root = pipeline_dir(args.assets, pipeline_version(args.feature, crop))
+    t0 = time.perf_counter()
+    result = featurize(captures, GestureStore(root, args.feature), (args.feature, crop), args.workers, pool_min=1)
+    print(f"{root.name}: {result} in {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# ANTIDOTE/utils/signalink_classifier.py
+# ------------------------------------------------------------
+# SIGNALINK – optional trained classifier instead of nearest-neighbour search
+#
+#   gesture_db/classifier.joblib    fitted pipeline + what it was trained on
+#
+# A linear model (logistic regression or linear SVM) over compressed
+# features: the PCA projection when PCA is on, otherwise 4×4-pooled pixels
+# (32×32 = 1024 numbers). Prediction is one small matrix product, whatever
+# the number of saved samples.
+#
+# A model is only used for the exact set of live samples it was trained on
+# (rows_key of the snapshot) and the same feature space; after any change the
+# snapshot falls back to k-NN (which already includes the new samples) while
+# a background job retrains. The retrain waits until the samples have been
+# unchanged for RETRAIN_DEBOUNCE seconds, so a burst of recordings or feedback
+# clicks costs one fit, and logistic regression starts from the previous
+# weights when the signs are the same.
+# ------------------------------------------------------------
+import copy
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+CLASSIFIER_AVAILABLE = True
+try:
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import LinearSVC
+except Exception:
+    joblib = None
+    CLASSIFIER_AVAILABLE = False
+
+from utils.signalink_features import pool_grid
+from utils.signalink_knn import KNNPrediction
+
+KINDS = ("logreg", "svm")
+MODEL_FILE = "classifier.joblib"
+POOL = 4
+CHUNK_ROWS = 1024
+RETRAIN_DEBOUNCE = 3.0      # seconds without new samples before a background retrain starts
+
+
+def pool_pixels(X: np.ndarray, pool: int = POOL) -> np.ndarray:
+    """pool_grid for images; other widths (e.g. landmarks) pass through."""
+    X = np.asarray(X, dtype=np.float32)
+    X = X.reshape(-1, X.shape[-1])
+    try:
+        return pool_grid(X, pool)
+    except ValueError:
+        return X
+
+
+class GestureClassifier:
+    """Background-trained linear classifier stored next to the gesture DB."""
+
+    def __init__(self, root: Path, kind: str = "logreg", debounce: float = RETRAIN_DEBOUNCE):
+        if kind not in KINDS:
+            raise ValueError(f"classifier kind must be one of {KINDS}")
+        self.root = Path(root)
+        self.kind = kind
+        self.debounce = debounce
+        self._timer: Optional[threading.Timer] = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._state: Optional[Dict[str, object]] = None
+        self._mtime = 0.0
+        self.last_error: Optional[str] = None
+
+    # ---------- persistence ----------
+    @property
+    def path(self) -> Path:
+        return self.root / MODEL_FILE
+
+    def _reload(self) -> Optional[Dict[str, object]]:
+        """The persisted state, re-read when another process replaced the file."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return self._state
+        if mtime != self._mtime:
+            with self._lock:
+                try:
+                    state = joblib.load(self.path)
+                except Exception:
+                    return self._state
+                self._mtime = mtime
+                self._state = state if state.get("kind") == self.kind else None
+        return self._state
+
+    def _save(self, state: Dict[str, object]) -> None:
+        fd, tmp = tempfile.mkstemp(prefix="classifier.", suffix=".tmp", dir=str(self.root))
+        os.close(fd)
+        joblib.dump(state, tmp)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.path)
+
+    # ---------- features ----------
+    @staticmethod
+    def _feature_space(snap) -> str:
+        return f"pca:{snap.model_id}" if snap.project is not None else f"pool:{POOL}"
+
+    @staticmethod
+    def _features(snap, vecs: np.ndarray) -> np.ndarray:
+        return snap.features(vecs) if snap.project is not None else pool_pixels(vecs)
+
+    def _training_set(self, snap):
+        """
+        Features, labels and sample weights of every live row; the matcher
+        already holds PCA features when PCA is on. Reference rows keep the
+        low prior weight they vote with in k-NN.
+        """
+        m = snap.matcher
+        knn = getattr(snap, "knn", None)
+        weights = getattr(knn, "weights", None)
+        if snap.project is not None:
+            return m.rows(np.arange(len(m))), m.row_labels.astype(str), weights
+        feats = [
+            pool_pixels(m.rows(np.arange(start, min(start + CHUNK_ROWS, len(m)))))
+            for start in range(0, len(m), CHUNK_ROWS)
+        ]
+        return np.concatenate(feats), m.row_labels.astype(str), weights
+
+    # ---------- state ----------
+    def model_for(self, snap):
+        """The fitted pipeline if it matches this snapshot exactly, else None."""
+        state = self._reload() if CLASSIFIER_AVAILABLE else None
+        if state is None or state["rows_key"] != snap.rows_key or state["features"] != self._feature_space(snap):
+            return None
+        return state["model"]
+
+    @property
+    def training(self) -> bool:
+        return self._train_lock.locked()
+
+    def info(self) -> Dict[str, object]:
+        state = self._state
+        out: Dict[str, object] = {"kind": self.kind, "training": self.training, "scheduled": self._pending is not None}
+        if state is not None:
+            out.update(samples=state["samples"], trained_at=state["trained_at"], fit_s=state["fit_s"])
+        if self.last_error:
+            out["error"] = self.last_error
+        return out
+
+    # ---------- training ----------
+    def train(self, snap) -> bool:
+        if not CLASSIFIER_AVAILABLE or len(snap.counts) < 2 or not self._train_lock.acquire(blocking=False):
+            return False
+        try:
+            t0 = time.perf_counter()
+            X, y, weights = self._training_set(snap)
+            model = self._warm_model(snap, y)
+            if model is None:
+                if self.kind == "svm":
+                    clf = LinearSVC(C=0.01, max_iter=5000)
+                else:
+                    clf = LogisticRegression(C=1.0, max_iter=1000)
+                model = make_pipeline(StandardScaler(), clf)
+            if weights is None:
+                model.fit(X, y)
+            else:
+                model.fit(X, y, **{f"{name}__sample_weight": weights for name, _ in model.steps})
+            state = {
+                "model": model,
+                "kind": self.kind,
+                "features": self._feature_space(snap),
+                "rows_key": snap.rows_key,
+                "samples": len(y),
+                "trained_at": time.time(),
+                "fit_s": time.perf_counter() - t0,
+            }
+            self._save(state)
+            with self._lock:
+                self._state = state
+                self._mtime = self.path.stat().st_mtime
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            return False
+        finally:
+            self._train_lock.release()
+
+    def _warm_model(self, snap, y: np.ndarray):
+        """A copy of the current logistic regression set to continue from its weights, if the signs are unchanged."""
+        state = self._state
+        if self.kind != "logreg" or state is None or state["features"] != self._feature_space(snap):
+            return None
+        model = state["model"]
+        if list(model.classes_) != sorted(set(y)):
+            return None
+        model = copy.deepcopy(model)
+        model.steps[-1][1].set_params(warm_start=True)
+        return model
+
+    def maybe_train(self, snap, background: bool = True) -> bool:
+        """
+        Schedule a retrain if the stored model does not match snap: in the
+        background once snap has been the newest for `debounce` seconds.
+        """
+        if not CLASSIFIER_AVAILABLE or self.training or len(snap.counts) < 2 or self.model_for(snap) is not None:
+            return False
+        if not background:
+            self._cancel_pending()      # the fit below supersedes a scheduled one
+            self.train(snap)
+            return True
+        with self._lock:
+            if self._pending is not None and self._pending.rows_key == snap.rows_key:
+                return True             # already scheduled for these samples
+            if self._timer is not None:
+                self._timer.cancel()    # newer samples: start waiting again
+            self._pending = snap
+            self._timer = threading.Timer(self.debounce, self._train_pending)
+            self._timer.name = "gesture-classifier-fit"
+            self._timer.daemon = True
+            self._timer.start()
+        return True
+
+    def _cancel_pending(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._pending, self._timer = None, None
+
+    def _train_pending(self) -> None:
+        with self._lock:
+            snap, self._pending, self._timer = self._pending, None, None
+        if snap is not None and self.model_for(snap) is None:
+            self.train(snap)
+
+    # ---------- prediction ----------
+    def predict(self, snap, vec: np.ndarray) -> Optional[KNNPrediction]:
+        """Class probabilities from the trained model, or None while it is stale."""
+        preds = self.predict_batch(snap, np.asarray(vec).reshape(1, -1))
+        return preds[0] if preds is not None else None
+
+    def predict_batch(self, snap, vecs: np.ndarray) -> Optional[List[KNNPrediction]]:
+        """predict() for every row of vecs in one model call, or None while the model is stale."""
+        model = self.model_for(snap)
+        if model is None:
+            return None
+        x = self._features(snap, vecs)
+        if hasattr(model, "predict_proba"):
+            probs = model.predict_proba(x)
+        else:
+            # LinearSVC has no probabilities: softmax of its margins as a score
+            margins = model.decision_function(x)
+            if margins.ndim == 1:       # binary: one margin for classes_[1]
+                margins = np.stack([-margins, margins], axis=1)
+            e = np.exp(margins - margins.max(axis=1, keepdims=True))
+            probs = e / e.sum(axis=1, keepdims=True)
+        classes = model.classes_
+        out = []
+        for p in probs:
+            order = np.argsort(-p, kind="stable")
+            out.append(KNNPrediction(
+                label=str(classes[order[0]]),
+                mse=None,
+                confidence=float(p[order[0]]),
+                share=float(p[order[0]]),
+                votes={str(classes[i]): float(p[i]) for i in order[:5]},
+                neighbours=[],
+                source="model",
+            ))
+        return out
@@ -0,0 +1,254 @@
+# ANTIDOTE/utils/signalink_composer.py
+# ------------------------------------------------------------
+# SIGNALINK – turn a stream of recognized signs into sentences
+#
+#   recognized sign per frame ─► SignDebouncer ─► tokens ─► SentenceComposer
+#                                (hold / release)            │  letters build a word,
+#                                                            │  word signs add a word
+#                                      WordPredictor ◄───────┘  suggestions for the
+#                                      (prefix trie + bigrams)   word being spelled / next word
+#
+# Letters are slow to sign, so the predictor offers completions for the
+# current prefix and, after a space, likely next words; accepting one
+# finishes a whole word with a single tap.
+# ------------------------------------------------------------
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_HOLD_S = 0.8      # a sign must be shown this long to count
+DEFAULT_RELEASE_S = 0.5   # ...and put down this long before the same sign counts again
+
+# Everyday words for someone who cannot speak, on top of the sign labels
+BASIC_WORDS = """
+i you we he she it they me my your yes no please thank thanks sorry hello hi goodbye bye
+want need like love help stop go come wait eat drink sleep sit stand call feel see hear
+water food bathroom toilet doctor nurse medicine pain hurt sick tired hungry thirsty cold hot
+home family mother father brother sister daughter son friend phone bed chair now later
+today tomorrow again more done good bad okay fine where what when who why how here there
+and the a to is am are not can do don't with for of in on at all very much
+""".split()
+
+
+def is_letter(token: str) -> bool:
+    """Single fingerspelled letter (A, B, ...) as opposed to a whole-word sign."""
+    return len(token) == 1 and token.isalpha()
+
+
+class SignDebouncer:
+    """
+    Hold / release state machine over the per-frame (already smoothed) sign.
+
+    A sign is emitted once it has been seen continuously for hold_s. The
+    same sign is emitted again only after it disappeared for at least
+    release_s (so a held "B" is one B, and "B, hand down, B" is two), while
+    shorter dropouts are treated as flicker. A different sign needs no
+    release, just its own hold.
+    """
+
+    def __init__(self, hold_s: float = DEFAULT_HOLD_S, release_s: float = DEFAULT_RELEASE_S):
+        self.hold_s = hold_s
+        self.release_s = release_s
+        self.candidate: Optional[str] = None
+        self.since = 0.0
+        self.committed: Optional[str] = None
+        self._gone_since: Optional[float] = None
+
+    def update(self, label: Optional[str], now: float) -> Optional[str]:
+        """Feed the sign seen at time now (None = nothing); returns a token when one is committed."""
+        if self.committed is not None:
+            if label == self.committed:
+                self._gone_since = None
+                return None
+            if self._gone_since is None:
+                self._gone_since = now
+            if now - self._gone_since >= self.release_s:
+                self.committed = None
+        if label is None:
+            self.candidate = None
+            return None
+        if label != self.candidate:
+            self.candidate, self.since = label, now
+            return None
+        if label != self.committed and now - self.since >= self.hold_s:
+            self.committed, self.candidate, self._gone_since = label, None, None
+            return label
+        return None
+
+    def progress(self, now: float) -> Tuple[Optional[str], float]:
+        """(sign being held, share of hold_s done) for a progress indicator."""
+        if self.candidate is None or self.candidate == self.committed:
+            return None, 0.0
+        return self.candidate, min(1.0, (now - self.since) / self.hold_s) if self.hold_s else 1.0
+
+    def reset(self) -> None:
+        self.candidate, self.committed, self._gone_since = None, None, None
+
+
+class _TrieNode:
+    __slots__ = ("children", "count")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.count = 0
+
+
+class WordPredictor:
+    """
+    Word completion and next-word prediction.
+
+    Words live in a prefix trie with unigram counts; word pairs seen in
+    phrases and spoken sentences give bigram counts. A candidate's score is
+    λ·P(word | previous word) + (1 − λ)·P(word).
+    """
+
+    def __init__(self, words: Iterable[str] = (), bigram_weight: float = 0.6):
+        self.root = _TrieNode()
+        self.total = 0
+        self.bigrams: Dict[str, Dict[str, int]] = {}
+        self.bigram_weight = bigram_weight
+        self._lock = threading.Lock()
+        for w in words:
+            self.add_phrase(w)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"[a-z']+", text.lower())
+
+    def add_word(self, word: str, count: int = 1) -> None:
+        node = self.root
+        for ch in word:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.count += count
+        self.total += count
+
+    def add_phrase(self, phrase: str, count: int = 1) -> None:
+        """All words of phrase, plus its word pairs as bigrams ("thank you")."""
+        words = self.tokenize(phrase)
+        with self._lock:
+            for w in words:
+                self.add_word(w, count)
+            for a, b in zip(words, words[1:]):
+                row = self.bigrams.setdefault(a, {})
+                row[b] = row.get(b, 0) + count
+
+    def learn(self, sentence: str) -> None:
+        """Count a finished sentence so the user's own words rank higher next time."""
+        self.add_phrase(sentence, count=2)
+
+    @classmethod
+    def from_labels(cls, labels: Iterable[str], vocab_file: Optional[Path] = None) -> "WordPredictor":
+        """Sign labels (weighted up) + BASIC_WORDS + an optional "word [count]" per line file."""
+        wp = cls(BASIC_WORDS)
+        for label in labels:
+            if not is_letter(label):
+                wp.add_phrase(label, count=3)
+        if vocab_file is not None and Path(vocab_file).exists():
+            for line in Path(vocab_file).read_text(encoding="utf-8").splitlines():
+                parts = line.strip().rsplit(None, 1)
+                if not parts or line.lstrip().startswith("#"):
+                    continue
+                if len(parts) == 2 and parts[1].isdigit():
+                    wp.add_phrase(parts[0], int(parts[1]))
+                else:
+                    wp.add_phrase(line.strip())
+        return wp
+
+    def _complete(self, prefix: str) -> List[Tuple[str, int]]:
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        out: List[Tuple[str, int]] = []
+        stack = [(node, prefix)]
+        while stack:
+            n, word = stack.pop()
+            if n.count:
+                out.append((word, n.count))
+            stack.extend((child, word + ch) for ch, child in n.children.items())
+        return out
+
+    def suggest(self, prefix: str = "", previous: Optional[str] = None, k: int = 3) -> List[str]:
+        """Top-k words starting with prefix, ranked by context (previous word) and frequency."""
+        prefix = prefix.lower()
+        with self._lock:
+            following = self.bigrams.get(previous.lower(), {}) if previous else {}
+            if not prefix:
+                # next-word prediction: only words that have followed `previous`, else the most common
+                candidates = [(w, self._count(w)) for w in following] or self._complete("")
+            else:
+                candidates = self._complete(prefix)
+            after = sum(following.values())
+            lam = self.bigram_weight if after else 0.0
+            scored = [
+                (lam * following.get(w, 0) / (after or 1) + (1 - lam) * c / (self.total or 1), w)
+                for w, c in candidates
+                if w != prefix
+            ]
+        scored.sort(key=lambda sw: (-sw[0], sw[1]))
+        return [w for _, w in scored[:k]]
+
+    def _count(self, word: str) -> int:
+        node = self.root
+        for ch in word:
+            node = node.children.get(ch)
+            if node is None:
+                return 0
+        return node.count
+
+
+class SentenceComposer:
+    """Words so far + the word being fingerspelled; suggestions come from a WordPredictor."""
+
+    def __init__(self, predictor: WordPredictor):
+        self.predictor = predictor
+        self.words: List[str] = []
+        self.current = ""
+        self.tokens = 0
+
+    def push(self, token: str) -> None:
+        """A committed sign: a letter extends the current word, a word sign adds itself."""
+        self.tokens += 1
+        if is_letter(token):
+            self.current += token.lower()
+        else:
+            self.space()
+            self.words.extend(self.predictor.tokenize(token) or [token.lower()])
+
+    def space(self) -> None:
+        if self.current:
+            self.words.append(self.current)
+            self.current = ""
+
+    def accept(self, word: str) -> None:
+        """Use a suggestion: it replaces the letters typed so far."""
+        self.current = ""
+        self.words.append(word.lower())
+
+    def backspace(self) -> None:
+        if self.current:
+            self.current = self.current[:-1]
+        elif self.words:
+            self.words.pop()
+
+    def clear(self) -> None:
+        self.words, self.current = [], ""
+
+    def suggestions(self, k: int = 3) -> List[str]:
+        return self.predictor.suggest(self.current, self.words[-1] if self.words else None, k)
+
+    @property
+    def text(self) -> str:
+        s = " ".join(self.words + ([self.current] if self.current else []))
+        s = re.sub(r"\bi\b", "I", s)
+        return s[:1].upper() + s[1:]
+
+    def finish(self) -> str:
+        """The sentence to speak; it is also learned by the predictor."""
+        self.space()
+        sentence = self.text
+        if sentence:
+            self.predictor.learn(sentence)
+        return sentence
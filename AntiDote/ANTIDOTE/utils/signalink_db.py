@@ -0,0 +1,383 @@
+# ANTIDOTE/utils/signalink_db.py
+# ------------------------------------------------------------
+# SIGNALINK – one shared gesture DB handle per process
+#
+# Every Streamlit session reads the same DBSnapshot (version, matcher, counts).
+# It is rebuilt only when the store version changes: writes in this process
+# bump it directly, writes from other processes show up through meta.json's
+# mtime, which is checked at most every check_interval seconds.
+#
+# With pca_dims set, matching on pixel stores runs on PCA-projected features
+# instead of raw pixels (see utils/signalink_pca.py); the snapshot projects
+# queries with the same model its features came from.
+#
+# Each snapshot also carries a KNNIndex (utils/signalink_knn.py) for voted,
+# calibrated predictions; when a write only added samples it is extended from
+# the previous snapshot's index instead of rebuilt. For image-like features
+# (pixels, edges) without PCA it searches coarse-to-fine on large DBs. With a classifier kind set,
+# predictions come from a trained linear model (utils/signalink_classifier.py)
+# whenever it was trained on exactly this snapshot's samples, and from k-NN
+# while it is being retrained.
+#
+# Built-in reference samples (utils/signalink_reference.py) are placed ahead
+# of the store's rows with negative row ids and a low vote weight, so the
+# index still only grows at the end when the user records samples.
+#
+# With a CaptureStore, every recorded sample also keeps its (small, compressed)
+# original capture, and sync() derives rows for captures this store has not
+# seen – e.g. after switching feature pipelines (utils/signalink_captures.py).
+#
+# With label_budget set, a sign that grows past AUTO_PRUNE_FACTOR × budget
+# samples is pruned back to the budget in the background, keeping the most
+# representative samples (utils/signalink_prune.py).
+#
+# feedback() is the active-learning path: a snapshot the user confirmed or
+# corrected after a prediction is appended like any sample (the next snapshot
+# extends the k-NN index in place, the classifier retrains debounced in the
+# background) and logged to feedback.jsonl, which tracks how often predictions
+# were right. feedback_stats() keeps running counts and only reads lines
+# appended since its last call; clear() empties the log and remove_label()
+# drops that sign's events from it.
+# ------------------------------------------------------------
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.signalink_captures import CaptureStore, FeatureSpec, featurize
+from utils.signalink_classifier import CLASSIFIER_AVAILABLE, KINDS, GestureClassifier
+from utils.signalink_features import EXTRACTORS
+from utils.signalink_knn import DEFAULT_K, KNNIndex, KNNPrediction
+from utils.signalink_match import GestureMatcher, NO_MATCH_MSE
+from utils.signalink_pca import SKLEARN_AVAILABLE, PCAProjector
+from utils.signalink_prune import AUTO_PRUNE_FACTOR, prune_db
+from utils.signalink_reference import PRIOR_WEIGHT
+from utils.signalink_store import DEFAULT_FEATURE, GestureStore, Segment
+
+FEEDBACK_FILE = "feedback.jsonl"
+FEEDBACK_RECENT = 100       # feedback events kept for recent_accuracy
+
+
+class DBSnapshot:
+    """Read-only view of the gesture DB at one version; safe to share across sessions."""
+
+    __slots__ = ("version", "model_id", "segments", "matcher", "counts", "project", "knn", "rows_key", "classifier")
+
+    def __init__(
+        self,
+        version: int,
+        segments: Sequence[Segment],
+        matcher: GestureMatcher,
+        counts: Dict[str, int],
+        model_id: int = 0,
+        project: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        knn: Optional[KNNIndex] = None,
+        rows_key: str = "",
+        classifier: Optional[GestureClassifier] = None,
+    ):
+        self.version = version
+        self.model_id = model_id
+        self.segments = segments
+        self.matcher = matcher
+        self.counts = counts
+        self.project = project
+        self.knn = knn
+        self.rows_key = rows_key          # identifies the exact set of live samples
+        self.classifier = classifier
+
+    def __len__(self) -> int:
+        return len(self.matcher)
+
+    def features(self, vecs: np.ndarray) -> np.ndarray:
+        """Raw preprocess_image() vectors → what the matcher compares (projected if PCA is on)."""
+        return self.project(vecs) if self.project is not None else np.asarray(vecs, dtype=np.float32)
+
+    def top_k(self, vec: np.ndarray, k: int = 3) -> List[Tuple[str, float]]:
+        return self.matcher.top_k(self.features(vec), k)
+
+    def best(self, vec: np.ndarray) -> Tuple[Optional[str], float]:
+        if not len(self):
+            return None, NO_MATCH_MSE
+        return self.matcher.best(self.features(vec))
+
+    def predict(self, vec: np.ndarray, k: Optional[int] = None) -> Optional[KNNPrediction]:
+        """
+        Trained classifier if it is up to date, else k-NN vote with calibrated
+        confidence; None when the DB is empty.
+        """
+        if self.knn is None or not len(self):
+            return None
+        if self.classifier is not None:
+            pred = self.classifier.predict(self, vec)
+            if pred is not None:
+                return pred
+        return self.knn.predict(self.features(vec), k)
+
+    def predict_batch(self, vecs: np.ndarray, k: Optional[int] = None) -> List[Optional[KNNPrediction]]:
+        """predict() for every row of vecs: one model call or one batched neighbour search."""
+        vecs = np.asarray(vecs, dtype=np.float32).reshape(len(vecs), -1)
+        if self.knn is None or not len(self):
+            return [None] * len(vecs)
+        if self.classifier is not None:
+            preds = self.classifier.predict_batch(self, vecs)
+            if preds is not None:
+                return preds
+        return self.knn.predict_batch(self.features(vecs), k)
+
+
+class GestureDB:
+    """Process-wide GestureStore + the matcher built from it, shared by every session."""
+
+    def __init__(
+        self,
+        root: Path,
+        check_interval: float = 0.5,
+        pca_dims: int = 0,
+        k: int = DEFAULT_K,
+        classifier: str = "",
+        feature: str = DEFAULT_FEATURE,
+        reference: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        prior_weight: float = PRIOR_WEIGHT,
+        captures: Optional[CaptureStore] = None,
+        label_budget: int = 0,
+        prune_method: str = "kmedoids",
+        model_dir: Optional[Path] = None,
+    ):
+        extractor = EXTRACTORS.get(feature)
+        self.store = GestureStore(root, feature, extractor.version if extractor is not None else None)
+        self.coarse_pool = extractor.coarse_pool if extractor is not None else 0
+        self.captures = captures
+        self.reference = reference if reference is not None and len(reference[1]) else None
+        self.prior_weight = prior_weight
+        self.label_budget = label_budget
+        self.prune_method = prune_method
+        self._prune_lock = threading.Lock()
+        self.last_prune: Optional[Dict[str, object]] = None
+        self.check_interval = check_interval
+        self.k = k
+        use_pca = pca_dims and SKLEARN_AVAILABLE and feature == DEFAULT_FEATURE
+        model_dir = Path(model_dir) if model_dir is not None else Path(root)   # PCA / classifier files
+        self.projector = PCAProjector(model_dir, pca_dims) if use_pca else None
+        self.classifier = GestureClassifier(model_dir, classifier) if classifier in KINDS and CLASSIFIER_AVAILABLE else None
+        self._lock = threading.Lock()
+        self._fb_lock = threading.Lock()
+        self._fb_pos: Tuple[int, int] = (0, 0)      # (inode, bytes read) of feedback.jsonl
+        self._fb_total = 0
+        self._fb_confirmed = 0
+        self._fb_recent: deque = deque(maxlen=FEEDBACK_RECENT)
+        self._snap: Optional[DBSnapshot] = None
+        self._checked = 0.0
+        self.builds = 0
+
+    def _model_id(self) -> int:
+        return self.projector.model_id if self.projector is not None else 0
+
+    def snapshot(self) -> DBSnapshot:
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            self.store.refresh()
+        snap = self._snap
+        if snap is None or snap.version != self.store.version or snap.model_id != self._model_id():
+            with self._lock:
+                version, segments = self.store.versioned_segments()
+                snap = self._snap
+                if snap is None or snap.version != version or snap.model_id != self._model_id():
+                    self._snap = snap = self._build(version, segments)
+                    self.builds += 1
+        if self.classifier is not None:
+            self.classifier.maybe_train(snap)
+        return snap
+
+    def _build(self, version: int, segments: Sequence[Segment]) -> DBSnapshot:
+        names = self.store.label_names
+        per = np.zeros(len(names), dtype=np.int64)
+        for seg in segments:
+            per += np.bincount(seg.label_ids[seg.live], minlength=len(names))
+        counts = {name: int(n) for name, n in zip(names, per) if n}
+
+        seqs = np.concatenate([s.seqs[s.live] for s in segments]) if segments else np.empty(0, dtype=np.int64)
+        ref = self._reference()
+        n_ref = len(ref[1]) if ref is not None else 0
+        model_id, project = 0, None
+        matcher = None
+        if self.projector is not None:
+            self.projector.maybe_refit(segments)
+            if self.projector.ready:
+                model_id, project, feats, labels = self.projector.features(segments)
+                blocks = [(project(ref[0]), ref[1], None, None)] if n_ref else []
+                matcher = GestureMatcher.from_blocks(blocks + [(feats, labels, None, None)], mse_dim=self.store.dim)
+        if matcher is None:
+            blocks = [(ref[0], ref[1], None, None)] if n_ref else []
+            matcher = GestureMatcher.from_blocks(
+                blocks + [(s.matrix, s.row_labels, s.sq_norms, s.live) for s in segments]
+            )
+
+        weights = None
+        if n_ref:
+            seqs = np.concatenate([np.arange(-n_ref, 0, dtype=np.int64), seqs])
+            weights = np.ones(len(seqs))
+            weights[:n_ref] = self.prior_weight
+        prev = self._snap
+        prev_knn = prev.knn if prev is not None and prev.model_id == model_id else None
+        knn = KNNIndex(matcher, seqs, self.k, prev=prev_knn, weights=weights,
+                       coarse_pool=self.coarse_pool if project is None else 0)
+        rows_key = hashlib.sha1(seqs.astype(np.int64).tobytes()).hexdigest()
+        return DBSnapshot(version, segments, matcher, counts, model_id, project, knn, rows_key, self.classifier)
+
+    def _reference(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """The reference samples, unless the store holds vectors of another size."""
+        if self.reference is None:
+            return None
+        dim = self.store.dim
+        return self.reference if dim is None or dim == self.reference[0].shape[1] else None
+
+    # ---------- writes (bump the version, then compact in the background if needed) ----------
+    def append(self, label: str, vec: np.ndarray, image=None) -> int:
+        """Store vec (and image as a compressed capture, when there is a CaptureStore)."""
+        sources = [self.captures.add(label, image)] if self.captures is not None and image is not None else None
+        row = self.store.extend(label, np.asarray(vec).reshape(1, -1), sources=sources)
+        if not self.maybe_prune(label):
+            self.store.maybe_compact()
+        return row
+
+    def feedback(self, vec: np.ndarray, predicted: str, label: str, confidence: Optional[float] = None,
+                 image=None) -> int:
+        """Learn from a prediction the user confirmed (label == predicted) or corrected; returns the new row id."""
+        row = self.append(label, vec, image=image)
+        event = {"row": row, "predicted": predicted, "label": label, "t": round(time.time(), 3)}
+        if confidence is not None:
+            event["confidence"] = round(float(confidence), 4)
+        with open(self.store.root / FEEDBACK_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+        return row
+
+    def feedback_stats(self, recent: int = 20) -> Dict[str, object]:
+        """How many predictions feedback confirmed, overall and over the last `recent` ones (≤ FEEDBACK_RECENT)."""
+        with self._fb_lock:
+            self._read_feedback()
+            total, confirmed = self._fb_total, self._fb_confirmed
+            last = list(self._fb_recent)[-recent:]
+        return {
+            "feedback": total,
+            "confirmed": confirmed,
+            "accuracy": confirmed / total if total else None,
+            "recent_accuracy": sum(last) / len(last) if last else None,
+        }
+
+    def _read_feedback(self) -> None:
+        """Fold lines appended to feedback.jsonl since the last call into the counters (caller holds _fb_lock)."""
+        path = self.store.root / FEEDBACK_FILE
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
+        inode, offset = self._fb_pos
+        if st is None or st.st_ino != inode or st.st_size < offset:
+            # missing, replaced or truncated: count from scratch
+            self._fb_total = self._fb_confirmed = 0
+            self._fb_recent.clear()
+            offset = 0
+        if st is None:
+            self._fb_pos = (0, 0)
+            return
+        if st.st_size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(st.st_size - offset)
+            chunk = chunk[: chunk.rfind(b"\n") + 1]      # a line still being written waits for the next call
+            for line in chunk.splitlines():
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue
+                hit = e.get("predicted") == e.get("label")
+                self._fb_total += 1
+                self._fb_confirmed += hit
+                self._fb_recent.append(hit)
+            offset += len(chunk)
+        self._fb_pos = (st.st_ino, offset)
+
+    def _rewrite_feedback(self, keep: Callable[[Dict[str, object]], bool]) -> None:
+        """Replace feedback.jsonl with the events keep() accepts (counters re-read on the next stats call)."""
+        path = self.store.root / FEEDBACK_FILE
+        with self._fb_lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    lines = f.readlines()
+            except OSError:
+                return
+            kept = []
+            for line in lines:
+                try:
+                    if keep(json.loads(line)):
+                        kept.append(line)
+                except ValueError:
+                    continue
+            fd, tmp = tempfile.mkstemp(prefix="feedback.", suffix=".tmp", dir=str(self.store.root))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.writelines(kept)
+            os.replace(tmp, path)
+            self._fb_pos = (0, 0)
+
+    def prune(self, budget: Optional[int] = None, labels: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        """Cut every sign (or just labels) down to budget samples (default: label_budget)."""
+        with self._prune_lock:
+            self.last_prune = prune_db(self, budget or self.label_budget, self.prune_method, labels)
+        return self.last_prune
+
+    def maybe_prune(self, label: str) -> bool:
+        """Start prune() for label in the background once it is well past label_budget."""
+        if self.label_budget <= 0 or self._prune_lock.locked():
+            return False
+        if self.store.counts().get(label, 0) <= self.label_budget * AUTO_PRUNE_FACTOR:
+            return False
+        threading.Thread(target=self.prune, kwargs={"labels": [label]}, name="gesture-db-prune", daemon=True).start()
+        return True
+
+    def remove_label(self, label: str) -> int:
+        removed = self.store.remove_label(label)
+        if self.captures is not None:
+            self.captures.remove_label(label)
+        self._rewrite_feedback(lambda e: e.get("label") != label)
+        self.store.maybe_compact()
+        return removed
+
+    def clear(self) -> None:
+        self.store.clear()
+        if self.captures is not None:
+            self.captures.clear()
+        self._rewrite_feedback(lambda e: False)
+        self.store.maybe_compact()
+
+    def sync(self, spec: FeatureSpec, workers: Optional[int] = None) -> Dict[str, int]:
+        """Derive rows for captures this store lacks and drop rows of deleted captures."""
+        if self.captures is None:
+            return {"added": 0, "removed": 0, "failed": 0}
+        result = featurize(self.captures, self.store, spec, workers)
+        self.store.maybe_compact()
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        ref = self._reference()
+        out = dict(self.store.stats(), snapshot_builds=self.builds, reference_rows=len(ref[1]) if ref else 0)
+        if self.label_budget:
+            out.update(label_budget=self.label_budget, prune_method=self.prune_method)
+        if self.projector is not None:
+            out.update(
+                pca_dims=self.projector.n_components,
+                pca_model=self.projector.model_id,
+                pca_rows_fitted=self.projector.rows_fitted,
+            )
+        if self.captures is not None:
+            out.update(self.captures.stats())
+        if self.classifier is not None:
+            out.update({f"classifier_{k}": v for k, v in self.classifier.info().items()})
+        return out
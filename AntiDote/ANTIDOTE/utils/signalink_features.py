@@ -0,0 +1,193 @@
+# ANTIDOTE/utils/signalink_features.py
+# ------------------------------------------------------------
+# SIGNALINK – registry of feature extractors
+#
+#   pixels     128×128 grayscale, scaled to [0, 1]              16384 numbers
+#   hog        histograms of oriented gradients on 64×64:       1764 numbers
+#              8×8-pixel cells, 9 unsigned orientations, 2×2-cell
+#              blocks with L2-Hys normalization (NumPy only) –
+#              describes edges and shape, not brightness
+#   edges      Sobel edge strength on 64×64, scaled by its 95th    4096 numbers
+#              percentile – the outline of the hand
+#   landmarks  21 MediaPipe hand keypoints (only with mediapipe)  63 numbers
+#
+# Every extractor has a version id; it names the feature store a pipeline
+# writes to (utils/signalink_captures.py), is recorded in that store's
+# meta.json and keys the reference cache, so changing an extractor never
+# mixes old and new vectors. Bump the version whenever its output changes.
+#
+# Image-like features (pixels, edges) also set coarse_pool: block means of
+# pool × pool cells give a small "thumbnail" vector. On large DBs KNNIndex
+# ranks every row by thumbnail distance and re-ranks only the best
+# candidates on the full vectors (utils/signalink_knn.py) – an approximate
+# search: a true neighbour outside the candidates is missed.
+# ------------------------------------------------------------
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.signalink_landmarks import FEATURE_DIM as LANDMARK_DIM, MEDIAPIPE_AVAILABLE
+from utils.signalink_preprocess import FEATURE_SIZE, Crop, Source, open_image, to_vector
+
+HOG_SIZE = (64, 64)
+HOG_CELL = 8
+HOG_BINS = 9
+HOG_BLOCK = 2
+EDGE_SIZE = (64, 64)
+
+# img (already decoded in `mode`), crop, optional output buffer → vector or None
+ExtractFn = Callable[[Image.Image, Optional[Crop], Optional[np.ndarray]], Optional[np.ndarray]]
+
+
+class FeatureExtractor:
+    """One way of turning a photo into a fixed-length vector."""
+
+    def __init__(self, name: str, version: str, dim: int, fn: ExtractFn, mode: str = "L",
+                 decode_size: Tuple[int, int] = FEATURE_SIZE, coarse_pool: int = 0,
+                 available: bool = True, description: str = ""):
+        self.name = name
+        self.version = version
+        self.dim = dim
+        self.fn = fn
+        self.mode = mode
+        self.decode_size = decode_size
+        self.coarse_pool = coarse_pool
+        self.available = available
+        self.description = description
+
+    def decode(self, src: Source, crop: Optional[Crop] = None) -> Image.Image:
+        """src decoded in this extractor's mode, at the smallest JPEG scale it needs."""
+        return open_image(src, self.mode, self.decode_size, crop)
+
+    def extract(self, img: Image.Image, crop: Optional[Crop] = None,
+                out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return self.fn(img if img.mode == self.mode else img.convert(self.mode), crop, out)
+
+    def __call__(self, src: Source, crop: Optional[Crop] = None,
+                 out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return self.extract(self.decode(src, crop), crop, out)
+
+    def __repr__(self) -> str:
+        return f"FeatureExtractor({self.name!r}, {self.version!r}, dim={self.dim})"
+
+
+EXTRACTORS: Dict[str, FeatureExtractor] = {}
+
+
+def register(extractor: FeatureExtractor) -> FeatureExtractor:
+    EXTRACTORS[extractor.name] = extractor
+    return extractor
+
+
+def get_extractor(name: str) -> FeatureExtractor:
+    try:
+        return EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(f"unknown feature extractor {name!r}; known: {sorted(EXTRACTORS)}") from None
+
+
+def available_extractors() -> List[str]:
+    return [name for name, ex in EXTRACTORS.items() if ex.available]
+
+
+# ---------- shared helpers ----------
+def pool_grid(X: np.ndarray, pool: int) -> np.ndarray:
+    """(n, side²) square maps → (n, (side/pool)²) block means; ValueError for other widths."""
+    X = np.asarray(X, dtype=np.float32)
+    X = X.reshape(-1, X.shape[-1])
+    side = int(round(np.sqrt(X.shape[1])))
+    if side * side != X.shape[1] or side % pool:
+        raise ValueError(f"{X.shape[1]} features are not a square grid divisible by {pool}")
+    s = side // pool
+    return X.reshape(-1, s, pool, s, pool).mean(axis=(2, 4)).reshape(-1, s * s)
+
+
+def hog(gray: np.ndarray, cell: int = HOG_CELL, bins: int = HOG_BINS, block: int = HOG_BLOCK) -> np.ndarray:
+    """HOG descriptor of a 2-D float image, vectorized (orientation votes split between the two nearest bins)."""
+    g = np.asarray(gray, dtype=np.float32)
+    gx = np.zeros_like(g)
+    gy = np.zeros_like(g)
+    gx[:, 1:-1] = g[:, 2:] - g[:, :-2]
+    gy[1:-1, :] = g[2:, :] - g[:-2, :]
+    mag = np.hypot(gx, gy)
+    pos = (np.degrees(np.arctan2(gy, gx)) % 180.0) / (180.0 / bins) - 0.5
+    lo = np.floor(pos)
+    frac = pos - lo
+    lo = lo.astype(np.intp) % bins
+    hi = (lo + 1) % bins
+
+    ch, cw = g.shape[0] // cell, g.shape[1] // cell
+    g_cells = (np.arange(ch * cell) // cell)[:, None] * cw + (np.arange(cw * cell) // cell)[None, :]
+    mag, frac, lo, hi = (a[: ch * cell, : cw * cell] for a in (mag, frac, lo, hi))
+    size = ch * cw * bins
+    hist = np.bincount((g_cells * bins + lo).ravel(), (mag * (1 - frac)).ravel(), size)
+    hist += np.bincount((g_cells * bins + hi).ravel(), (mag * frac).ravel(), size)
+    hist = hist.reshape(ch, cw, bins)
+
+    by, bx = ch - block + 1, cw - block + 1
+    blocks = np.stack(
+        [hist[y:y + by, x:x + bx] for y in range(block) for x in range(block)], axis=2
+    ).reshape(by, bx, -1)
+    eps = 1e-6
+    blocks = blocks / np.sqrt((blocks ** 2).sum(axis=2, keepdims=True) + eps)
+    np.minimum(blocks, 0.2, out=blocks)          # L2-Hys: clip, then renormalize
+    blocks = blocks / np.sqrt((blocks ** 2).sum(axis=2, keepdims=True) + eps)
+    return blocks.astype(np.float32).ravel()
+
+
+def sobel_edges(gray: np.ndarray) -> np.ndarray:
+    """Sobel gradient magnitude (same size, edges replicated), scaled so the 95th percentile is 1."""
+    p = np.pad(np.asarray(gray, dtype=np.float32), 1, mode="edge")
+    gx = (p[:-2, 2:] + 2 * p[1:-1, 2:] + p[2:, 2:]) - (p[:-2, :-2] + 2 * p[1:-1, :-2] + p[2:, :-2])
+    gy = (p[2:, :-2] + 2 * p[2:, 1:-1] + p[2:, 2:]) - (p[:-2, :-2] + 2 * p[:-2, 1:-1] + p[:-2, 2:])
+    mag = np.hypot(gx, gy)
+    scale = float(np.percentile(mag, 95))
+    if scale > 1e-6:
+        mag /= scale
+    return np.minimum(mag, 1.0, out=mag).ravel()
+
+
+# ---------- the extractors ----------
+def _pixels(img: Image.Image, crop: Optional[Crop], out: Optional[np.ndarray]) -> np.ndarray:
+    return to_vector(img, FEATURE_SIZE, crop, out)
+
+
+def _hog(img: Image.Image, crop: Optional[Crop], out: Optional[np.ndarray]) -> np.ndarray:
+    return hog(to_vector(img, HOG_SIZE, crop).reshape(HOG_SIZE[1], HOG_SIZE[0]))
+
+
+def _edges(img: Image.Image, crop: Optional[Crop], out: Optional[np.ndarray]) -> np.ndarray:
+    return sobel_edges(to_vector(img, EDGE_SIZE, crop).reshape(EDGE_SIZE[1], EDGE_SIZE[0]))
+
+
+def _landmarks(img: Image.Image, crop: Optional[Crop], out: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    from utils.signalink_landmarks import landmark_features
+    return landmark_features(img)
+
+
+def _hog_dim() -> int:
+    cells = (HOG_SIZE[1] // HOG_CELL - HOG_BLOCK + 1) * (HOG_SIZE[0] // HOG_CELL - HOG_BLOCK + 1)
+    return cells * HOG_BLOCK * HOG_BLOCK * HOG_BINS
+
+
+register(FeatureExtractor(
+    "pixels", "pixels-128x128-gray-v1", FEATURE_SIZE[0] * FEATURE_SIZE[1], _pixels, coarse_pool=4,
+    description="Each sample is the photo shrunk to 128×128 grayscale pixels.",
+))
+register(FeatureExtractor(
+    "hog", f"hog-{HOG_SIZE[0]}x{HOG_SIZE[1]}-c{HOG_CELL}-b{HOG_BINS}-v1", _hog_dim(), _hog, decode_size=HOG_SIZE,
+    description="Each sample is the direction of the edges in the photo (HOG), so lighting matters less.",
+))
+register(FeatureExtractor(
+    "edges", f"edges-{EDGE_SIZE[0]}x{EDGE_SIZE[1]}-sobel-v1", EDGE_SIZE[0] * EDGE_SIZE[1], _edges,
+    decode_size=EDGE_SIZE, coarse_pool=4,
+    description="Each sample is an outline drawing of the photo (edge strength at 64×64).",
+))
+register(FeatureExtractor(
+    "landmarks", "landmarks-mp-hands-v1", LANDMARK_DIM, _landmarks, mode="RGB", decode_size=(640, 640),
+    available=MEDIAPIPE_AVAILABLE,
+    description="Each sample is the hand's shape: 21 MediaPipe keypoints, independent of position, size and tilt.",
+))
+
+FEATURE_VERSIONS = {name: ex.version for name, ex in EXTRACTORS.items()}
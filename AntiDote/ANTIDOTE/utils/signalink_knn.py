@@ -0,0 +1,314 @@
+# ANTIDOTE/utils/signalink_knn.py
+# ------------------------------------------------------------
+# SIGNALINK – k-NN prediction with distance-weighted voting and calibrated
+# confidence
+#
+# The k nearest samples vote for their label with Dudani's distance weights:
+# the nearest gets 1, the k-th gets 0, linear in MSE in between (plain
+# 1 / distance weights lost accuracy against 1-NN on noisy snapshots).
+# Confidence = vote share × how typical the winning distance is for that
+# label: each label keeps the leave-one-out nearest-neighbour MSE of (up to)
+# CALIB_PER_LABEL of its samples, i.e. how close a genuine sample of the sign
+# usually lands to another one. A query closer than most of those is as
+# familiar as the training data; one farther than all of them is not.
+#
+# Neighbour search is brute force on the GestureMatcher, or a scikit-learn
+# KDTree once features are low-dimensional (PCA) and the DB is large enough
+# for a tree to beat one matrix product. When a snapshot only adds samples,
+# the next index reuses the tree and calibration and just folds the new rows
+# in (the tree sees them as a brute-force tail until it is rebuilt).
+#
+# Optional per-row vote weights scale each neighbour's vote, e.g. to let the
+# built-in reference pictures count less than the user's own samples.
+#
+# For image-like features (coarse_pool > 0, see utils/signalink_features.py)
+# on a large DB, the search is a coarse-to-fine cascade: pool × pool block
+# means of every row (1/pool² of the data, kept in RAM and carried over to
+# the next index by row id) rank all samples first, and only the best
+# CASCADE_CANDIDATES get exact distances on the full vectors. Pooling averages
+# away pixel noise, so the coarse ranking is a good guide to which rows are
+# close, but not a proof (bounds from it were too loose to skip anything): on
+# synthetic gestures every true 5-NN was among the 64 candidates.
+# ------------------------------------------------------------
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.signalink_features import pool_grid
+from utils.signalink_match import GestureMatcher
+
+TREE_AVAILABLE = True
+try:
+    from sklearn.neighbors import KDTree
+except Exception:
+    KDTree = None
+    TREE_AVAILABLE = False
+
+DEFAULT_K = 5
+TREE_MIN_ROWS = 4096        # below this one BLAS product beats a tree walk
+TREE_MAX_DIMS = 64          # KD-trees degrade to brute force in high dimensions
+TREE_MAX_TAIL = 0.10        # rebuild the tree once the unindexed tail is this share of it
+CASCADE_MIN_ROWS = 2048     # smaller DBs: one full matrix product is cheap enough
+CASCADE_CANDIDATES = 64     # rows re-ranked on full vectors per query (at least 8 × k)
+CASCADE_CHUNK = 1024        # rows pooled per step while building the coarse matrix
+CALIB_PER_LABEL = 64
+MIN_CALIB = 3               # fewer per-label distances than this → use all labels' distances
+
+HIGH_CONFIDENCE = 0.6
+MEDIUM_CONFIDENCE = 0.3
+
+
+class KNNPrediction:
+    """
+    Result of KNNIndex.predict(); neighbours are [(label, mse), ...], closest
+    first. source is "knn", or "model" for a trained classifier (no mse, no
+    neighbours; votes are its class probabilities).
+    """
+
+    __slots__ = ("label", "mse", "confidence", "share", "votes", "neighbours", "source")
+
+    def __init__(self, label: str, mse: Optional[float], confidence: float, share: float,
+                 votes: Dict[str, float], neighbours: List[Tuple[str, float]], source: str = "knn"):
+        self.label = label
+        self.mse = mse
+        self.confidence = confidence
+        self.share = share
+        self.votes = votes
+        self.neighbours = neighbours
+        self.source = source
+
+    @property
+    def level(self) -> str:
+        if self.confidence >= HIGH_CONFIDENCE:
+            return "high"
+        if self.confidence >= MEDIUM_CONFIDENCE:
+            return "medium"
+        return "low"
+
+
+class KNNIndex:
+    """
+    Read-only k-NN view over a GestureMatcher whose live rows carry the given
+    row ids (seqs, ascending). Pass the previous index as prev to reuse its
+    tree and calibration when the new rows only extend the old ones.
+    weights (one per row, default 1) scale the rows' votes.
+    """
+
+    def __init__(self, matcher: GestureMatcher, seqs: np.ndarray, k: int = DEFAULT_K,
+                 prev: Optional["KNNIndex"] = None, weights: Optional[np.ndarray] = None,
+                 coarse_pool: int = 0):
+        self.matcher = matcher
+        self.seqs = np.asarray(seqs, dtype=np.int64)
+        self.k = k
+        if len(self.seqs) != len(matcher):
+            raise ValueError("one row id per live sample is required")
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        if self.weights is not None and len(self.weights) != len(matcher):
+            raise ValueError("one weight per live sample is required")
+        labels = matcher.row_labels
+
+        start = 0
+        if prev is not None and prev._extended_by(self):
+            start = len(prev.seqs)
+            self._calib_idx = prev._calib_idx
+            self._calib_nn = prev._calib_nn.copy()
+            self._tree, self._tree_rows = prev._tree, prev._tree_rows
+        else:
+            self._calib_idx = np.empty(0, dtype=np.int64)
+            self._calib_nn = np.empty(0, dtype=np.float32)
+            self._tree, self._tree_rows = None, 0
+        self.reused_rows = start
+        self._add_calibration(labels, start)
+
+        n = len(labels)
+        if TREE_AVAILABLE and matcher.dim <= TREE_MAX_DIMS and n >= TREE_MIN_ROWS:
+            if self._tree is None or n - self._tree_rows > TREE_MAX_TAIL * self._tree_rows:
+                self._tree = KDTree(matcher.rows(np.arange(n)))
+                self._tree_rows = n
+        else:
+            self._tree, self._tree_rows = None, 0
+        self._tail = matcher.rows(np.arange(self._tree_rows, n)) if self._tree is not None else None
+        self._tail_norms = np.einsum("ij,ij->i", self._tail, self._tail) if self._tail is not None else None
+
+        self.coarse_pool = coarse_pool
+        self._coarse = self._coarse_norms = None
+        if self._tree is None and coarse_pool and n >= CASCADE_MIN_ROWS:
+            self._build_coarse(prev)
+
+        finite = np.isfinite(self._calib_nn)
+        calib_labels = labels[self._calib_idx[finite]]
+        calib_nn = self._calib_nn[finite]
+        self._dist: Dict[str, np.ndarray] = {
+            str(label): np.sort(calib_nn[calib_labels == label]) for label in set(calib_labels)
+        }
+        self._pooled = np.sort(calib_nn)
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+    @property
+    def cascade(self) -> bool:
+        return self._coarse is not None
+
+    def _build_coarse(self, prev: Optional["KNNIndex"]) -> None:
+        """Pooled copy of every row; rows the previous index already pooled are copied by row id."""
+        n, pool = len(self.seqs), self.coarse_pool
+        side = int(round(np.sqrt(self.matcher.dim)))
+        if side * side != self.matcher.dim or side % pool:
+            return
+        coarse = np.empty((n, (side // pool) ** 2), dtype=np.float32)
+        todo = np.ones(n, dtype=bool)
+        if prev is not None and prev._coarse is not None and prev.coarse_pool == pool \
+                and prev.matcher.dim == self.matcher.dim and np.all(np.diff(prev.seqs) > 0):
+            pos = np.minimum(np.searchsorted(prev.seqs, self.seqs), len(prev.seqs) - 1)
+            found = prev.seqs[pos] == self.seqs
+            coarse[found] = prev._coarse[pos[found]]
+            todo[found] = False
+        missing = np.flatnonzero(todo)
+        for start in range(0, len(missing), CASCADE_CHUNK):
+            part = missing[start:start + CASCADE_CHUNK]
+            coarse[part] = pool_grid(self.matcher.rows(part), pool)
+        self._coarse = coarse
+        self._coarse_norms = np.einsum("ij,ij->i", coarse, coarse)
+
+    def _extended_by(self, other: "KNNIndex") -> bool:
+        n = len(self.seqs)
+        return (
+            self.matcher.dim == other.matcher.dim
+            and self.matcher.mse_dim == other.matcher.mse_dim
+            and len(other.seqs) >= n
+            and np.array_equal(other.seqs[:n], self.seqs)
+        )
+
+    # ---------- calibration ----------
+    def _add_calibration(self, labels: np.ndarray, start: int) -> None:
+        """Fold rows [start, n) into the per-label leave-one-out NN distances."""
+        n = len(labels)
+        if start >= n:
+            return
+        calib_idx, calib_nn = list(self._calib_idx), list(self._calib_nn)
+        taken: Dict[str, int] = {}
+        for i in self._calib_idx:
+            taken[labels[i]] = taken.get(labels[i], 0) + 1
+        new = np.arange(start, n)
+        for label in np.unique(labels[new]):
+            label_rows = np.flatnonzero(labels == label)
+            new_rows = label_rows[label_rows >= start]
+
+            # existing calibration rows of this label: a new sample may be their new nearest one
+            members = [j for j, i in enumerate(calib_idx) if i < start and labels[i] == label]
+            if members:
+                sub = GestureMatcher(self.matcher.rows([calib_idx[j] for j in members]), [label] * len(members),
+                                     mse_dim=self.matcher.mse_dim)
+                closest = sub.distances(self.matcher.rows(new_rows)).min(axis=0)
+                for j, d in zip(members, closest):
+                    calib_nn[j] = min(calib_nn[j], float(d))
+
+            joiners = new_rows[: max(0, CALIB_PER_LABEL - taken.get(label, 0))]
+            if not len(joiners):
+                continue
+            q = self.matcher.rows(joiners)
+            if len(joiners) <= 4:
+                d = self.matcher.distances(q)[:, label_rows]
+            else:
+                d = GestureMatcher(self.matcher.rows(label_rows), labels[label_rows],
+                                   mse_dim=self.matcher.mse_dim).distances(q)
+            d[np.arange(len(joiners)), np.searchsorted(label_rows, joiners)] = np.inf
+            calib_idx.extend(int(i) for i in joiners)
+            calib_nn.extend(d.min(axis=1))
+            taken[label] = taken.get(label, 0) + len(joiners)
+
+        self._calib_idx = np.asarray(calib_idx, dtype=np.int64)
+        self._calib_nn = np.asarray(calib_nn, dtype=np.float32)
+
+    def typicality(self, label: str, mse: float) -> float:
+        """Share of the label's training NN distances that are ≥ mse (smoothed, 0–1)."""
+        dist = self._dist.get(label)
+        if dist is None or len(dist) < MIN_CALIB:
+            dist = self._pooled
+        if not len(dist):
+            return 1.0
+        below = int(np.searchsorted(dist, mse, side="left"))
+        return (len(dist) - below + 0.5) / (len(dist) + 1)
+
+    # ---------- queries ----------
+    def neighbours(self, vec: np.ndarray, k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(row positions, mse) of the k nearest live samples to one query, closest first."""
+        idx, mse = self.neighbours_batch(np.asarray(vec, dtype=np.float32).reshape(1, -1), k)
+        return idx[0], mse[0]
+
+    def neighbours_batch(self, queries: np.ndarray, k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """neighbours() for a (m, dim) batch in one matrix product / tree query → both (m, k)."""
+        k = max(1, min(k or self.k, len(self)))
+        q = np.asarray(queries, dtype=np.float32)
+        if self._coarse is not None:
+            return self._cascade(q, k)
+        if self._tree is None:
+            return self.matcher.nearest(q, k)
+        dist, idx = self._tree.query(q, k=min(k, self._tree_rows))
+        mse = dist ** 2 / float(self.matcher.mse_dim)
+        if len(self._tail):
+            tail = self._tail_norms[None, :] - 2.0 * (q @ self._tail.T) + np.einsum("ij,ij->i", q, q)[:, None]
+            tail = np.maximum(tail, 0.0) / float(self.matcher.mse_dim)
+            idx = np.concatenate([idx, np.broadcast_to(self._tree_rows + np.arange(len(self._tail)), tail.shape)], axis=1)
+            mse = np.concatenate([mse, tail], axis=1)
+        order = np.argsort(mse, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(mse, order, axis=1)
+
+    def _cascade(self, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest rows: coarse distances to all rows, full distances for the best candidates only."""
+        q = q.reshape(-1, self.matcher.dim)
+        n, m = len(self), len(q)
+        c = min(n, max(CASCADE_CANDIDATES, 8 * k))
+        qc = pool_grid(q, self.coarse_pool)
+        coarse = qc @ self._coarse.T
+        coarse *= -2.0
+        coarse += self._coarse_norms[None, :]
+        cand = np.argpartition(coarse, c - 1, axis=1)[:, :c] if c < n else np.tile(np.arange(n), (m, 1))
+        out_idx = np.empty((m, k), dtype=np.intp)
+        out_mse = np.empty((m, k), dtype=np.float32)
+        mse_dim = float(self.matcher.mse_dim)
+        for i in range(m):
+            diff = self.matcher.rows(cand[i])
+            diff -= q[i]
+            d = np.einsum("ij,ij->i", diff, diff)
+            order = np.argsort(d, kind="stable")[:k]
+            out_idx[i] = cand[i][order]
+            out_mse[i] = d[order] / mse_dim
+        return out_idx, out_mse
+
+    def predict(self, vec: np.ndarray, k: Optional[int] = None) -> Optional[KNNPrediction]:
+        if not len(self):
+            return None
+        idx, mse = self.neighbours(vec, k)
+        return self._vote(idx, mse)
+
+    def predict_batch(self, queries: np.ndarray, k: Optional[int] = None) -> List[Optional[KNNPrediction]]:
+        """predict() for every row of queries, with one neighbour search for the whole batch."""
+        if not len(self):
+            return [None] * len(queries)
+        idx, mse = self.neighbours_batch(queries, k)
+        return [self._vote(i, m) for i, m in zip(idx, mse)]
+
+    def _vote(self, idx: np.ndarray, mse: np.ndarray) -> KNNPrediction:
+        labels = self.matcher.row_labels[idx]
+        votes: Dict[str, float] = {}
+        spread = float(mse[-1] - mse[0])
+        weights = (mse[-1] - mse) / spread if spread > 0 else np.ones(len(mse))
+        weights[0] = 1.0
+        if self.weights is not None:
+            weights = weights * self.weights[idx]
+        for label, w in zip(labels, weights):
+            votes[str(label)] = votes.get(str(label), 0.0) + float(w)
+        total = sum(votes.values())
+        votes = {l: w / total for l, w in sorted(votes.items(), key=lambda kv: -kv[1])}
+        label, share = next(iter(votes.items()))
+        best = float(mse[labels == label].min())
+        return KNNPrediction(
+            label=label,
+            mse=best,
+            confidence=share * self.typicality(label, best),
+            share=share,
+            votes=votes,
+            neighbours=[(str(l), float(m)) for l, m in zip(labels, mse)],
+        )
@@ -0,0 +1,120 @@
+# ANTIDOTE/utils/signalink_landmarks.py
+# ------------------------------------------------------------
+# SIGNALINK – hand-landmark features with MediaPipe Hands
+#
+# Instead of 128×128 raw pixels (16384 numbers that mostly describe the
+# background and lighting), a sign becomes the 21 hand keypoints MediaPipe
+# finds, normalized so only the hand shape is left:
+#   - translation: wrist moved to the origin
+#   - scale:       wrist → middle-finger knuckle distance is 1
+#   - rotation:    wrist → middle-finger knuckle points straight up
+#   - left hands mirrored onto right hands (optional)
+# → 21 × (x, y, z) = 63 float32 values.
+#
+# The MediaPipe graph is created once per process (CPU, model_complexity=0 by
+# default) and shared; calls are serialized because the graph is stateful.
+# ------------------------------------------------------------
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+MEDIAPIPE_AVAILABLE = True
+try:
+    import mediapipe as mp
+except Exception:
+    mp = None
+    MEDIAPIPE_AVAILABLE = False
+
+NUM_LANDMARKS = 21
+FEATURE_DIM = NUM_LANDMARKS * 3
+WRIST, MIDDLE_MCP = 0, 9
+MAX_SIDE = 640      # larger photos are shrunk first; detection does not need more
+
+
+def normalize_landmarks(points: np.ndarray, left_hand: bool = False, mirror_left: bool = True) -> np.ndarray:
+    """
+    (21, 3) keypoints in pixel units → 63-dim translation/scale/rotation
+    invariant vector (float32).
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(NUM_LANDMARKS, 3).copy()
+    pts -= pts[WRIST]
+    if left_hand and mirror_left:
+        pts[:, 0] = -pts[:, 0]
+    ref = pts[MIDDLE_MCP, :2]
+    scale = float(np.hypot(*ref))
+    if scale < 1e-9:
+        scale = float(np.abs(pts[:, :2]).max()) or 1.0
+    pts /= scale
+    # rotate in the image plane so wrist → middle knuckle is (0, -1), i.e. "up"
+    angle = -np.pi / 2 - np.arctan2(ref[1], ref[0]) if np.hypot(*ref) >= 1e-9 else 0.0
+    c, s = np.cos(angle), np.sin(angle)
+    x, y = pts[:, 0].copy(), pts[:, 1].copy()
+    pts[:, 0] = c * x - s * y
+    pts[:, 1] = s * x + c * y
+    return pts.astype(np.float32).ravel()
+
+
+class HandLandmarkExtractor:
+    """One MediaPipe Hands graph; call it with a PIL image to get 63 features (or None)."""
+
+    def __init__(self, model_complexity: int = 0, min_detection_confidence: float = 0.5,
+                 mirror_left: bool = True):
+        if not MEDIAPIPE_AVAILABLE:
+            raise RuntimeError("mediapipe is not installed")
+        self.mirror_left = mirror_left
+        self._hands = mp.solutions.hands.Hands(
+            static_image_mode=True,
+            max_num_hands=1,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+        )
+        self._lock = threading.Lock()
+
+    def landmarks(self, img: Image.Image) -> Optional[Tuple[np.ndarray, bool]]:
+        """((21, 3) keypoints in pixels, is_left_hand), or None when no hand is found."""
+        rgb = img.convert("RGB")
+        if max(rgb.size) > MAX_SIDE:
+            rgb.thumbnail((MAX_SIDE, MAX_SIDE))
+        w, h = rgb.size
+        with self._lock:
+            result = self._hands.process(np.asarray(rgb))
+        if not result.multi_hand_landmarks:
+            return None
+        lm = result.multi_hand_landmarks[0].landmark
+        # x/y are relative to width/height; z uses roughly the same scale as x
+        pts = np.array([[p.x * w, p.y * h, p.z * w] for p in lm], dtype=np.float64)
+        left = False
+        if result.multi_handedness:
+            left = result.multi_handedness[0].classification[0].label == "Left"
+        return pts, left
+
+    def __call__(self, img: Image.Image) -> Optional[np.ndarray]:
+        found = self.landmarks(img)
+        if found is None:
+            return None
+        pts, left = found
+        return normalize_landmarks(pts, left_hand=left, mirror_left=self.mirror_left)
+
+    def close(self) -> None:
+        self._hands.close()
+
+
+_extractor: Optional[HandLandmarkExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_landmark_extractor() -> HandLandmarkExtractor:
+    """The process-wide extractor (the MediaPipe model is loaded on first use)."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = HandLandmarkExtractor()
+    return _extractor
+
+
+def landmark_features(img: Image.Image) -> Optional[np.ndarray]:
+    """63-dim hand-shape vector for img, or None if MediaPipe finds no hand."""
+    return get_landmark_extractor()(img)
@@ -0,0 +1,254 @@
+# ANTIDOTE/utils/signalink_live.py
+# ------------------------------------------------------------
+# SIGNALINK – continuous recognition on a live video stream
+#
+#   webrtc callback thread                 recognizer worker thread
+#   ───────────────────────                ────────────────────────
+#   frame → LiveRecognizer.offer()  ──►    LatestFrameQueue (bounded, drops old)
+#         ◄── overlay of .state              AdaptiveSkipper decides what to run
+#                                            predict_fn(frame) → PredictionSmoother
+#                                            (→ SignDebouncer → .drain_tokens())
+#
+# Nothing here imports Streamlit or streamlit-webrtc: the page wires the
+# callback, this module only does the queueing, pacing, smoothing and the
+# overlay drawn onto outgoing frames.
+# ------------------------------------------------------------
+import collections
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from utils.signalink_composer import SignDebouncer
+
+DEFAULT_TARGET_FPS = 5.0
+DEFAULT_WINDOW = 8
+IDLE_STOP_S = 5.0   # worker exits after this long without frames; offer() restarts it
+
+
+class LatestFrameQueue:
+    """
+    Bounded frame buffer for a slow consumer: put() never blocks, and when the
+    buffer is full the oldest frame is dropped, so the worker always sees the
+    most recent frames instead of a growing backlog.
+    """
+
+    def __init__(self, maxsize: int = 2):
+        self._frames: Deque[Tuple[float, Any]] = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, frame: Any) -> None:
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append((time.monotonic(), frame))
+            self._cond.notify()
+
+    def get_latest(self, timeout: Optional[float] = None) -> Optional[Tuple[float, Any]]:
+        """Newest (arrival time, frame), discarding anything older; None on timeout."""
+        with self._cond:
+            if not self._frames and not self._cond.wait_for(lambda: bool(self._frames), timeout):
+                return None
+            self.dropped += len(self._frames) - 1
+            item = self._frames[-1]
+            self._frames.clear()
+            return item
+
+
+class AdaptiveSkipper:
+    """
+    Decides which incoming frames to process so recognition holds target_fps:
+    every n-th frame, with n from the measured input rate and the (smoothed)
+    time one prediction takes. Slow CPUs get a larger n instead of a backlog.
+    """
+
+    def __init__(self, target_fps: float = DEFAULT_TARGET_FPS, alpha: float = 0.2):
+        self.target_fps = target_fps
+        self.alpha = alpha
+        self.proc_s = 0.0          # EMA of processing time per frame
+        self.input_fps = 0.0       # EMA of incoming frame rate
+        self.every = 1
+        self._last_in: Optional[float] = None
+        self._count = 0
+
+    def observe_input(self, now: Optional[float] = None) -> bool:
+        """Register one incoming frame; True if it should be processed."""
+        now = time.monotonic() if now is None else now
+        if self._last_in is not None and now > self._last_in:
+            fps = 1.0 / (now - self._last_in)
+            self.input_fps = fps if not self.input_fps else (1 - self.alpha) * self.input_fps + self.alpha * fps
+        self._last_in = now
+        self._count += 1
+        if self._count >= self.every:
+            self._count = 0
+            return True
+        return False
+
+    def observe_processing(self, seconds: float) -> None:
+        self.proc_s = seconds if not self.proc_s else (1 - self.alpha) * self.proc_s + self.alpha * seconds
+        achievable = min(self.target_fps, 1.0 / self.proc_s) if self.proc_s > 0 else self.target_fps
+        if self.input_fps > 0 and achievable > 0:
+            self.every = max(1, int(round(self.input_fps / achievable)))
+
+    @property
+    def output_fps(self) -> float:
+        return self.input_fps / self.every if self.input_fps else 0.0
+
+
+class PredictionSmoother:
+    """
+    Confidence-weighted majority vote over the last `window` predictions. A
+    sign is reported only once it holds at least `min_share` of the votes,
+    and stays until another sign does (so one odd frame does not flicker).
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_share: float = 0.5):
+        self.window: Deque[Tuple[Optional[str], float]] = collections.deque(maxlen=window)
+        self.min_share = min_share
+        self.label: Optional[str] = None
+        self.share = 0.0
+
+    def update(self, label: Optional[str], confidence: float = 1.0) -> Optional[str]:
+        """Add one prediction (label None = no hand / no match); returns the stable label."""
+        self.window.append((label, max(0.0, float(confidence))))
+        votes: Dict[Optional[str], float] = {}
+        for lab, w in self.window:
+            votes[lab] = votes.get(lab, 0.0) + (w if lab is not None else 0.5)
+        total = sum(votes.values()) or 1.0
+        best = max(votes, key=votes.get)
+        share = votes[best] / total
+        if share >= self.min_share:
+            self.label, self.share = best, share
+        elif self.label is not None:
+            self.share = votes.get(self.label, 0.0) / total
+        return self.label
+
+    def reset(self) -> None:
+        self.window.clear()
+        self.label, self.share = None, 0.0
+
+
+class LiveRecognizer:
+    """
+    Runs predict_fn(frame) → (label, confidence) on a worker thread fed by the
+    video callback. The callback only calls offer() and reads state, both
+    cheap, so the video never waits for recognition.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[Any], Tuple[Optional[str], float]],
+        target_fps: float = DEFAULT_TARGET_FPS,
+        window: int = DEFAULT_WINDOW,
+        min_share: float = 0.5,
+        debouncer: Optional[SignDebouncer] = None,
+    ):
+        self.predict_fn = predict_fn
+        self.debouncer = debouncer
+        self.tokens: Deque[str] = collections.deque(maxlen=64)   # committed signs for the composer
+        self.queue = LatestFrameQueue()
+        self.skipper = AdaptiveSkipper(target_fps)
+        self.smoother = PredictionSmoother(window, min_share)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._state: Dict[str, Any] = {"label": None, "share": 0.0, "raw": None, "fps": 0.0,
+                                       "latency_ms": 0.0, "processed": 0, "dropped": 0, "error": None,
+                                       "holding": None, "hold": 0.0}
+
+    # ---------- producer side (video callback thread) ----------
+    def offer(self, frame: Any) -> bool:
+        """Hand one frame over; returns True if it was queued for recognition."""
+        if not self.skipper.observe_input():
+            return False
+        self.queue.put(frame)
+        self._ensure_worker()
+        return True
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state)
+
+    def drain_tokens(self) -> List[str]:
+        """Signs committed by the debouncer since the last call, oldest first."""
+        with self._lock:
+            out = list(self.tokens)
+            self.tokens.clear()
+            return out
+
+    # ---------- worker ----------
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="signalink-live", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        idle_since = time.monotonic()
+        while not self._stop.is_set():
+            item = self.queue.get_latest(timeout=0.5)
+            if item is None:
+                if time.monotonic() - idle_since > IDLE_STOP_S:
+                    return
+                continue
+            _, frame = item
+            t0 = time.perf_counter()
+            try:
+                label, conf = self.predict_fn(frame)
+                error = None
+            except Exception as e:   # keep the stream alive; show the error instead
+                label, conf, error = None, 0.0, str(e)
+            elapsed = time.perf_counter() - t0
+            self.skipper.observe_processing(elapsed)
+            stable = self.smoother.update(label, conf)
+            holding, hold = None, 0.0
+            token = None
+            if self.debouncer is not None:
+                now = time.monotonic()
+                token = self.debouncer.update(stable, now)
+                holding, hold = self.debouncer.progress(now)
+            with self._lock:
+                if token is not None:
+                    self.tokens.append(token)
+                self._state.update(
+                    label=stable,
+                    share=self.smoother.share,
+                    raw=label,
+                    fps=self.skipper.output_fps,
+                    latency_ms=elapsed * 1000,
+                    processed=self._state["processed"] + 1,
+                    dropped=self.queue.dropped,
+                    error=error,
+                    holding=holding,
+                    hold=hold,
+                )
+            idle_since = time.monotonic()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.smoother.reset()
+        if self.debouncer is not None:
+            self.debouncer.reset()
+
+
+def draw_overlay(rgb: np.ndarray, state: Dict[str, Any]) -> np.ndarray:
+    """Recognized sign (or a hint) in a banner across the top of an RGB frame."""
+    img = Image.fromarray(np.ascontiguousarray(rgb))
+    draw = ImageDraw.Draw(img)
+    w = img.size[0]
+    band = max(28, img.size[1] // 10)
+    draw.rectangle([0, 0, w, band], fill=(0, 0, 0))
+    if state.get("label"):
+        text = f"{state['label']}  ({state['share']:.0%})"
+    else:
+        text = "Show a sign..."
+    draw.text((10, band // 4), text, fill=(255, 255, 255))
+    draw.text((w - 80, band // 4), f"{state.get('fps', 0.0):.1f} fps", fill=(180, 180, 180))
+    return np.asarray(img)
@@ -0,0 +1,169 @@
+# ANTIDOTE/utils/signalink_match.py
+# ------------------------------------------------------------
+# SIGNALINK – vectorized nearest-neighbour matcher for the gesture DB
+# ------------------------------------------------------------
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NO_MATCH_MSE = 9999.0
+
+# (matrix, row_labels, sq_norms or None, live mask or None)
+Block = Tuple[np.ndarray, Sequence[str], Optional[np.ndarray], Optional[np.ndarray]]
+
+
+class GestureMatcher:
+    """
+    The gesture DB as one or more (n_i, d) sample blocks plus a label per row.
+
+    MSE to every sample comes from one matrix product per block using
+    ||x - q||² = ||x||² - 2·x·q + ||q||², with ||x||² precomputed at build time.
+    Blocks (e.g. memory-mapped DB segments) are used in place, never copied;
+    rows marked not live are dropped from the result. Live rows are grouped by
+    label through a permutation, so the best distance per label is one reduceat.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        row_labels: Sequence[str],
+        sq_norms: Optional[np.ndarray] = None,
+        live: Optional[np.ndarray] = None,
+        dtype=np.float32,
+        mse_dim: Optional[int] = None,
+    ):
+        self._build([(matrix, row_labels, sq_norms, live)], dtype, mse_dim)
+
+    @classmethod
+    def from_blocks(cls, blocks: Sequence[Block], dtype=np.float32, mse_dim: Optional[int] = None) -> "GestureMatcher":
+        self = cls.__new__(cls)
+        self._build(blocks, dtype, mse_dim)
+        return self
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[object]) -> "GestureMatcher":
+        """From GestureStore.segments(): matrix / row_labels / sq_norms / live per segment."""
+        return cls.from_blocks([(s.matrix, s.row_labels, s.sq_norms, s.live) for s in segments])
+
+    @classmethod
+    def from_db(cls, db: Dict[str, List[List[float]]], dtype=np.float32) -> "GestureMatcher":
+        rows = [s for samples in db.values() for s in samples]
+        labels = [label for label, samples in db.items() for _ in samples]
+        if not rows:
+            return cls(np.empty((0, 0), dtype=dtype), [], dtype=dtype)
+        return cls(np.asarray(rows, dtype=dtype), labels, dtype=dtype)
+
+    def _build(self, blocks: Sequence[Block], dtype, mse_dim: Optional[int] = None) -> None:
+        mats, norms, labels, lives = [], [], [], []
+        self.dim = 0
+        for matrix, row_labels, sq_norms, live in blocks:
+            # no copy when matrix is already a C-contiguous float32 array / memmap
+            matrix = np.ascontiguousarray(matrix, dtype=dtype)
+            if matrix.ndim != 2:
+                raise ValueError("matrix must be 2-D (samples × features)")
+            row_labels = np.asarray(row_labels, dtype=object)
+            if len(row_labels) != matrix.shape[0]:
+                raise ValueError("one label per row is required")
+            if not len(row_labels):
+                continue
+            if mats and matrix.shape[1] != self.dim:
+                raise ValueError("all blocks need the same number of features")
+            self.dim = matrix.shape[1]
+            if sq_norms is None:
+                sq_norms = np.einsum("ij,ij->i", matrix, matrix, dtype=np.float64)
+            mats.append(matrix)
+            norms.append(np.asarray(sq_norms, dtype=np.float32))
+            labels.append(row_labels)
+            lives.append(np.ones(len(row_labels), dtype=bool) if live is None else np.asarray(live, dtype=bool))
+
+        self._mats = mats
+        self._bounds = np.cumsum([0] + [m.shape[0] for m in mats])
+        # squared distance / mse_dim = MSE; for projected features this is the raw
+        # pixel count, so scores stay on the same scale as raw matching
+        self.mse_dim = mse_dim or self.dim
+        self.sq_norms = np.concatenate(norms) if norms else np.empty(0, dtype=np.float32)
+        all_labels = np.concatenate(labels) if labels else np.empty(0, dtype=object)
+        all_live = np.concatenate(lives) if lives else np.empty(0, dtype=bool)
+        self._live = None if all_live.all() else np.flatnonzero(all_live)
+        self.row_labels = all_labels if self._live is None else all_labels[self._live]
+        # live rows grouped by label (a permutation, the matrices stay in place)
+        self._order = np.argsort(self.row_labels, kind="stable")
+        if len(self.row_labels):
+            self.labels, self._starts = np.unique(self.row_labels[self._order], return_index=True)
+        else:
+            self.labels, self._starts = np.empty(0, dtype=object), np.empty(0, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.row_labels)
+
+    def rows(self, idx: Sequence[int]) -> np.ndarray:
+        """Copy of the live rows at positions idx (positions as in row_labels)."""
+        idx = np.asarray(idx, dtype=np.intp)
+        if self._live is not None:
+            idx = self._live[idx]
+        out = np.empty((len(idx), self.dim), dtype=np.float32)
+        block = np.searchsorted(self._bounds, idx, side="right") - 1
+        for b in np.unique(block):
+            sel = block == b
+            out[sel] = self._mats[b][idx[sel] - self._bounds[b]]
+        return out
+
+    # ---------- distances ----------
+    def distances(self, queries: np.ndarray) -> np.ndarray:
+        """MSE from each query row (m, d) to every live sample → (m, n)."""
+        q = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        q_norms = np.einsum("ij,ij->i", q, q)
+        parts = [q @ m.T for m in self._mats]
+        d = parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+        if self._live is not None:
+            d = d[:, self._live]
+            d *= -2.0
+            d += self.sq_norms[self._live][None, :]
+        else:
+            d *= -2.0
+            d += self.sq_norms[None, :]
+        d += q_norms[:, None]
+        np.maximum(d, 0.0, out=d)
+        d /= float(self.mse_dim or 1)
+        return d
+
+    def nearest(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """The k nearest live samples per query → (row positions, mse), both (m, k), closest first."""
+        d = self.distances(queries)
+        k = max(1, min(k, d.shape[1]))
+        idx = np.argpartition(d, k - 1, axis=1)[:, :k] if k < d.shape[1] else np.tile(np.arange(k), (d.shape[0], 1))
+        mse = np.take_along_axis(d, idx, axis=1)
+        order = np.argsort(mse, axis=1, kind="stable")
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(mse, order, axis=1)
+
+    def label_distances(self, queries: np.ndarray) -> np.ndarray:
+        """Best (smallest) MSE per label for each query → (m, n_labels)."""
+        return np.minimum.reduceat(self.distances(queries)[:, self._order], self._starts, axis=1)
+
+    # ---------- queries ----------
+    def top_k(self, vec: np.ndarray, k: int = 3) -> List[Tuple[str, float]]:
+        """The k closest labels (each by its nearest sample) as [(label, mse), ...]."""
+        return self.top_k_batch(np.asarray(vec).reshape(1, -1), k)[0]
+
+    def top_k_batch(self, queries: np.ndarray, k: int = 3) -> List[List[Tuple[str, float]]]:
+        if not len(self):
+            return [[] for _ in range(np.atleast_2d(queries).shape[0])]
+        per_label = self.label_distances(queries)
+        k = max(1, min(k, per_label.shape[1]))
+        out: List[List[Tuple[str, float]]] = []
+        for row in per_label:
+            idx = np.argpartition(row, k - 1)[:k] if k < row.shape[0] else np.arange(row.shape[0])
+            idx = idx[np.argsort(row[idx], kind="stable")]
+            out.append([(str(self.labels[i]), float(row[i])) for i in idx])
+        return out
+
+    def best(self, vec: np.ndarray) -> Tuple[Optional[str], float]:
+        if not len(self):
+            return None, NO_MATCH_MSE
+        label, mse = self.top_k(vec, 1)[0]
+        return label, mse
+
+    def nbytes(self) -> int:
+        """Bytes of sample data behind the matcher (memory-mapped pages count too)."""
+        return int(sum(m.nbytes for m in self._mats) + self.sq_norms.nbytes)
+
@@ -0,0 +1,247 @@
+# ANTIDOTE/utils/signalink_pca.py
+# ------------------------------------------------------------
+# SIGNALINK – optional PCA compression of gesture samples
+#
+#   gesture_db/
+#     pca.joblib                 IncrementalPCA + fit bookkeeping
+#     pca-000003.f32             projected live rows for model #3 (n × k float32)
+#     pca-000003.seq.i64         row id of each projected row
+#
+# Raw samples stay the source of truth. New samples are projected with the
+# current model on first use (O(1) each); once enough new rows arrive the
+# model is refit with partial_fit on just those rows and every row is
+# re-projected in the background.
+# ------------------------------------------------------------
+import copy
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SKLEARN_AVAILABLE = True
+try:
+    import joblib
+    from sklearn.decomposition import IncrementalPCA
+except Exception:
+    joblib = None
+    IncrementalPCA = None
+    SKLEARN_AVAILABLE = False
+
+MIN_DIMS, MAX_DIMS = 32, 256
+MODEL_FILE = "pca.joblib"
+FIT_BATCH = 512
+
+
+class PCAProjector:
+    """IncrementalPCA over the gesture DB's raw rows, persisted next to the DB."""
+
+    def __init__(self, root: Path, n_components: int = 128, refit_ratio: float = 0.2):
+        self.root = Path(root)
+        self.n_components = int(min(MAX_DIMS, max(MIN_DIMS, n_components)))
+        self.refit_ratio = refit_ratio
+        self._lock = threading.RLock()
+        self._fit_lock = threading.Lock()
+        self.model = None
+        self.model_id = 0
+        self.fit_upto_seq = 0     # rows with a smaller id have been fed to partial_fit
+        self.rows_fitted = 0
+        self._mean: Optional[np.ndarray] = None
+        self._basis: Optional[np.ndarray] = None   # (d, k) float32
+        self._feats = np.empty((0, self.n_components), dtype=np.float32)
+        self._feat_seqs = np.empty(0, dtype=np.int64)
+        self._load()
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    # ---------- persistence ----------
+    def _feature_paths(self, model_id: int) -> Tuple[Path, Path]:
+        base = self.root / f"pca-{model_id:06d}"
+        return base.with_suffix(".f32"), base.with_suffix(".seq.i64")
+
+    def _load(self) -> None:
+        if not SKLEARN_AVAILABLE or not (self.root / MODEL_FILE).exists():
+            return
+        try:
+            state = joblib.load(self.root / MODEL_FILE)
+        except Exception:
+            return
+        if state.get("n_components") != self.n_components:
+            return  # configured size changed: refit from scratch
+        self._install(state["model"], state["model_id"], state["fit_upto_seq"], state["rows_fitted"])
+        feats_path, seqs_path = self._feature_paths(self.model_id)
+        try:
+            seqs = np.fromfile(seqs_path, dtype=np.int64)
+            feats = np.fromfile(feats_path, dtype=np.float32)
+            n = min(len(seqs), len(feats) // self.n_components)
+            self._feat_seqs = seqs[:n]
+            self._feats = feats[: n * self.n_components].reshape(n, self.n_components)
+        except OSError:
+            pass
+
+    def _install(self, model, model_id: int, fit_upto_seq: int, rows_fitted: int) -> None:
+        self.model = model
+        self.model_id = model_id
+        self.fit_upto_seq = fit_upto_seq
+        self.rows_fitted = rows_fitted
+        self._mean = model.mean_.astype(np.float32)
+        self._basis = np.ascontiguousarray(model.components_.T, dtype=np.float32)
+
+    def _save(self, model, model_id: int, fit_upto_seq: int, rows_fitted: int) -> None:
+        state = {
+            "model": model,
+            "model_id": model_id,
+            "fit_upto_seq": fit_upto_seq,
+            "rows_fitted": rows_fitted,
+            "n_components": self.n_components,
+        }
+        fd, tmp = tempfile.mkstemp(prefix="pca.", suffix=".tmp", dir=str(self.root))
+        os.close(fd)
+        joblib.dump(state, tmp)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.root / MODEL_FILE)
+
+    # ---------- projection ----------
+    def projection(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Projection with the current model, frozen (a later refit does not change it)."""
+        mean, basis = self._mean, self._basis
+
+        def project(X: np.ndarray) -> np.ndarray:
+            X = np.asarray(X, dtype=np.float32).reshape(-1, basis.shape[0])
+            return (X - mean) @ basis
+
+        return project
+
+    def features(self, segments: Sequence[object]) -> Tuple[int, Callable[[np.ndarray], np.ndarray], np.ndarray, np.ndarray]:
+        """
+        (model_id, projection, features, labels) for every live row in segment
+        order, all from the same model. Rows projected earlier come from the
+        cache; new ones are projected now and cached.
+        """
+        with self._lock:
+            project = self.projection()
+            live_seqs = [s.seqs[s.live] for s in segments]
+            labels = [s.row_labels[s.live] for s in segments]
+            seqs = np.concatenate(live_seqs) if live_seqs else np.empty(0, dtype=np.int64)
+            out = np.empty((len(seqs), self.n_components), dtype=np.float32)
+            hit = np.zeros(len(seqs), dtype=bool)
+            if len(self._feat_seqs):
+                pos = np.minimum(np.searchsorted(self._feat_seqs, seqs), len(self._feat_seqs) - 1)
+                hit = self._feat_seqs[pos] == seqs
+                out[hit] = self._feats[pos[hit]]
+
+            if not hit.all():
+                new_seqs: List[np.ndarray] = []
+                new_feats: List[np.ndarray] = []
+                offset = 0
+                for seg, s_seqs in zip(segments, live_seqs):
+                    rows = np.flatnonzero(seg.live)
+                    miss = ~hit[offset:offset + len(rows)]
+                    if miss.any():
+                        f = project(seg.matrix[rows[miss]])
+                        out[offset + np.flatnonzero(miss)] = f
+                        new_seqs.append(s_seqs[miss])
+                        new_feats.append(f)
+                    offset += len(rows)
+                self._cache(np.concatenate(new_seqs), np.concatenate(new_feats))
+            labels = np.concatenate(labels) if labels else np.empty(0, dtype=object)
+            return self.model_id, project, out, labels
+
+    def _cache(self, seqs: np.ndarray, feats: np.ndarray) -> None:
+        feats_path, seqs_path = self._feature_paths(self.model_id)
+        with open(feats_path, "ab") as f:
+            f.write(np.ascontiguousarray(feats, dtype=np.float32).tobytes())
+        with open(seqs_path, "ab") as f:
+            f.write(seqs.astype(np.int64).tobytes())
+        all_seqs = np.concatenate([self._feat_seqs, seqs])
+        all_feats = np.concatenate([self._feats, feats])
+        order = np.argsort(all_seqs, kind="stable")
+        self._feat_seqs, self._feats = all_seqs[order], all_feats[order]
+
+    # ---------- fitting ----------
+    def needs_refit(self, segments: Sequence[object]) -> bool:
+        if not SKLEARN_AVAILABLE:
+            return False
+        new = sum(int((s.live & (s.seqs >= self.fit_upto_seq)).sum()) for s in segments)
+        if self.model is None:
+            return new >= self.n_components
+        return new >= max(self.n_components, self.refit_ratio * self.rows_fitted)
+
+    def refit(self, segments: Sequence[object]) -> bool:
+        """partial_fit on live rows not seen yet, then re-project every live row."""
+        if not SKLEARN_AVAILABLE or not self._fit_lock.acquire(blocking=False):
+            return False
+        try:
+            fresh = [(s, np.flatnonzero(s.live & (s.seqs >= self.fit_upto_seq))) for s in segments]
+            n_new = sum(len(rows) for _, rows in fresh)
+            if n_new < self.n_components:
+                return False
+            model = copy.deepcopy(self.model) if self.model is not None else IncrementalPCA(self.n_components)
+            # partial_fit needs at least n_components rows per batch
+            batch = max(FIT_BATCH, self.n_components)
+            batches: List[list] = [[]]
+            sizes = [0]
+            for seg, rows in fresh:
+                for start in range(0, len(rows), batch):
+                    if sizes[-1] >= batch:
+                        batches.append([])
+                        sizes.append(0)
+                    part = rows[start:start + batch]
+                    batches[-1].append((seg, part))
+                    sizes[-1] += len(part)
+            if len(batches) > 1 and sizes[-1] < self.n_components:
+                batches[-2].extend(batches.pop())
+            for parts in batches:
+                model.partial_fit(np.concatenate([np.asarray(seg.matrix[part], dtype=np.float32) for seg, part in parts]))
+            upto = max(self.fit_upto_seq, max(int(seg.seqs[rows].max()) + 1 for seg, rows in fresh if len(rows)))
+            model_id = self.model_id + 1
+            rows_fitted = self.rows_fitted + n_new
+
+            # re-project everything with the new model into its own feature files
+            mean = model.mean_.astype(np.float32)
+            basis = np.ascontiguousarray(model.components_.T, dtype=np.float32)
+            feats_path, seqs_path = self._feature_paths(model_id)
+            all_seqs, all_feats = [], []
+            with open(feats_path, "wb") as ff, open(seqs_path, "wb") as fs:
+                for seg in segments:
+                    rows = np.flatnonzero(seg.live)
+                    for start in range(0, len(rows), batch):
+                        part = rows[start:start + batch]
+                        f = (np.asarray(seg.matrix[part], dtype=np.float32) - mean) @ basis
+                        ff.write(f.tobytes())
+                        fs.write(seg.seqs[part].astype(np.int64).tobytes())
+                        all_feats.append(f)
+                        all_seqs.append(seg.seqs[part].astype(np.int64))
+            self._save(model, model_id, upto, rows_fitted)
+
+            with self._lock:
+                old_id = self.model_id
+                self._install(model, model_id, upto, rows_fitted)
+                seqs = np.concatenate(all_seqs) if all_seqs else np.empty(0, dtype=np.int64)
+                feats = np.concatenate(all_feats) if all_feats else np.empty((0, self.n_components), np.float32)
+                order = np.argsort(seqs, kind="stable")
+                self._feat_seqs, self._feats = seqs[order], feats[order]
+            for p in self._feature_paths(old_id):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            return True
+        finally:
+            self._fit_lock.release()
+
+    def maybe_refit(self, segments: Sequence[object], background: bool = True) -> bool:
+        if self._fit_lock.locked() or not self.needs_refit(segments):
+            return False
+        if background:
+            threading.Thread(target=self.refit, args=(segments,), name="gesture-pca-fit", daemon=True).start()
+        else:
+            self.refit(segments)
+        return True
+
+    def nbytes_per_sample(self) -> int:
+        return self.n_components * 4
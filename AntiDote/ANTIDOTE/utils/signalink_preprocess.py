@@ -0,0 +1,116 @@
+# ANTIDOTE/utils/signalink_preprocess.py
+# ------------------------------------------------------------
+# SIGNALINK – fast decode + preprocessing for camera snapshots
+#
+#   JPEG bytes ─► open_image(): draft mode, the decoder itself scales by
+#                 1/2, 1/4 or 1/8 and emits grayscale (no full-size RGB image)
+#              ─► to_vector(): crop box + resize in one PIL call, then
+#                 uint8 → float32 / 255 straight into the output buffer
+#              ─► preview_image(): small RGB copy for st.image
+#
+# The decoder never goes below the size the crop + resize needs, so the
+# vectors stay within JPEG noise of the old full-size path (see
+# python -m utils.bench_signalink_preprocess). Non-JPEG input (PNG sign
+# cards, webcam frames) skips the draft step and takes the same fused path.
+# ------------------------------------------------------------
+import io
+from pathlib import Path
+from typing import BinaryIO, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+FEATURE_SIZE = (128, 128)
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}   # files the CLIs and benchmarks pick up
+PREVIEW_SIDE = 360
+RESAMPLE = Image.BICUBIC     # what Image.resize() uses by default, so stored samples stay comparable
+
+Crop = Tuple[float, float, float, float]     # left, top, right, bottom as fractions of the image
+Source = Union[Image.Image, bytes, BinaryIO, Path, str]
+
+
+def parse_crop(spec: Optional[str]) -> Optional[Crop]:
+    """"" → None, "center" → largest centred square, "l,t,r,b" → fractions (0–1)."""
+    spec = (spec or "").strip().lower()
+    if not spec or spec == "none":
+        return None
+    if spec == "center":
+        return (-1.0, -1.0, -1.0, -1.0)      # resolved per image in crop_box()
+    parts = [float(p) for p in spec.split(",")]
+    if len(parts) != 4 or not (0 <= parts[0] < parts[2] <= 1 and 0 <= parts[1] < parts[3] <= 1):
+        raise ValueError("crop must be 'center' or 'left,top,right,bottom' fractions between 0 and 1")
+    return tuple(parts)  # type: ignore[return-value]
+
+
+def crop_box(size: Tuple[int, int], crop: Optional[Crop]) -> Tuple[float, float, float, float]:
+    """Pixel box (left, top, right, bottom) of crop in an image of size (w, h)."""
+    w, h = size
+    if crop is None:
+        return (0.0, 0.0, float(w), float(h))
+    if crop[0] < 0:
+        side = min(w, h)
+        return ((w - side) / 2, (h - side) / 2, (w + side) / 2, (h + side) / 2)
+    return (crop[0] * w, crop[1] * h, crop[2] * w, crop[3] * h)
+
+
+def _crop_share(size: Tuple[int, int], crop: Optional[Crop]) -> Tuple[float, float]:
+    left, top, right, bottom = crop_box(size, crop)
+    return (right - left) / size[0], (bottom - top) / size[1]
+
+
+def open_image(src: Source, mode: str = "L", min_size: Tuple[int, int] = FEATURE_SIZE,
+               crop: Optional[Crop] = None) -> Image.Image:
+    """
+    Decode src (bytes, file, path, uploaded file or an already open image) in
+    mode. JPEGs are decoded at the smallest DCT scale that still leaves
+    min_size pixels inside the crop.
+    """
+    if isinstance(src, Image.Image):
+        return src if src.mode == mode else src.convert(mode)
+    if isinstance(src, bytes):
+        src = io.BytesIO(src)
+    elif hasattr(src, "getvalue"):        # Streamlit UploadedFile / BytesIO: do not depend on the read position
+        src = io.BytesIO(src.getvalue())
+    img = Image.open(src)
+    if img.format == "JPEG":
+        fw, fh = _crop_share(img.size, crop)
+        img.draft(mode, (int(np.ceil(min_size[0] / fw)), int(np.ceil(min_size[1] / fh))))
+    return img if img.mode == mode else img.convert(mode)
+
+
+def to_vector(img: Image.Image, size: Tuple[int, int] = FEATURE_SIZE, crop: Optional[Crop] = None,
+              out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Grayscale, crop, resize and scale to [0, 1] as one flat float32 vector;
+    written into out (size[0] * size[1] floats) when given.
+    """
+    gray = img if img.mode == "L" else img.convert("L")
+    small = gray.resize(size, RESAMPLE, box=crop_box(gray.size, crop))
+    if out is None:
+        out = np.empty(size[0] * size[1], dtype=np.float32)
+    np.multiply(np.asarray(small, dtype=np.uint8).reshape(-1), np.float32(1.0 / 255.0), out=out)
+    return out
+
+
+def fast_preprocess(src: Source, size: Tuple[int, int] = FEATURE_SIZE, crop: Optional[Crop] = None,
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Encoded photo → feature vector (open_image + to_vector)."""
+    return to_vector(open_image(src, "L", size, crop), size, crop, out)
+
+
+def preview_image(src: Source, max_side: int = PREVIEW_SIDE) -> Image.Image:
+    """Small RGB copy for display, so the browser is not sent the full-size photo again."""
+    # a preview may come out a bit smaller than max_side; that is not worth a full-scale decode
+    img = open_image(src, "RGB", (max_side // 2, max_side // 2))
+    if max(img.size) > max_side:
+        img = img.copy()
+        img.thumbnail((max_side, max_side), Image.BILINEAR)
+    return img
+
+
+def legacy_preprocess(img: Image.Image, size: Sequence[int] = FEATURE_SIZE) -> np.ndarray:
+    """The original full-size path (kept for benchmarks and comparisons)."""
+    gray = img.convert("L")
+    resized = gray.resize(tuple(size))
+    arr = np.array(resized, dtype=np.float32) / 255.0
+    return arr.flatten()
@@ -0,0 +1,293 @@
+# ANTIDOTE/utils/signalink_prune.py
+# ------------------------------------------------------------
+# SIGNALINK – prune redundant samples so every sign stays within a budget
+#
+# Pressing "add sample" a hundred times with the hand held still gives a
+# hundred near-identical rows: more to store and to scan, no new information.
+# Two ways to pick the rows worth keeping:
+#
+#   kmedoids  per sign, `budget` medoids of its samples (k-means++ seeding +
+#             Voronoi iterations): the kept rows cover every pose the sign was
+#             recorded in, duplicates collapse onto one representative.
+#   cnn       Wilson editing (drop rows whose 3 nearest neighbours mostly
+#             disagree with their label – noise), then Hart's condensed
+#             nearest neighbour (the rows along the borders between signs),
+#             topped up to the budget with medoids of the other edited rows.
+#             The k-NN vote needs more than one row per region, so pure CNN
+#             would keep far too few.
+#
+# Dropped rows are tombstoned in the store and their captures deleted, so
+# other feature pipelines drop them too on their next sync. GestureDB runs
+# this automatically for a sign once it holds AUTO_PRUNE_FACTOR × budget rows.
+#
+#   python -m utils.signalink_prune --samples 3000 --budget 50            # report only
+#   python -m utils.signalink_prune --store signalink_assets/gesture_db --budget 50 --apply
+# ------------------------------------------------------------
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from utils.signalink_match import GestureMatcher
+
+METHODS = ("kmedoids", "cnn")
+DEFAULT_BUDGET = 100
+AUTO_PRUNE_FACTOR = 1.5
+MEDOID_ITERS = 10
+MAX_MEDOID_ROWS = 4096     # larger signs: medoids are chosen from a random subset of this size
+EDIT_K = 3
+CHUNK = 512
+
+
+def sq_distances(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """Squared Euclidean distances (n, m) between the rows of A and B."""
+    A = np.asarray(A, dtype=np.float32)
+    B = np.asarray(B, dtype=np.float32)
+    d = -2.0 * (A @ B.T)
+    d += np.einsum("ij,ij->i", A, A)[:, None]
+    d += np.einsum("ij,ij->i", B, B)[None, :]
+    np.maximum(d, 0.0, out=d)
+    return d
+
+
+def k_medoids(X: np.ndarray, k: int, seed: int = 0, iters: int = MEDOID_ITERS) -> np.ndarray:
+    """Indices of k medoids of the rows of X (all rows when there are at most k)."""
+    n = len(X)
+    if n <= k:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    pool = np.arange(n) if n <= MAX_MEDOID_ROWS else np.sort(rng.choice(n, MAX_MEDOID_ROWS, replace=False))
+    D = sq_distances(X[pool], X[pool])
+    # k-means++ seeding: spread the first medoids over the data
+    medoids = [int(rng.integers(len(pool)))]
+    closest = D[medoids[0]].copy()
+    for _ in range(1, k):
+        total = float(closest.sum())
+        nxt = int(rng.choice(len(pool), p=closest / total)) if total > 0 else int(rng.integers(len(pool)))
+        medoids.append(nxt)
+        np.minimum(closest, D[nxt], out=closest)
+    medoids = np.unique(medoids)
+    # Voronoi iteration: assign, then move each medoid to its cluster's most central row
+    for _ in range(iters):
+        assign = D[:, medoids].argmin(axis=1)
+        moved = medoids.copy()
+        for c in range(len(medoids)):
+            members = np.flatnonzero(assign == c)
+            if len(members):
+                moved[c] = members[D[np.ix_(members, members)].sum(axis=1).argmin()]
+        moved = np.unique(moved)
+        if np.array_equal(moved, medoids):
+            break
+        medoids = moved
+    return pool[medoids]
+
+
+def edited(X: np.ndarray, y: np.ndarray, k: int = EDIT_K) -> np.ndarray:
+    """Wilson editing: True for rows whose k nearest other rows mostly share their label."""
+    m = GestureMatcher(X, y)
+    keep = np.ones(len(y), dtype=bool)
+    for start in range(0, len(y), CHUNK):
+        idx, _ = m.nearest(X[start:start + CHUNK], k + 1)
+        for r, row in enumerate(idx):
+            others = [j for j in row if j != start + r][:k]
+            agree = sum(m.row_labels[j] == y[start + r] for j in others)
+            keep[start + r] = agree * 2 > len(others)
+    return keep
+
+
+def condensed(X: np.ndarray, y: np.ndarray, seed: int = 0, max_passes: int = 10) -> np.ndarray:
+    """Hart's CNN (batched passes): True for the rows 1-NN needs to label every row correctly."""
+    rng = np.random.default_rng(seed)
+    keep = np.zeros(len(y), dtype=bool)
+    for label in np.unique(y):
+        keep[rng.choice(np.flatnonzero(y == label))] = True
+    for _ in range(max_passes):
+        kept = np.flatnonzero(keep)
+        m = GestureMatcher(X[kept], y[kept])
+        wrong = []
+        for start in range(0, len(y), CHUNK):
+            nn = m.nearest(X[start:start + CHUNK], 1)[0][:, 0]
+            bad = np.flatnonzero(m.row_labels[nn] != y[start:start + CHUNK]) + start
+            wrong.extend(int(i) for i in bad if not keep[i])
+        if not wrong:
+            break
+        # one new row per label and pass, so a cluster of errors is fixed by one sample
+        seen = set()
+        for i in rng.permutation(wrong):
+            if y[i] not in seen:
+                seen.add(y[i])
+                keep[i] = True
+    return keep
+
+
+def select(X: np.ndarray, y: np.ndarray, budget: int, method: str = "kmedoids", seed: int = 0,
+           labels: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Boolean mask of the rows to keep: at most `budget` per label. Only labels in
+    `labels` (default: all) lose rows; the others still inform the cnn method.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    y = np.asarray(y).astype(str)
+    X = np.asarray(X, dtype=np.float32)
+    targets = set(np.unique(y)) if labels is None else set(labels)
+    keep = np.ones(len(y), dtype=bool)
+    if method == "cnn" and len(np.unique(y)) > 1:
+        good = edited(X, y)
+        cand = np.flatnonzero(good)
+        core = np.zeros(len(y), dtype=bool)
+        core[cand[condensed(X[cand], y[cand], seed)]] = True
+        for label in targets:
+            rows = y == label
+            if not core[rows].any():      # editing may empty a sign entirely: then keep medoids of all of it
+                continue
+            rest = np.flatnonzero(rows & good & ~core)
+            room = budget - int(core[rows].sum())
+            keep[rows] = core[rows]
+            if room > 0 and len(rest):
+                keep[rest[k_medoids(X[rest], room, seed)]] = True
+    for label in targets:
+        rows = np.flatnonzero((y == label) & keep)
+        if len(rows) > budget:
+            chosen = rows[k_medoids(X[rows], budget, seed)]
+            keep[rows] = False
+            keep[chosen] = True
+    return keep
+
+
+def prune_db(db, budget: int = DEFAULT_BUDGET, method: str = "kmedoids",
+             labels: Optional[Sequence[str]] = None, seed: int = 0) -> Dict[str, Any]:
+    """
+    Prune a GestureDB's store (and its captures) in place. Returns rows before
+    / after per label and the time it took.
+    """
+    t0 = time.perf_counter()
+    store = db.store
+    store.refresh()
+    X, y = store.live_rows()
+    seqs, sources = store.live_sources()
+    if len(seqs) != len(y):        # another process wrote in between: try again later
+        return {"before": len(y), "after": len(y), "removed": 0, "labels": {}, "seconds": 0.0}
+    y = np.asarray(y).astype(str)
+    before = {str(l): int(n) for l, n in zip(*np.unique(y, return_counts=True))}
+    if labels is not None:
+        labels = [l for l in labels if before.get(l, 0) > budget]
+        if not labels:
+            return {"before": len(y), "after": len(y), "removed": 0, "labels": {}, "seconds": 0.0}
+    keep = select(X, y, budget, method, seed, labels)
+    drop = ~keep
+    if drop.any():
+        store.remove_rows(seqs[drop])
+        gone = sources[drop]
+        if db.captures is not None and (gone >= 0).any():
+            db.captures.remove(gone[gone >= 0].tolist())
+        store.maybe_compact()
+    after = {l: int(((y == l) & keep).sum()) for l in before}
+    return {
+        "method": method,
+        "budget": budget,
+        "before": int(len(y)),
+        "after": int(keep.sum()),
+        "removed": int(drop.sum()),
+        "labels": {l: [before[l], after[l]] for l in before if before[l] != after[l]},
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+# ---------- report: what pruning costs and saves ----------
+def evaluate(X: np.ndarray, y: np.ndarray, budget: int, method: str, folds: int = 5, k: int = 5,
+             queries: int = 50, seed: int = 0) -> Dict[str, Any]:
+    """
+    k-fold accuracy of the k-NN vote trained on all rows vs. the pruned rows of
+    each training fold, plus size and predict latency on the whole set.
+    """
+    from utils.bench_signalink_eval import stratified_folds, summarize
+    from utils.signalink_knn import KNNIndex
+
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y).astype(str).astype(object)
+    hits = {"full": 0, "pruned": 0}
+    for test in stratified_folds(y, folds, seed):
+        train = np.ones(len(y), dtype=bool)
+        train[test] = False
+        tr = np.flatnonzero(train)
+        sets = {"full": tr, "pruned": tr[select(X[tr], y[tr], budget, method, seed)]}
+        for name, rows in sets.items():
+            index = KNNIndex(GestureMatcher(X[rows], y[rows]), np.arange(len(rows)), k)
+            hits[name] += sum(index.predict(X[i]).label == y[i] for i in test)
+
+    t0 = time.perf_counter()
+    keep = select(X, y, budget, method, seed)
+    select_s = time.perf_counter() - t0
+    rng = np.random.default_rng(seed + 1)
+    q = X[rng.integers(0, len(y), size=min(queries, len(y)))]
+    out: Dict[str, Any] = {"method": method, "budget": budget, "select_s": select_s}
+    for name, rows in (("full", np.arange(len(y))), ("pruned", np.flatnonzero(keep))):
+        index = KNNIndex(GestureMatcher(X[rows], y[rows]), np.arange(len(rows)), k)
+        times = []
+        for v in q:
+            t0 = time.perf_counter()
+            index.predict(v)
+            times.append(time.perf_counter() - t0)
+        out[name] = {
+            "rows": int(len(rows)),
+            "mb": len(rows) * X.shape[1] * 4 / 2**20,
+            "accuracy": hits[name] / len(y),
+            "predict": summarize(times),
+        }
+    out["accuracy_delta"] = out["pruned"]["accuracy"] - out["full"]["accuracy"]
+    out["size_reduction"] = 1 - out["pruned"]["rows"] / max(1, out["full"]["rows"])
+    out["latency_reduction"] = 1 - out["pruned"]["predict"]["p50_ms"] / max(1e-9, out["full"]["predict"]["p50_ms"])
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Prune redundant SIGNALINK samples")
+    ap.add_argument("--store", type=Path, default=None, help="gesture_db directory (default: synthetic data)")
+    ap.add_argument("--captures", type=Path, default=None, help="captures directory (default: next to the store)")
+    ap.add_argument("--samples", type=int, default=3000, help="synthetic samples (ignored with --store)")
+    ap.add_argument("--side", type=int, default=64, help="synthetic image side")
+    ap.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="samples kept per sign")
+    ap.add_argument("--method", default="kmedoids", choices=METHODS)
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--apply", action="store_true", help="prune the store for real (needs --store)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = ap.parse_args()
+
+    if args.store:
+        from utils.signalink_store import GestureStore
+        store = GestureStore(args.store)
+        X, y = store.live_rows()
+    else:
+        from utils.bench_signalink_pca import synthetic_gestures
+        X, y = synthetic_gestures(args.samples, seed=args.seed, side=args.side)
+    report = evaluate(X, y, args.budget, args.method, args.folds, seed=args.seed)
+    if args.apply and args.store:
+        from utils.signalink_captures import CaptureStore
+        from utils.signalink_db import GestureDB
+        captures_dir = args.captures or args.store.parent / "captures"
+        captures = CaptureStore(captures_dir) if captures_dir.exists() else None
+        db = GestureDB(args.store, feature=store.feature, captures=captures)
+        report["applied"] = prune_db(db, args.budget, args.method, seed=args.seed)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    f, p = report["full"], report["pruned"]
+    print(f"{args.method}, budget {args.budget}/sign (selection {report['select_s']:.2f} s)")
+    for name, r in (("all rows", f), ("pruned", p)):
+        print(f"{name:<9} {r['rows']:>7} rows  {r['mb']:8.1f} MB  predict p50 {r['predict']['p50_ms']:6.2f} ms  "
+              f"{args.folds}-fold accuracy {r['accuracy']:.1%}")
+    print(f"accuracy {report['accuracy_delta']:+.1%}, size −{report['size_reduction']:.0%}, "
+          f"latency −{report['latency_reduction']:.0%}")
+    if "applied" in report:
+        a = report["applied"]
+        print(f"removed {a['removed']} of {a['before']} samples from {args.store}")
+
+
+if __name__ == "__main__":
+    main()
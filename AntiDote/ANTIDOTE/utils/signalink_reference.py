@@ -0,0 +1,128 @@
+# ANTIDOTE/utils/signalink_reference.py
+# ------------------------------------------------------------
+# SIGNALINK – built-in reference samples from the SIGN_DATA pictures
+#
+# Every sign card the page ships (images/alphabet_A.png, hello.png, ...) is
+# turned into feature vectors with the active extractor: the picture itself
+# plus a few randomly shifted / scaled / rotated / re-lit copies. They are
+# merged into the match index ahead of the user's samples with a low vote
+# weight (PRIOR_WEIGHT), so a fresh install can predict right away and the
+# user's own recordings win as soon as they exist.
+#
+#   signalink_assets/reference_cache/<sha1>.npy
+#
+# The cache key covers the image bytes, the extractor version and the
+# augmentation settings, so a page start only reads a few small .npy files;
+# pictures are decoded again only when one of those changes.
+# ------------------------------------------------------------
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.signalink_features import FEATURE_VERSIONS
+from utils.signalink_landmarks import MEDIAPIPE_AVAILABLE
+
+DEFAULT_AUGMENTATIONS = 8
+AUGMENT_VERSION = 1
+PRIOR_WEIGHT = 0.3      # vote weight of a reference neighbour; the user's samples count 1
+
+
+def feature_version(feature: str) -> str:
+    """Changes whenever the vectors an extractor produces would change."""
+    version = FEATURE_VERSIONS.get(feature, feature)
+    if feature == "landmarks" and MEDIAPIPE_AVAILABLE:
+        import mediapipe as mp
+        version += f"-{getattr(mp, '__version__', '?')}"
+    return version
+
+
+def augment(img: Image.Image, rng: np.random.Generator) -> Image.Image:
+    """Shift ±12%, scale 0.85–1.15, rotate ±15°, brightness 0.7–1.3."""
+    img = img.convert("RGB")
+    w, h = img.size
+    s = rng.uniform(0.85, 1.15)
+    out = img.resize((max(1, int(w * s)), max(1, int(h * s))))
+    out = out.rotate(rng.uniform(-15, 15), resample=Image.BILINEAR, expand=False, fillcolor=(255, 255, 255))
+    canvas = Image.new("RGB", (w, h), (255, 255, 255))
+    dx = int(rng.uniform(-0.12, 0.12) * w) + (w - out.size[0]) // 2
+    dy = int(rng.uniform(-0.12, 0.12) * h) + (h - out.size[1]) // 2
+    canvas.paste(out, (dx, dy))
+    arr = np.asarray(canvas, dtype=np.float32) * rng.uniform(0.7, 1.3)
+    return Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+
+
+def cache_key(data: bytes, version: str, augmentations: int) -> str:
+    h = hashlib.sha1(data)
+    h.update(f"|{version}|aug{augmentations}|v{AUGMENT_VERSION}".encode())
+    return h.hexdigest()
+
+
+def image_features(
+    img: Image.Image,
+    extract: Callable[[Image.Image], Optional[np.ndarray]],
+    augmentations: int,
+    seed: int,
+) -> np.ndarray:
+    """(≤ 1 + augmentations, dim) vectors; variants the extractor rejects (no hand) are left out."""
+    rng = np.random.default_rng(seed)
+    variants = [img] + [augment(img, rng) for _ in range(augmentations)]
+    feats = [v for v in (extract(x) for x in variants) if v is not None]
+    if not feats:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack(feats).astype(np.float32)
+
+
+def _save(path: Path, arr: np.ndarray) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=path.stem + ".", suffix=".tmp", dir=str(path.parent))
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def reference_features(
+    items: Sequence[Tuple[str, Path]],
+    extract: Callable[[Image.Image], Optional[np.ndarray]],
+    version: str,
+    cache_dir: Optional[Path] = None,
+    augmentations: int = DEFAULT_AUGMENTATIONS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (matrix, labels) for the (label, image path) pairs, read from cache_dir
+    when possible. Missing or unreadable pictures are skipped.
+    """
+    if cache_dir is not None:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    blocks, labels = [], []
+    for label, path in items:
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            continue
+        key = cache_key(data, version, augmentations)
+        cached = Path(cache_dir) / f"{key}.npy" if cache_dir is not None else None
+        feats = None
+        if cached is not None and cached.exists():
+            try:
+                feats = np.load(cached)
+            except (OSError, ValueError):
+                feats = None
+        if feats is None:
+            try:
+                img = Image.open(path)
+                img.load()
+            except Exception:
+                continue
+            feats = image_features(img, extract, augmentations, seed=int(key[:8], 16))
+            if cached is not None:
+                _save(cached, feats)
+        if len(feats):
+            blocks.append(feats)
+            labels.extend([label] * len(feats))
+    if not blocks or len({b.shape[1] for b in blocks}) != 1:
+        return np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=object)
+    return np.concatenate(blocks), np.asarray(labels, dtype=object)
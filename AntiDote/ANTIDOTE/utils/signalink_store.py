@@ -0,0 +1,602 @@
+# ANTIDOTE/utils/signalink_store.py
+# ------------------------------------------------------------
+# SIGNALINK – binary, memory-mapped gesture DB
+#
+#   gesture_db/
+#     meta.json              feature type + extractor version, dim, version, label names,
+#                            segment list, tombstones
+#     seg-000001.f32         count × dim float32 rows (np.memmap, append-only)
+#     seg-000001.norms.f32   ||row||² per sample (so matching never re-scans the matrix)
+#     seg-000001.labels.i32  index into label_names per sample
+#     seg-000001.seq.i64     stable row id per sample (survives compaction)
+#     deleted.i64            row ids removed one by one (append-only tombstones)
+#     sources.i64            capture id per row id (-1 = none), see utils/signalink_captures.py
+#
+# New samples go to the active (last) segment; once it holds SEGMENT_ROWS it is
+# sealed and a new one starts. Deleting a label only records a tombstone
+# ("rows of this label below seq N are gone"), so no write depends on DB size.
+# compact() merges the sealed segments into one without the dead rows, in the
+# background, and swaps it in under the write lock.
+#
+# meta.json is rewritten atomically after the data files are appended, so it
+# is the commit point: bytes past a segment's `count` rows are leftovers of an
+# interrupted write and get truncated by the next append.
+#
+# Migrate the old JSON snapshot with:
+#   python -m utils.signalink_store migrate signalink_assets/gesture_db_snapshot_img.json
+# ------------------------------------------------------------
+import argparse
+import copy
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl  # serialize writers across processes (POSIX only)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+FORMAT_VERSION = 2
+DTYPE = np.float32
+LABEL_DTYPE = np.int32
+SEQ_DTYPE = np.int64
+
+SEGMENT_ROWS = int(os.getenv("SIGNALINK_SEGMENT_ROWS", "1024"))
+COMPACT_MIN_SEGMENTS = 4     # sealed segments before a merge is worth it
+COMPACT_DEAD_RATIO = 0.25    # ...or this share of rows tombstoned
+
+META_FILE = "meta.json"
+DELETED_FILE = "deleted.i64"
+SOURCES_FILE = "sources.i64"
+NO_SOURCE = -1
+LOCK_FILE = ".lock"
+SEGMENT_SUFFIXES = (".f32", ".norms.f32", ".labels.i32", ".seq.i64")
+# what each row holds, e.g. "pixels" (preprocess_image) or "landmarks" (MediaPipe);
+# stores written before this was recorded hold pixels
+DEFAULT_FEATURE = "pixels"
+# format 1 (single file set) names, upgraded in place to the first segment
+V1_FILES = {"samples.f32": ".f32", "norms.f32": ".norms.f32", "labels.i32": ".labels.i32"}
+
+Meta = Dict[str, object]
+
+
+class Segment:
+    """One segment's rows (memory-mapped) plus which of them are still live."""
+
+    __slots__ = ("name", "matrix", "sq_norms", "label_ids", "row_labels", "seqs", "live")
+
+    def __init__(self, name, matrix, sq_norms, label_ids, row_labels, seqs, live):
+        self.name = name
+        self.matrix = matrix
+        self.sq_norms = sq_norms
+        self.label_ids = label_ids
+        self.row_labels = row_labels
+        self.seqs = seqs
+        self.live = live
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+    @property
+    def live_count(self) -> int:
+        return int(self.live.sum())
+
+
+class GestureStore:
+    """Segmented sample matrix on disk, read through np.memmap without copying."""
+
+    def __init__(self, root: Path, feature: str = DEFAULT_FEATURE, feature_version: Optional[str] = None):
+        self.root = Path(root)
+        self._feature = feature
+        self._feature_version = feature_version
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._meta_stamp: Optional[Tuple[int, int]] = None
+        self._meta: Meta = {}
+        self._arrays: Dict[str, Tuple[int, tuple]] = {}   # segment name -> (count, arrays)
+        self._segments: Optional[Tuple[int, List[Segment]]] = None
+        self.compactions = 0
+        self.refresh()
+        if self._meta.get("format") == 1:
+            self._upgrade_v1()
+
+    # ---------- metadata ----------
+    def _path(self, name: str) -> Path:
+        return self.root / name
+
+    def _empty_meta(self) -> Meta:
+        return {
+            "format": FORMAT_VERSION,
+            "feature": None,         # set by the first sample
+            "feature_version": None, # extractor version (utils/signalink_features.py), set by the first write that knows it
+            "dim": None,
+            "dtype": np.dtype(DTYPE).name,
+            "version": 0,
+            "label_names": [],
+            "segments": [],          # [{"name", "count", "sealed"}], oldest first
+            "next_seq": 0,
+            "next_segment": 1,
+            "label_tombstones": {},  # str(label id) -> rows of that label with seq below this are deleted
+            "deleted": 0,            # committed entries in deleted.i64
+            "retired": [],           # segments merged away, removed at the next compaction
+        }
+
+    def refresh(self) -> bool:
+        """Re-read meta.json if another writer changed it. Returns True when it did."""
+        path = self._path(META_FILE)
+        try:
+            st_ = path.stat()
+            stamp = (st_.st_mtime_ns, st_.st_size)
+        except OSError:
+            stamp = None
+        with self._lock:
+            if stamp == self._meta_stamp and self._meta:
+                return False
+            meta = self._empty_meta()
+            if stamp is not None:
+                try:
+                    meta.update(json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError):
+                    pass
+            self._meta, self._meta_stamp = meta, stamp
+            return True
+
+    def _write_meta(self, meta: Meta) -> None:
+        meta["version"] = int(meta.get("version", 0)) + 1
+        fd, tmp = tempfile.mkstemp(prefix="meta.", suffix=".tmp", dir=str(self.root))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self._path(META_FILE))
+        self._meta = copy.deepcopy(meta)
+        st_ = self._path(META_FILE).stat()
+        self._meta_stamp = (st_.st_mtime_ns, st_.st_size)
+
+    @contextmanager
+    def _writing(self) -> Iterator[Meta]:
+        """Thread + process exclusive section with a fresh, private copy of the metadata."""
+        with self._lock:
+            with open(self._path(LOCK_FILE), "a+b") as lk:
+                if fcntl is not None:
+                    fcntl.flock(lk.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._meta_stamp = None
+                    self.refresh()
+                    yield copy.deepcopy(self._meta)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lk.fileno(), fcntl.LOCK_UN)
+
+    def _upgrade_v1(self) -> None:
+        """Turn a format-1 store (one samples.f32) into its first sealed segment."""
+        with self._writing() as meta:
+            if meta.get("format") != 1:
+                return
+            count = int(meta.get("count") or 0)
+            new = self._empty_meta()
+            new.update({k: meta[k] for k in ("dim", "version", "label_names") if k in meta})
+            if count:
+                for old, suffix in V1_FILES.items():
+                    os.replace(self._path(old), self._path("seg-000000" + suffix))
+                self._replace_file("seg-000000.seq.i64", np.arange(count, dtype=SEQ_DTYPE).tobytes())
+                new.update(segments=[{"name": "seg-000000", "count": count, "sealed": True}], next_seq=count)
+            else:
+                for old in V1_FILES:
+                    try:
+                        os.remove(self._path(old))
+                    except OSError:
+                        pass
+            self._write_meta(new)
+
+    # ---------- read side ----------
+    @property
+    def dim(self) -> Optional[int]:
+        dim = self._meta.get("dim")
+        return int(dim) if dim else None
+
+    @property
+    def feature(self) -> str:
+        """Feature type of the stored rows (the configured one while the store is empty)."""
+        return str(self._meta.get("feature") or (DEFAULT_FEATURE if self._meta.get("dim") else self._feature))
+
+    @property
+    def feature_version(self) -> Optional[str]:
+        return self._meta.get("feature_version") or self._feature_version
+
+    @property
+    def version(self) -> int:
+        return int(self._meta.get("version") or 0)
+
+    @property
+    def label_names(self) -> List[str]:
+        return list(self._meta.get("label_names") or [])
+
+    @property
+    def count(self) -> int:
+        """Live samples (tombstoned rows excluded)."""
+        return sum(s.live_count for s in self.segments())
+
+    def __len__(self) -> int:
+        return self.count
+
+    def segments(self) -> List[Segment]:
+        """Every non-empty segment with its live-row mask, cached per DB version."""
+        return self.versioned_segments()[1]
+
+    def versioned_segments(self) -> Tuple[int, List[Segment]]:
+        """(version, segments) taken together, so readers never mix two versions."""
+        with self._lock:
+            meta, version = self._meta, self.version
+            if self._segments is not None and self._segments[0] == version:
+                return self._segments
+            dim = self.dim
+            names = np.asarray(self.label_names, dtype=object)
+            tombstones = {int(k): int(v) for k, v in (meta.get("label_tombstones") or {}).items()}
+            deleted = self._read(DELETED_FILE, SEQ_DTYPE, int(meta.get("deleted") or 0))
+            out: List[Segment] = []
+            for seg in meta.get("segments") or []:
+                count = int(seg["count"])
+                if not count or not dim:
+                    continue
+                matrix, norms, ids, seqs = self._open_segment(seg["name"], count, dim)
+                live = np.ones(count, dtype=bool)
+                for label_id, upto in tombstones.items():
+                    live &= ~((ids == label_id) & (seqs < upto))
+                if deleted.size:
+                    live &= ~np.isin(seqs, deleted)
+                out.append(Segment(seg["name"], matrix, norms, ids, names[ids], seqs, live))
+            self._segments = (version, out)
+            return self._segments
+
+    def _open_segment(self, name: str, count: int, dim: int) -> tuple:
+        cached = self._arrays.get(name)
+        if cached is not None and cached[0] == count:
+            return cached[1]
+        arrays = (
+            np.memmap(self._path(name + ".f32"), dtype=DTYPE, mode="r", shape=(count, dim)),
+            self._read(name + ".norms.f32", DTYPE, count),
+            self._read(name + ".labels.i32", LABEL_DTYPE, count),
+            self._read(name + ".seq.i64", SEQ_DTYPE, count),
+        )
+        self._arrays[name] = (count, arrays)
+        return arrays
+
+    def _read(self, name: str, dtype, count: int) -> np.ndarray:
+        if not count:
+            return np.empty(0, dtype=dtype)
+        arr = np.fromfile(self._path(name), dtype=dtype, count=count)
+        arr.flags.writeable = False   # shared by every session
+        return arr
+
+    def counts(self) -> Dict[str, int]:
+        names = self.label_names
+        per = np.zeros(len(names), dtype=np.int64)
+        for seg in self.segments():
+            per += np.bincount(seg.label_ids[seg.live], minlength=len(names))
+        return {name: int(n) for name, n in zip(names, per) if n}
+
+    def live_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(matrix, labels) of every live sample. Copies unless there is a single clean segment."""
+        segs = [s for s in self.segments() if s.live_count]
+        if not segs:
+            return np.empty((0, self.dim or 0), dtype=DTYPE), np.empty(0, dtype=object)
+        if len(segs) == 1 and segs[0].live.all():
+            return segs[0].matrix, segs[0].row_labels
+        return (
+            np.concatenate([s.matrix[s.live] for s in segs]),
+            np.concatenate([s.row_labels[s.live] for s in segs]),
+        )
+
+    def dead_count(self) -> int:
+        return sum(len(s) - s.live_count for s in self.segments())
+
+    def sources(self, seqs: Sequence[int]) -> np.ndarray:
+        """Capture id each row was derived from (NO_SOURCE for rows stored without one)."""
+        seqs = np.asarray(seqs, dtype=SEQ_DTYPE)
+        try:
+            table = np.fromfile(self._path(SOURCES_FILE), dtype=SEQ_DTYPE)
+        except OSError:
+            table = np.empty(0, dtype=SEQ_DTYPE)
+        out = np.full(len(seqs), NO_SOURCE, dtype=SEQ_DTYPE)
+        known = seqs < len(table)
+        out[known] = table[seqs[known]]
+        return out
+
+    def live_sources(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(row ids, capture ids) of every live row."""
+        seqs = [s.seqs[s.live] for s in self.segments()]
+        seqs = np.concatenate(seqs) if seqs else np.empty(0, dtype=SEQ_DTYPE)
+        return seqs, self.sources(seqs)
+
+    # ---------- write side ----------
+    def append(self, label: str, vec: np.ndarray) -> int:
+        """Add one sample; returns its row id. Cost does not depend on DB size."""
+        return self.extend(label, np.asarray(vec).reshape(1, -1))
+
+    def extend(self, label: str, vecs: Sequence[np.ndarray], sources: Optional[Sequence[int]] = None) -> int:
+        """
+        Add several samples of one label in a single commit; returns the first
+        row id. sources: the capture id of each sample, when there is one.
+        """
+        rows = np.ascontiguousarray(np.asarray(vecs, dtype=DTYPE))
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if not rows.size:
+            return int(self._meta.get("next_seq") or 0)
+        if sources is not None and len(sources) != len(rows):
+            raise ValueError("one source per sample is required")
+        with self._writing() as meta:
+            feature = meta.get("feature") or (DEFAULT_FEATURE if meta.get("dim") else self._feature)
+            if feature != self._feature:
+                raise ValueError(f"DB holds {feature} features, not {self._feature}")
+            stored_version = meta.get("feature_version")
+            if stored_version and self._feature_version and stored_version != self._feature_version:
+                raise ValueError(f"DB holds {stored_version} vectors, not {self._feature_version}")
+            dim = meta.get("dim") or rows.shape[1]
+            if rows.shape[1] != dim:
+                raise ValueError(f"sample has {rows.shape[1]} values, DB expects {dim}")
+            names = meta["label_names"]
+            if label not in names:
+                names.append(label)
+            label_id = names.index(label)
+            first = seq = int(meta["next_seq"])
+            if sources is not None:
+                self._write_sources(first, np.asarray(sources, dtype=SEQ_DTYPE))
+            segs = meta["segments"]
+            done = 0
+            while done < len(rows):
+                if not segs or segs[-1]["sealed"] or segs[-1]["count"] >= SEGMENT_ROWS:
+                    if segs:
+                        segs[-1]["sealed"] = True
+                    segs.append({"name": f"seg-{int(meta['next_segment']):06d}", "count": 0, "sealed": False})
+                    meta["next_segment"] = int(meta["next_segment"]) + 1
+                active = segs[-1]
+                n = int(active["count"])
+                take = min(SEGMENT_ROWS - n, len(rows) - done)
+                chunk = rows[done:done + take]
+                name = active["name"]
+                self._append_file(name + ".f32", n * int(dim) * chunk.itemsize, chunk)
+                self._append_file(name + ".norms.f32", n * 4, np.einsum("ij,ij->i", chunk, chunk).astype(DTYPE))
+                self._append_file(name + ".labels.i32", n * 4, np.full(take, label_id, dtype=LABEL_DTYPE))
+                self._append_file(name + ".seq.i64", n * 8, np.arange(seq, seq + take, dtype=SEQ_DTYPE))
+                active["count"] = n + take
+                seq += take
+                done += take
+            meta.update(feature=feature, dim=int(dim), next_seq=seq)
+            if self._feature_version and not stored_version:
+                meta["feature_version"] = self._feature_version
+            self._write_meta(meta)
+            return first
+
+    def _append_file(self, name: str, committed_bytes: int, arr: np.ndarray) -> None:
+        with open(self._path(name), "a+b") as f:
+            f.truncate(committed_bytes)  # drop any tail from an interrupted write
+            f.seek(committed_bytes)
+            f.write(arr.tobytes())
+            f.flush()
+
+    def _write_sources(self, first: int, ids: np.ndarray) -> None:
+        """Entries [first, first + len(ids)) of the source table; rows before without one get NO_SOURCE."""
+        path = self._path(SOURCES_FILE)
+        have = path.stat().st_size // 8 if path.exists() else 0
+        with open(path, "a+b") as f:
+            f.truncate(min(have, first) * 8)
+            f.seek(min(have, first) * 8)
+            if have < first:
+                f.write(np.full(first - have, NO_SOURCE, dtype=SEQ_DTYPE).tobytes())
+            f.write(ids.tobytes())
+            f.flush()
+
+    def remove_label(self, label: str) -> int:
+        """Tombstone every current sample of label; returns how many were live."""
+        removed = self.counts().get(label, 0)
+        with self._writing() as meta:
+            names = meta["label_names"]
+            if label not in names:
+                return 0
+            meta["label_tombstones"][str(names.index(label))] = int(meta["next_seq"])
+            self._write_meta(meta)
+        return removed
+
+    def remove_rows(self, row_ids: Sequence[int]) -> None:
+        """Tombstone individual samples by row id."""
+        ids = np.asarray(row_ids, dtype=SEQ_DTYPE).ravel()
+        if not ids.size:
+            return
+        with self._writing() as meta:
+            n = int(meta.get("deleted") or 0)
+            self._append_file(DELETED_FILE, n * 8, ids)
+            meta["deleted"] = n + int(ids.size)
+            self._write_meta(meta)
+
+    def clear(self) -> None:
+        """Drop every sample; the old segment files go at the next compaction."""
+        with self._writing() as meta:
+            fresh = self._empty_meta()
+            fresh.update(
+                version=meta["version"],
+                next_seq=meta["next_seq"],
+                next_segment=meta["next_segment"],
+                retired=list(meta.get("retired") or []) + [s["name"] for s in meta["segments"]],
+            )
+            self._replace_file(DELETED_FILE, b"")
+            self._write_meta(fresh)
+            self._arrays = {}
+
+    # ---------- compaction ----------
+    def needs_compaction(self) -> bool:
+        segs = self._meta.get("segments") or []
+        sealed = sum(1 for s in segs if s["sealed"])
+        total = sum(int(s["count"]) for s in segs)
+        if sealed >= COMPACT_MIN_SEGMENTS or (self._meta.get("retired") and not segs):
+            return True
+        return total > 0 and self.dead_count() >= max(1.0, COMPACT_DEAD_RATIO * total)
+
+    def maybe_compact(self, background: bool = True) -> bool:
+        """Start compact() when there are enough sealed segments or dead rows."""
+        if self._compact_lock.locked() or not self.needs_compaction():
+            return False
+        if background:
+            threading.Thread(target=self.compact, name="gesture-db-compact", daemon=True).start()
+        else:
+            self.compact()
+        return True
+
+    def compact(self) -> bool:
+        """
+        Merge all sealed segments into one, dropping tombstoned rows. The copy runs
+        without the write lock; appends and deletes made meanwhile are kept.
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._writing() as meta:
+                segs = meta["segments"]
+                if segs and not segs[-1]["sealed"] and segs[-1]["count"]:
+                    segs[-1]["sealed"] = True   # later appends start a new segment
+                victims = [s["name"] for s in segs if s["sealed"]]
+                if not victims:
+                    if meta.get("retired"):
+                        self._remove_segment_files(meta["retired"])
+                        meta["retired"] = []
+                        self._write_meta(meta)
+                    return False
+                target = f"seg-{int(meta['next_segment']):06d}"
+                meta["next_segment"] = int(meta["next_segment"]) + 1
+                self._write_meta(meta)
+                snapshot_tombstones = dict(meta["label_tombstones"])
+                snapshot_deleted = int(meta.get("deleted") or 0)
+                segments = {s.name: s for s in self.segments() if s.name in victims}
+
+            kept = 0
+            files = [open(self._path(target + suffix), "wb") for suffix in SEGMENT_SUFFIXES]
+            try:
+                for name in victims:
+                    seg = segments.get(name)
+                    if seg is None:
+                        continue
+                    idx = np.flatnonzero(seg.live)
+                    for start in range(0, len(idx), 1024):   # stream, never the whole matrix in RAM
+                        part = idx[start:start + 1024]
+                        for f, arr in zip(files, (seg.matrix, seg.sq_norms, seg.label_ids, seg.seqs)):
+                            f.write(np.ascontiguousarray(arr[part]).tobytes())
+                    kept += len(idx)
+            finally:
+                for f in files:
+                    f.close()
+            del segments
+
+            with self._writing() as meta:
+                current = {s["name"] for s in meta["segments"]}
+                if not set(victims) <= current:   # cleared meanwhile
+                    self._remove_segment_files([target])
+                    return False
+                rest = [s for s in meta["segments"] if s["name"] not in victims]
+                merged = [{"name": target, "count": kept, "sealed": True}] if kept else []
+                # tombstones from before the snapshot only covered rows that were just dropped
+                tombstones = {k: v for k, v in meta["label_tombstones"].items() if snapshot_tombstones.get(k) != v}
+                later = self._read(DELETED_FILE, SEQ_DTYPE, int(meta.get("deleted") or 0))[snapshot_deleted:]
+                self._replace_file(DELETED_FILE, later.tobytes())
+                self._remove_segment_files(meta.get("retired") or [])
+                if not kept:
+                    self._remove_segment_files([target])
+                meta.update(
+                    segments=merged + rest,
+                    label_tombstones=tombstones,
+                    deleted=int(later.size),
+                    retired=victims,   # other readers may still have them mapped
+                )
+                self._write_meta(meta)
+                self._arrays = {k: v for k, v in self._arrays.items() if k not in victims}
+            self.compactions += 1
+            return True
+        finally:
+            self._compact_lock.release()
+
+    def _remove_segment_files(self, names: Sequence[str]) -> None:
+        for name in names:
+            for suffix in SEGMENT_SUFFIXES:
+                try:
+                    os.remove(self._path(name + suffix))
+                except OSError:
+                    pass
+
+    def _replace_file(self, name: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=str(self.root))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self._path(name))
+
+    def stats(self) -> Dict[str, object]:
+        segs = self._meta.get("segments") or []
+        return {
+            "version": self.version,
+            "feature": self.feature,
+            "feature_version": self.feature_version,
+            "segments": len(segs),
+            "rows": sum(int(s["count"]) for s in segs),
+            "live": self.count,
+            "dead": self.dead_count(),
+            "compactions": self.compactions,
+        }
+
+
+# ---------- migration from the JSON snapshot ----------
+def migrate_json(json_path: Path, store: GestureStore, keep_backup: bool = True) -> int:
+    """
+    Copy every sample from the old {label: [[float, ...], ...]} JSON file into store.
+    The JSON file is renamed to *.migrated (or deleted) so it is imported only once.
+    Returns the number of samples imported.
+    """
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return 0
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    imported = 0
+    if isinstance(data, dict):
+        for label, samples in data.items():
+            if samples:
+                store.extend(str(label), np.asarray(samples, dtype=DTYPE))
+                imported += len(samples)
+    if keep_backup:
+        os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+    else:
+        json_path.unlink()
+    return imported
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SIGNALINK gesture DB tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="import the old JSON snapshot into the binary store")
+    m.add_argument("json_path", type=Path)
+    m.add_argument("--store", type=Path, default=None, help="default: gesture_db/ next to the JSON file")
+    m.add_argument("--delete-json", action="store_true")
+    i = sub.add_parser("info", help="print sample counts")
+    i.add_argument("store", type=Path)
+    c = sub.add_parser("compact", help="merge segments and drop deleted rows now")
+    c.add_argument("store", type=Path)
+    args = ap.parse_args()
+
+    if args.cmd == "migrate":
+        store = GestureStore(args.store or args.json_path.parent / "gesture_db")
+        n = migrate_json(args.json_path, store, keep_backup=not args.delete_json)
+        print(f"imported {n} samples into {store.root}")
+        return
+    store = GestureStore(args.store)
+    if args.cmd == "compact":
+        store.compact()
+    print(json.dumps(dict(store.stats(), dim=store.dim, labels=store.counts()), indent=2))
+
+
+if __name__ == "__main__":
+    main()